@@ -7,7 +7,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['PyQt5.sip'],
+    hiddenimports=['PyQt5.sip', 'backends.windows', 'backends.generic', 'backends.simulated'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
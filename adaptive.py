@@ -0,0 +1,198 @@
+import os
+import time
+from typing import NamedTuple, Optional
+
+ADAPTIVE_ENV = "MONITOR_BRIGHTNESS_ADAPTIVE"  # "on", or settings like "bright=40,dark=80,interval=2s"
+SAMPLE_WIDTH = 64  # pixels, frames are downsampled to this width before they are analyzed
+LUMA_WEIGHTS = (0.2126, 0.7152, 0.0722)  # Rec. 709, red, green, blue
+BRIGHT_PERCENTILE = 90  # a large white window counts even on a dark desktop
+
+
+class FrameStatistics(NamedTuple):
+    """Luminance of a frame, 0.0 for black to 1.0 for white."""
+    mean: float
+    percentile: float
+
+    def content(self) -> float:
+        """Returns how bright the content looks, the mean and the bright areas weighted equally."""
+        return 0.5 * (self.mean + self.percentile)
+
+
+def frame_statistics(frame, channels: str = "rgb", percentile: float = BRIGHT_PERCENTILE) -> FrameStatistics:
+    """
+    Computes the mean and a high percentile of a frame's luminance.
+
+    Works on whole arrays with NumPy, a 64 pixel wide frame takes a few
+    dozen microseconds.
+
+    Args:
+        frame: Pixels as an array of shape (height, width, channels) with values 0-255.
+        channels (str): Order of the channels, e.g. "rgb", or "bgra" for frames grabbed by Qt.
+        percentile (float): The percentile to report, 0-100.
+
+    Raises:
+        ImportError: NumPy is not installed.
+        ValueError: The frame is empty or has too few channels.
+    """
+    import numpy
+
+    pixels = numpy.asarray(frame)
+    if pixels.ndim != 3 or pixels.shape[2] < len(channels) or not pixels.size:
+        raise ValueError(f"Expected a non-empty {channels.upper()} frame, got shape {pixels.shape}")
+    weights = numpy.zeros(pixels.shape[2], dtype=numpy.float32)
+    for channel, weight in zip("rgb", LUMA_WEIGHTS):
+        weights[channels.index(channel)] = weight / 255.0
+    luma = pixels.reshape(-1, pixels.shape[2]) @ weights
+    index = min(luma.size - 1, int(luma.size * percentile / 100))
+    return FrameStatistics(float(luma.mean()), float(numpy.partition(luma, index)[index]))
+
+
+class AdaptiveConfig:
+    """Settings of content-adaptive brightness."""
+
+    DEFAULTS = {
+        "bright": 40,  # brightness on a white screen
+        "dark": 80,  # brightness on a black screen
+        "interval": 2.0,  # seconds between two frames
+        "budget": 0.01,  # share of one CPU core the analysis may use
+        "threshold": 8,  # brightness levels the target has to move before it is written
+        "smoothing": 0.25,  # weight of a new frame against the frames before
+        "step": 5,  # brightness levels written targets are rounded to
+    }
+
+    def __init__(self, **settings):
+        unknown = set(settings) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown adaptive brightness settings: {', '.join(sorted(unknown))}")
+        values = dict(self.DEFAULTS, **settings)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def parse(cls, spec: str) -> "AdaptiveConfig":
+        """
+        Builds a config from a string like "bright=40,dark=80,interval=2s", "on" for the defaults.
+
+        Intervals accept a "ms" or "s" suffix and are taken as seconds without one.
+
+        Raises:
+            ValueError: A setting is unknown or its value is malformed.
+        """
+        settings = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            if item.lower() in ("1", "on", "true", "yes"):
+                continue
+            name, _, text = item.partition("=")
+            name, text = name.strip(), text.strip()
+            if name not in cls.DEFAULTS:
+                raise ValueError(f"Unknown adaptive brightness setting '{name}'")
+            if name in ("bright", "dark", "threshold", "step"):
+                settings[name] = int(text)
+            elif text.endswith("ms"):
+                settings[name] = float(text[:-2]) / 1000
+            else:
+                settings[name] = float(text.rstrip("s"))
+        return cls(**settings)
+
+    @classmethod
+    def from_env(cls) -> Optional["AdaptiveConfig"]:
+        """Builds a config from $MONITOR_BRIGHTNESS_ADAPTIVE, None when it is not set."""
+        spec = os.environ.get(ADAPTIVE_ENV, "").strip()
+        if not spec or spec.lower() in ("0", "off", "false", "no"):
+            return None
+        return cls.parse(spec)
+
+
+class HysteresisFilter:
+    """
+    Turns a noisy target brightness into the few values worth writing.
+
+    New targets are smoothed over the previous ones, and the output only
+    moves once the smoothed target is `threshold` levels away from it, so
+    scrolling, a blinking cursor or a video do not rewrite the monitors.
+    Once the smoothed target has settled, the output follows it the rest of
+    the way, so a lasting change does not end up `threshold` levels short.
+    """
+
+    def __init__(self, threshold: float, smoothing: float, step: int = 1):
+        """
+        Args:
+            threshold (float): Brightness levels the smoothed target has to move away from the output.
+            smoothing (float): Weight of a new target, 1.0 takes it as is.
+            step (int): Brightness levels the output is rounded to.
+        """
+        self.threshold = threshold
+        self.smoothing = smoothing
+        self.step = max(1, step)
+        self.smoothed: Optional[float] = None
+        self.output: Optional[int] = None
+
+    def update(self, target: float) -> Optional[int]:
+        """Adds a target and returns the new output, or None when the output stays."""
+        if self.smoothed is None:
+            self.smoothed = target
+        else:
+            self.smoothed += self.smoothing * (target - self.smoothed)
+        settled = abs(target - self.smoothed) < self.step / 2
+        if self.output is not None and abs(self.smoothed - self.output) < self.threshold and not settled:
+            return None
+        output = max(0, min(100, int(round(self.smoothed / self.step) * self.step)))
+        if output == self.output:
+            return None
+        self.output = output
+        return output
+
+    def reset(self):
+        """Forgets the targets so far, the next one is output as is."""
+        self.smoothed = None
+        self.output = None
+
+
+class ContentAnalyzer:
+    """
+    Maps frames to a target brightness within a CPU budget.
+
+    Analyzes a frame into FrameStatistics, maps its brightness linearly
+    between `config.dark` and `config.bright` and filters the result with a
+    HysteresisFilter. It measures the CPU time every frame costs and
+    stretches the interval between frames whenever that would exceed
+    `config.budget`. Frames can come from a screen grab or be made up, it
+    makes no difference here.
+    """
+
+    def __init__(self, config: AdaptiveConfig):
+        self.config = config
+        self.filter = HysteresisFilter(config.threshold, config.smoothing, config.step)
+        self.frames = 0
+        self.cpu_time = 0.0  # seconds spent analyzing
+        self.last_cost = 0.0  # seconds of CPU time of the latest frame, grab included
+        self.statistics: Optional[FrameStatistics] = None
+
+    def target(self, statistics: FrameStatistics) -> float:
+        """Returns the brightness the content calls for, before filtering."""
+        return self.config.dark + (self.config.bright - self.config.dark) * statistics.content()
+
+    def analyze(self, frame, channels: str = "rgb", grab_cost: float = 0.0) -> Optional[int]:
+        """
+        Analyzes a frame and returns the brightness to write, or None when it stays.
+
+        Args:
+            frame: Pixels as an array of shape (height, width, channels), see frame_statistics.
+            channels (str): Order of the channels.
+            grab_cost (float): Seconds of CPU time it took to get the frame, counted against the budget.
+        """
+        start = time.thread_time()
+        self.statistics = frame_statistics(frame, channels)
+        level = self.filter.update(self.target(self.statistics))
+        self.last_cost = time.thread_time() - start + grab_cost
+        self.cpu_time += self.last_cost
+        self.frames += 1
+        return level
+
+    def next_interval(self) -> float:
+        """Returns the seconds to wait for the next frame so the analysis stays within the budget."""
+        return max(self.config.interval, self.last_cost / max(self.config.budget, 1e-6))
+
+    def reset(self):
+        """Forgets the frames so far, e.g. after the user set the brightness."""
+        self.filter.reset()
@@ -0,0 +1,110 @@
+"""
+Platform backends.
+
+A backend provides everything that depends on the operating system: monitor
+discovery over DDC/CI, the global keyboard hook, and Windows extras like the
+administrator check and hiding the console. Backends import their platform
+libraries lazily, so importing this package costs next to nothing and the
+rest of the application can be imported on any system.
+"""
+import importlib
+import os
+import sys
+from typing import Callable, List, Optional
+
+BACKEND_ENV = "MONITOR_BRIGHTNESS_BACKEND"
+
+# System events a backend can recognize among the native events Qt receives
+SYSTEM_RESUMED = "resumed"
+CLOCK_CHANGED = "clock_changed"
+
+# Backend name -> "module:ClassName", imported only when selected
+BACKENDS = {
+    "windows": "backends.windows:WindowsBackend",
+    "generic": "backends.generic:GenericBackend",
+    "simulated": "backends.simulated:SimulatedBackend",
+}
+
+_backend = None
+
+
+class Backend:
+    """Interface every platform backend implements."""
+
+    name = "base"
+
+    def get_monitors(self) -> List:
+        """Returns the connected monitors as monitorcontrol-compatible objects."""
+        raise NotImplementedError
+
+    def ensure_admin(self, app_name: str, on_error: Callable[[str], None]):
+        """Makes sure the process may talk to the monitors, restarting elevated if needed."""
+
+    def hide_console(self):
+        """Hides the console window the application was started from, if any."""
+
+    def is_session_locked(self) -> bool:
+        """Returns whether the user's session is locked, so the monitors may be left alone."""
+        return False
+
+    def system_event(self, event_type: bytes, message) -> Optional[str]:
+        """
+        Recognizes resume from sleep and clock changes among native events.
+
+        Args:
+            event_type (bytes): The event type Qt passes to native event filters.
+            message: The native message, a pointer to it on Windows.
+
+        Returns:
+            SYSTEM_RESUMED, CLOCK_CHANGED or None for any other event.
+        """
+        return None
+
+    def hook_key_events(self, callback: Callable):
+        """Calls `callback(event)` for every key press and release anywhere in the system."""
+        raise NotImplementedError
+
+    def wait_for_keys(self):
+        """Blocks the calling thread while the keyboard hook delivers events."""
+        raise NotImplementedError
+
+
+def default_backend_name() -> str:
+    """Returns the backend named in the environment, or the one for this platform."""
+    name = os.environ.get(BACKEND_ENV)
+    if name:
+        return name
+    return "windows" if sys.platform == "win32" else "generic"
+
+
+def load_backend(name: str = None) -> Backend:
+    """
+    Imports and creates a backend by name.
+
+    Args:
+        name (str): Key of BACKENDS. Defaults to default_backend_name().
+
+    Raises:
+        ValueError: The name is not a known backend.
+    """
+    name = name or default_backend_name()
+    try:
+        path = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}', expected one of {', '.join(sorted(BACKENDS))}")
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def get_backend() -> Backend:
+    """Returns the active backend, loading the default one on first use."""
+    global _backend
+    if _backend is None:
+        _backend = load_backend()
+    return _backend
+
+
+def set_backend(backend: Backend):
+    """Replaces the active backend, e.g. with a simulated one."""
+    global _backend
+    _backend = backend
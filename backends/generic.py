@@ -0,0 +1,25 @@
+from typing import Callable, List
+
+from backends import Backend
+
+
+class GenericBackend(Backend):
+    """
+    Backend for any system monitorcontrol and keyboard support.
+
+    Both libraries are imported on first use only.
+    """
+
+    name = "generic"
+
+    def get_monitors(self) -> List:
+        from monitorcontrol import get_monitors
+        return get_monitors()
+
+    def hook_key_events(self, callback: Callable):
+        import keyboard
+        keyboard.hook(callback)
+
+    def wait_for_keys(self):
+        import keyboard
+        keyboard.wait()
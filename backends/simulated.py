@@ -0,0 +1,346 @@
+"""
+Simulated DDC/CI monitors and keyboard.
+
+Stands in for monitorcontrol and the keyboard library so the whole
+application can run, and be measured, without monitors or Windows. Select it
+with MONITOR_BRIGHTNESS_BACKEND=simulated and configure it with
+MONITOR_BRIGHTNESS_SIMULATION, e.g.
+
+    monitors=3,write_latency=40ms,write_spread=0.3,failure_rate=0.01,drop_rate=0.02,shared_bus=1
+"""
+import math
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backends import Backend
+
+SIMULATION_ENV = "MONITOR_BRIGHTNESS_SIMULATION"
+
+VCP_LUMINANCE = 0x10
+VCP_CONTRAST = 0x12
+
+
+class VCPError(Exception):
+    """Raised for a failed DDC/CI transfer, like monitorcontrol.vcp.VCPError."""
+
+
+class LatencyDistribution:
+    """
+    Log-normal call latency, the usual shape of DDC/CI timings: most calls
+    close to the median with a long tail of slow ones.
+    """
+
+    def __init__(self, median: float, spread: float = 0.0):
+        """
+        Args:
+            median (float): Median latency in seconds.
+            spread (float): Sigma of the underlying normal distribution, 0 for a fixed latency.
+        """
+        self.median = median
+        self.spread = spread
+
+    def sample(self, rng: random.Random) -> float:
+        """Returns one latency in seconds."""
+        if self.median <= 0:
+            return 0.0
+        if self.spread <= 0:
+            return self.median
+        return rng.lognormvariate(math.log(self.median), self.spread)
+
+
+class SimulationConfig:
+    """Settings of a simulated set of monitors. Latencies are in seconds."""
+
+    DEFAULTS = {
+        "monitors": 2,
+        "read_latency": 0.04,
+        "read_spread": 0.2,
+        "write_latency": 0.05,
+        "write_spread": 0.2,
+        "open_latency": 0.002,
+        "capabilities_latency": 1.0,
+        "failure_rate": 0.0,
+        "drop_rate": 0.0,
+        "shared_bus": False,
+        "seed": None,
+    }
+
+    def __init__(self, **settings):
+        unknown = set(settings) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown simulation settings: {', '.join(sorted(unknown))}")
+        values = dict(self.DEFAULTS, **settings)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def parse(cls, spec: str) -> "SimulationConfig":
+        """
+        Builds a config from a string like "monitors=3,write_latency=40ms,shared_bus=1".
+
+        Latencies accept a "ms" or "s" suffix and are taken as seconds without one.
+
+        Raises:
+            ValueError: A setting is unknown or its value is malformed.
+        """
+        settings = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, _, text = item.partition("=")
+            name, text = name.strip(), text.strip()
+            if name not in cls.DEFAULTS:
+                raise ValueError(f"Unknown simulation setting '{name}'")
+            if name in ("monitors", "seed"):
+                settings[name] = int(text)
+            elif name == "shared_bus":
+                settings[name] = text.lower() in ("1", "true", "yes", "on")
+            elif text.endswith("ms"):
+                settings[name] = float(text[:-2]) / 1000
+            else:
+                settings[name] = float(text.rstrip("s"))
+        return cls(**settings)
+
+    @classmethod
+    def from_env(cls) -> "SimulationConfig":
+        """Builds a config from MONITOR_BRIGHTNESS_SIMULATION, defaults when it is not set."""
+        return cls.parse(os.environ.get(SIMULATION_ENV, ""))
+
+
+class SimulatedBus:
+    """
+    The I2C bus one or more monitors hang off.
+
+    Only one transfer runs on a bus at a time, so monitors sharing a bus are
+    written one after another no matter how many threads write to them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.busy_time = 0.0
+
+    def transfer(self, latency: float, write: bool):
+        """Occupies the bus for `latency` seconds."""
+        with self.lock:
+            time.sleep(latency)
+        with self._counter_lock:
+            if write:
+                self.writes += 1
+            else:
+                self.reads += 1
+            self.busy_time += latency
+
+
+class SimulatedVCP:
+    """Speaks a simulated DDC/CI with the interface of monitorcontrol's VCP classes."""
+
+    def __init__(self, index: int, config: SimulationConfig, bus: SimulatedBus, rng: random.Random):
+        self.index = index
+        self.config = config
+        self.bus = bus
+        self.description = f"Simulated Monitor {index + 1}"
+        # Vendor block of an EDID for "SIM", product 0x0001 and a serial per monitor
+        packed = ((ord("S") - 64) << 10) | ((ord("I") - 64) << 5) | (ord("M") - 64)
+        self.edid = (b"\x00\xff\xff\xff\xff\xff\xff\x00" + packed.to_bytes(2, "big")
+                     + (1).to_bytes(2, "little") + (index + 1).to_bytes(4, "little"))
+        self.features: Dict[int, List[int]] = {VCP_LUMINANCE: [50, 100], VCP_CONTRAST: [75, 100]}
+        self.codes = (0x02, 0x04, 0x05, 0x08, VCP_LUMINANCE, VCP_CONTRAST, 0x14, 0x60, 0xD6, 0xDF)
+        self.write_log: List[Tuple[float, int, int]] = []  # (time.perf_counter(), code, value) of applied writes
+        self.dropped = 0
+        self.failures = 0
+        self._rng = rng
+        self._rng_lock = threading.Lock()
+        self._read_latency = LatencyDistribution(config.read_latency, config.read_spread)
+        self._write_latency = LatencyDistribution(config.write_latency, config.write_spread)
+        self._open = 0
+
+    def __enter__(self):
+        time.sleep(self.config.open_latency)
+        self._open += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._open -= 1
+        return False
+
+    def _roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _sample(self, distribution: LatencyDistribution) -> float:
+        with self._rng_lock:
+            return distribution.sample(self._rng)
+
+    def _check(self, code: int):
+        if self._open <= 0:
+            raise AssertionError("This function must be run within the context manager")
+        if code not in self.codes:
+            raise VCPError(f"VCP code 0x{code:02X} is not supported")
+
+    def get_vcp_feature(self, code: int) -> Tuple[int, int]:
+        self._check(code)
+        self.bus.transfer(self._sample(self._read_latency), write=False)
+        if self._roll() < self.config.failure_rate:
+            self.failures += 1
+            raise VCPError("Failed to get VCP feature: checksum mismatch")
+        current, maximum = self.features.get(code, (0, 100))
+        return current, maximum
+
+    def set_vcp_feature(self, code: int, value: int):
+        self._check(code)
+        self.bus.transfer(self._sample(self._write_latency), write=True)
+        if self._roll() < self.config.failure_rate:
+            self.failures += 1
+            raise VCPError("Failed to set VCP feature: no acknowledge")
+        if self._roll() < self.config.drop_rate:
+            # The monitor acknowledged the write but ignored it
+            self.dropped += 1
+            return
+        self.features.setdefault(code, [0, 100])[0] = value
+        self.write_log.append((time.perf_counter(), code, value))
+
+    def get_vcp_capabilities(self) -> str:
+        if self._open <= 0:
+            raise AssertionError("This function must be run within the context manager")
+        time.sleep(self.config.capabilities_latency)
+        codes = " ".join(f"{code:02X}" for code in self.codes)
+        return f"(prot(monitor)type(lcd)model(SIM{self.index + 1})cmds(01 02 03 07 0C F3)vcp({codes})mccs_ver(2.1))"
+
+
+class SimulatedMonitor:
+    """A monitor with the interface of monitorcontrol's Monitor."""
+
+    def __init__(self, vcp: SimulatedVCP):
+        self.vcp = vcp
+
+    def __enter__(self):
+        self.vcp.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.vcp.__exit__(exc_type, exc_value, traceback)
+
+    def get_luminance(self) -> int:
+        return self.vcp.get_vcp_feature(VCP_LUMINANCE)[0]
+
+    def set_luminance(self, value: int):
+        self.vcp.set_vcp_feature(VCP_LUMINANCE, value)
+
+    def get_contrast(self) -> int:
+        return self.vcp.get_vcp_feature(VCP_CONTRAST)[0]
+
+    def set_contrast(self, value: int):
+        self.vcp.set_vcp_feature(VCP_CONTRAST, value)
+
+
+class SimulatedKeyEvent:
+    """The parts of a keyboard.KeyboardEvent the application looks at."""
+
+    def __init__(self, name: str, event_type: str = "down"):
+        self.name = name
+        self.event_type = event_type
+        self.time = time.time()
+
+
+class SimulatedBackend(Backend):
+    """
+    Backend with simulated monitors and a keyboard driven by `press`, `key_down` and `key_up`.
+
+    The same monitor objects are returned by every get_monitors call, like
+    monitors that stay connected, until `set_monitor_count` changes them.
+    """
+
+    name = "simulated"
+
+    def __init__(self, config: Optional[SimulationConfig] = None):
+        """
+        Args:
+            config (SimulationConfig): The simulated setup. Defaults to the environment.
+        """
+        self.config = config if config is not None else SimulationConfig.from_env()
+        self.rng = random.Random(self.config.seed)
+        self.buses: List[SimulatedBus] = []
+        self.monitors: List[SimulatedMonitor] = []
+        self.set_monitor_count(self.config.monitors)
+
+        self._event_callbacks: List[Callable] = []
+        self._keys_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.locked = False
+
+    def set_monitor_count(self, count: int):
+        """Connects or disconnects simulated monitors, keeping the first ones."""
+        if self.config.shared_bus and not self.buses:
+            self.buses.append(SimulatedBus())
+        while len(self.monitors) < count:
+            if self.config.shared_bus:
+                bus = self.buses[0]
+            else:
+                bus = SimulatedBus()
+                self.buses.append(bus)
+            index = len(self.monitors)
+            rng = random.Random(self.rng.random())
+            self.monitors.append(SimulatedMonitor(SimulatedVCP(index, self.config, bus, rng)))
+        del self.monitors[count:]
+
+    def get_monitors(self) -> List:
+        return list(self.monitors)
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the bus traffic and fault counts summed over all monitors."""
+        return {
+            "bus_reads": sum(bus.reads for bus in self.buses),
+            "bus_writes": sum(bus.writes for bus in self.buses),
+            "bus_busy_time": sum(bus.busy_time for bus in self.buses),
+            "applied": sum(len(monitor.vcp.write_log) for monitor in self.monitors),
+            "dropped": sum(monitor.vcp.dropped for monitor in self.monitors),
+            "failures": sum(monitor.vcp.failures for monitor in self.monitors),
+        }
+
+    def is_session_locked(self) -> bool:
+        return self.locked
+
+    def hook_key_events(self, callback: Callable):
+        with self._keys_lock:
+            self._event_callbacks.append(callback)
+
+    def wait_for_keys(self):
+        self._stop.wait()
+
+    def key_down(self, key: str):
+        """
+        Presses a key, or repeats it if it is already held, like keyboard auto-repeat.
+
+        The hook callbacks run on the calling thread, like the keyboard
+        library runs them on its hook thread.
+        """
+        with self._keys_lock:
+            callbacks = list(self._event_callbacks)
+        event = SimulatedKeyEvent(key, "down")
+        for callback in callbacks:
+            callback(event)
+
+    def key_up(self, key: str):
+        """Releases a key."""
+        with self._keys_lock:
+            callbacks = list(self._event_callbacks)
+        event = SimulatedKeyEvent(key, "up")
+        for callback in callbacks:
+            callback(event)
+
+    def press(self, *keys: str):
+        """Presses the given keys one after another and releases them in reverse order."""
+        try:
+            for key in keys:
+                self.key_down(key)
+        finally:
+            for key in reversed(keys):
+                self.key_up(key)
+
+    def stop(self):
+        """Makes wait_for_keys return."""
+        self._stop.set()
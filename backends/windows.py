@@ -0,0 +1,194 @@
+import ctypes
+import logging
+import os
+import sys
+from ctypes import wintypes
+from typing import Callable, List, Optional
+
+from backends import CLOCK_CHANGED, SYSTEM_RESUMED
+from backends.generic import GenericBackend
+
+DESKTOP_SWITCHDESKTOP = 0x0100
+WM_TIMECHANGE = 0x001E
+WM_POWERBROADCAST = 0x0218
+PBT_APMRESUMESUSPEND = 0x0007
+PBT_APMRESUMEAUTOMATIC = 0x0012
+EDD_GET_DEVICE_INTERFACE_NAME = 0x00000001  # EnumDisplayDevices returns the device interface path as DeviceID
+DISPLAY_DEVICE_ACTIVE = 0x00000001
+DISPLAY_ENUM_KEY = r"SYSTEM\CurrentControlSet\Enum\DISPLAY"  # monitors keep their EDID under <model>\<instance>\Device Parameters
+
+logger = logging.getLogger(__name__)
+
+
+class MONITORINFOEXW(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("rcMonitor", wintypes.RECT),
+        ("rcWork", wintypes.RECT),
+        ("dwFlags", wintypes.DWORD),
+        ("szDevice", wintypes.WCHAR * 32),
+    ]
+
+
+class DISPLAY_DEVICEW(ctypes.Structure):
+    _fields_ = [
+        ("cb", wintypes.DWORD),
+        ("DeviceName", wintypes.WCHAR * 32),
+        ("DeviceString", wintypes.WCHAR * 128),
+        ("StateFlags", wintypes.DWORD),
+        ("DeviceID", wintypes.WCHAR * 128),
+        ("DeviceKey", wintypes.WCHAR * 128),
+    ]
+
+
+def read_edid(interface_path: str) -> Optional[bytes]:
+    """
+    Reads a monitor's EDID from the registry.
+
+    Args:
+        interface_path (str): Device interface path of the monitor, like
+            "\\\\?\\DISPLAY#DEL4100#5&1a2b3c&0&UID4352#{e6f07b5f-...}".
+
+    Returns:
+        The raw EDID, or None when the path is malformed or the value is missing.
+    """
+    import winreg
+
+    parts = interface_path.split("#")
+    if len(parts) < 3:
+        return None
+    key_path = "\\".join((DISPLAY_ENUM_KEY, parts[1], parts[2], "Device Parameters"))
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
+            value, _ = winreg.QueryValueEx(key, "EDID")
+    except OSError:
+        return None
+    return bytes(value) if value else None
+
+
+def display_edids(hmonitor) -> List[Optional[bytes]]:
+    """Returns the EDIDs of the active monitors that make up a display, in enumeration order."""
+    user32 = ctypes.windll.user32
+    info = MONITORINFOEXW()
+    info.cbSize = ctypes.sizeof(info)
+    if not user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+        return []
+    edids = []
+    device = DISPLAY_DEVICEW()
+    device.cb = ctypes.sizeof(device)
+    index = 0
+    while user32.EnumDisplayDevicesW(info.szDevice, index, ctypes.byref(device), EDD_GET_DEVICE_INTERFACE_NAME):
+        if device.StateFlags & DISPLAY_DEVICE_ACTIVE:
+            edids.append(read_edid(device.DeviceID))
+        index += 1
+    return edids
+
+
+class WindowsBackend(GenericBackend):
+    """
+    Backend for Windows.
+
+    Adds the administrator check and console hiding on top of the generic
+    backend. winreg and pywin32 are imported on first use only.
+    """
+
+    name = "windows"
+
+    def get_monitors(self) -> List:
+        """
+        Returns the monitors with their EDID attached as `edid`.
+
+        The Windows VCP only knows a monitor's description, so the EDID is
+        looked up in the registry for every display in the order
+        monitorcontrol enumerates them. A display whose physical monitors do
+        not match its active display devices one to one gets no EDID, and its
+        monitors are identified by their description instead.
+        """
+        from monitorcontrol.vcp.vcp_windows import WindowsVCP
+
+        monitors = super().get_monitors()
+        try:
+            edids = []
+            for hmonitor in WindowsVCP._get_hmonitors():
+                count = wintypes.DWORD()
+                if not ctypes.windll.dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR(hmonitor, ctypes.byref(count)):
+                    count.value = 0
+                found = display_edids(hmonitor)
+                edids.extend(found if len(found) == count.value else [None] * count.value)
+        except Exception as e:
+            logger.debug("Failed to read monitor EDIDs: %s", e)
+            return monitors
+        if len(edids) != len(monitors):
+            logger.debug("Found %d EDIDs for %d monitors, ignoring them", len(edids), len(monitors))
+            return monitors
+        for monitor, edid in zip(monitors, edids):
+            monitor.edid = edid
+        return monitors
+
+    def ensure_admin(self, app_name: str, on_error: Callable[[str], None]):
+        """
+        Checks if the current process has administrator privileges on Windows.
+        If not, attempts to restart the script with admin rights.
+        Ensures this request happens only once by setting a registry key.
+        """
+        import winreg
+
+        try:
+            is_admin = ctypes.windll.shell32.IsUserAnAdmin()
+        except Exception as e:
+            is_admin = False
+
+        if not is_admin:
+            # Check if admin has been requested before
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software", 0, winreg.KEY_READ | winreg.KEY_WRITE)
+            try:
+                winreg.OpenKey(key, app_name)
+                admin_requested = True
+            except FileNotFoundError:
+                admin_requested = False
+
+            if not admin_requested:
+                try:
+                    ctypes.windll.shell32.ShellExecuteW(
+                        None, "runas",
+                        sys.executable,
+                        " ".join([os.path.abspath(sys.argv[0])] + sys.argv[1:]),
+                        None, 1
+                    )
+                    # Set registry key to indicate admin has been requested
+                    app_key = winreg.CreateKey(key, app_name)
+                    winreg.SetValueEx(app_key, "AdminRequested", 0, winreg.REG_SZ, "True")
+                    winreg.CloseKey(app_key)
+                except Exception as e:
+                    on_error("Administrator privileges are required to run this application.")
+                sys.exit()
+
+    def hide_console(self):
+        """Hide the console window"""
+        import win32con
+        import win32gui
+
+        window = win32gui.GetForegroundWindow()
+        win32gui.ShowWindow(window, win32con.SW_HIDE)
+
+    def system_event(self, event_type: bytes, message) -> Optional[str]:
+        """Top-level windows are sent WM_POWERBROADCAST after sleep and WM_TIMECHANGE when the clock is set."""
+        if event_type != b"windows_generic_MSG":
+            return None
+        msg = wintypes.MSG.from_address(int(message))
+        if msg.message == WM_TIMECHANGE:
+            return CLOCK_CHANGED
+        if msg.message == WM_POWERBROADCAST and msg.wParam in (PBT_APMRESUMESUSPEND, PBT_APMRESUMEAUTOMATIC):
+            return SYSTEM_RESUMED
+        return None
+
+    def is_session_locked(self) -> bool:
+        """The input desktop of a locked session is the secure desktop, which cannot be switched to."""
+        user32 = ctypes.windll.user32
+        desktop = user32.OpenInputDesktop(0, False, DESKTOP_SWITCHDESKTOP)
+        if not desktop:
+            return True
+        try:
+            return not user32.SwitchDesktop(desktop)
+        finally:
+            user32.CloseDesktop(desktop)
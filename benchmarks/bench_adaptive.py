@@ -0,0 +1,192 @@
+"""
+Feeds synthetic frames to content-adaptive brightness and checks its output, cost and CPU budget.
+
+Steps:
+
+  statistics: NumPy luminance of a downsampled and of a full HD frame, against a per-pixel Python loop
+  content:    sequences of white, black, scrolling text and flickering frames through the ContentAnalyzer,
+              counting the brightness writes the hysteresis lets through
+  pipeline:   a ContentAdaptiveBrightness with a synthetic source under Qt's offscreen platform,
+              measuring the time spent on the GUI thread and the CPU share of the analysis
+  budget:     the same with full HD frames that are expensive to analyze, the interval has to stretch
+  hold:       a manual change holds the frames off, and an enumeration after it does not cut the hold short
+  grab:       one real screen grab, scaled down and analyzed
+
+Exits with 1 when a sequence ends at the wrong brightness or writes more often
+than it should, the analysis exceeds its CPU budget, or the statistics differ
+from the reference.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_adaptive.py --seconds 3
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from adaptive import LUMA_WEIGHTS, SAMPLE_WIDTH, AdaptiveConfig, ContentAnalyzer, frame_statistics
+
+BUDGET_TOLERANCE = 1.5  # the first frame is analyzed before the analyzer knows its cost
+
+
+def python_statistics(frame):
+    """Per-pixel reference of frame_statistics."""
+    values = sorted(sum(weight * pixel[channel] / 255.0 for channel, weight in enumerate(LUMA_WEIGHTS))
+                    for row in frame.tolist() for pixel in row)
+    return sum(values) / len(values), values[min(len(values) - 1, int(len(values) * 0.9))]
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def solid(value: int, height: int = 36, width: int = SAMPLE_WIDTH):
+    return numpy.full((height, width, 3), value, numpy.uint8)
+
+
+def text_page(rng, offset: int, height: int = 36, width: int = SAMPLE_WIDTH):
+    """A white page with lines of dark text, scrolled by `offset` rows."""
+    frame = solid(235, height, width)
+    for row in range(height):
+        if (row + offset) % 3 == 0:
+            frame[row, rng.random(width) < 0.4] = 20
+    return frame
+
+
+def run_sequence(config: AdaptiveConfig, frames):
+    """Returns the writes a sequence of frames causes and the brightness it ends at."""
+    analyzer = ContentAnalyzer(config)
+    writes = [level for level in (analyzer.analyze(frame) for frame in frames) if level is not None]
+    return writes, analyzer.filter.output
+
+
+def run_pipeline(app, config: AdaptiveConfig, source, seconds: float):
+    """Runs a ContentAdaptiveBrightness on `source` and returns it with the elapsed time and GUI thread time."""
+    adaptive = modules.ContentAdaptiveBrightness(ContentAnalyzer(config), source)
+    targets = []
+    adaptive.target_changed.connect(targets.append)
+    gui_time = []
+    capture = adaptive.capture
+
+    def timed_capture():
+        start = time.perf_counter()
+        capture()
+        gui_time.append(time.perf_counter() - start)
+    adaptive.timer.timeout.disconnect()
+    adaptive.timer.timeout.connect(timed_capture)
+    adaptive.start()
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        time.sleep(0.002)
+    adaptive.shutdown(wait=True)
+    app.processEvents()
+    return adaptive, targets, time.perf_counter() - start, gui_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check content-adaptive brightness with synthetic frames")
+    parser.add_argument("--seconds", type=float, default=3, help="Duration of each pipeline run")
+    parser.add_argument("--interval", type=float, default=50, help="Frame interval of the pipeline run in ms")
+    parser.add_argument("--budget", type=float, default=0.01, help="CPU budget as a share of one core")
+    args = parser.parse_args()
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    rng = numpy.random.default_rng(1)
+    failed = []
+
+    # statistics
+    small = rng.integers(0, 256, (36, SAMPLE_WIDTH, 3), numpy.uint8)
+    full = rng.integers(0, 256, (1080, 1920, 3), numpy.uint8)
+    reference = python_statistics(small)
+    statistics = frame_statistics(small)
+    print(f"statistics: {SAMPLE_WIDTH}x36 numpy {1e6 * timed(lambda: frame_statistics(small), 200):.1f} us, "
+          f"python loop {1e6 * timed(lambda: python_statistics(small), 3):.0f} us, "
+          f"1920x1080 numpy {1e3 * timed(lambda: frame_statistics(full), 3):.1f} ms")
+    if abs(statistics.mean - reference[0]) > 1e-4 or abs(statistics.percentile - reference[1]) > 1e-4:
+        failed.append(f"statistics {tuple(statistics)} differ from the reference {reference}")
+
+    # content
+    config = AdaptiveConfig()
+    sequences = {
+        "white": ([solid(255)] * 20, config.bright, 3),
+        "black": ([solid(0)] * 20, config.dark, 3),
+        "to white": ([solid(0)] * 20 + [solid(255)] * 40, config.bright, 6),
+        "text": ([text_page(rng, offset) for offset in range(60)], None, 1),
+        "flicker": ([solid(255 * (n % 2)) for n in range(60)], None, 3),
+    }
+    print(f"{'content':>10} {'frames':>6} {'writes':>6} {'ends at':>7}")
+    for name, (frames, expected, max_writes) in sequences.items():
+        writes, level = run_sequence(config, frames)
+        print(f"{name:>10} {len(frames):>6} {len(writes):>6} {level:>7}")
+        if len(writes) > max_writes or (expected is not None and level != expected):
+            failed.append(f"{name}: {len(writes)} writes ending at {level}, expected at most {max_writes}"
+                          + (f" ending at {expected}" if expected is not None else ""))
+
+    # pipeline and budget
+    runs = {
+        "pipeline": (lambda: sequences["text"][0][int(time.perf_counter() * 10) % 60], False),
+        "budget": (lambda: full, True),
+    }
+    pipeline_config = AdaptiveConfig(interval=args.interval / 1000, budget=args.budget)
+    print(f"{'run':>10} {'frames':>6} {'targets':>7} {'gui ms':>6} {'cpu share':>9} {'interval s':>10}")
+    for name, (source, stretched) in runs.items():
+        adaptive, targets, elapsed, gui_time = run_pipeline(app, pipeline_config, source, args.seconds)
+        analyzer = adaptive.analyzer
+        share = analyzer.cpu_time / elapsed
+        print(f"{name:>10} {analyzer.frames:>6} {len(targets):>7} {1000 * max(gui_time):>6.2f} "
+              f"{100 * share:>8.2f}% {analyzer.next_interval():>10.3f}")
+        if adaptive.errors or not analyzer.frames:
+            failed.append(f"{name}: {analyzer.frames} frames analyzed, {adaptive.errors} errors")
+        if share > args.budget * BUDGET_TOLERANCE and analyzer.frames > 1:
+            failed.append(f"{name}: the analysis used {100 * share:.2f}% of a core, budget {100 * args.budget:.2f}%")
+        if stretched and analyzer.next_interval() <= pipeline_config.interval:
+            failed.append(f"{name}: the interval did not stretch for expensive frames")
+
+    # hold
+    grabs = []
+    adaptive = modules.ContentAdaptiveBrightness(ContentAnalyzer(pipeline_config),
+                                                 lambda: grabs.append(time.perf_counter()) or solid(255))
+    adaptive.start()
+    while not grabs:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+    adaptive.note_override()
+    held = len(grabs)
+    adaptive.start()  # a monitor was plugged in
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.5:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        time.sleep(0.002)
+    remaining = adaptive.timer.remainingTime()
+    adaptive.shutdown(wait=True)
+    print(f"hold: {len(grabs) - held} frames grabbed during the hold, {remaining / 1000:.0f} s of it left")
+    if len(grabs) > held or remaining < modules.ADAPTIVE_HOLD - 1000:
+        failed.append("an enumeration cut the hold after a manual change short")
+
+    # grab
+    image = modules.grab_screen()
+    if image.isNull():
+        print(f"grab: {app.platformName()} cannot grab the screen, skipped")
+    else:
+        frame = modules.image_to_array(image)
+        print(f"grab: {image.width()}x{image.height()} scaled to {frame.shape[1]}x{frame.shape[0]}, "
+              f"{frame_statistics(frame, modules.FRAME_CHANNELS)}")
+
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
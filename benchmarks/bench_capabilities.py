@@ -0,0 +1,142 @@
+"""
+Measures reading brightness, contrast and maximum luminance with and without the capabilities layer.
+
+Fake monitors take --caps-latency to answer a capabilities query, --latency
+per VCP read and --open-latency per handle open. One monitor does not
+support contrast and one does not support luminance at all.
+
+  naive: query the capabilities and open the monitor once per code, at every start
+  cold:  first start with the capabilities layer, capabilities queried and cached on disk
+  warm:  next start, capabilities come from the state file
+
+Exits with 1 when the capabilities layer opens a monitor more than once,
+queries capabilities again on the warm start, or finds a different number
+of controllable monitors than the naive reads.
+
+Usage:
+    python benchmarks/bench_capabilities.py --monitors 4 --caps-latency 1500 --latency 40
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core
+from capabilities import VCP_CONTRAST, VCP_LUMINANCE, MonitorCapabilities, UnsupportedVCPCode, parse_vcp_codes
+from handle_pool import MonitorHandlePool
+from state_cache import BrightnessStateCache
+from bench_fanout import FakeMonitor, FakeVCP
+
+
+class CountingMonitor(FakeMonitor):
+    """Fake monitor that counts handle opens and VCP reads."""
+
+    def __init__(self, latency: float, open_latency: float, caps_latency: float, codes):
+        super().__init__(latency)
+        self.open_latency = open_latency
+        self.vcp = FakeVCP(self, codes=codes, capabilities_latency=caps_latency)
+        self.opens = 0
+
+    def __enter__(self):
+        self.opens += 1
+        time.sleep(self.open_latency)
+        return self
+
+
+def make_monitors(count: int, latency: float, open_latency: float, caps_latency: float) -> dict:
+    monitors = {}
+    for n in range(count):
+        codes = {0x02, 0x04, 0x10, 0x12, 0x60}
+        if n == 1:
+            codes.discard(0x12)  # no contrast
+        if n == 2:
+            codes.discard(0x10)  # no brightness control at all
+        monitors[f"edid:FAK-0001-{n:08X}"] = CountingMonitor(latency, open_latency, caps_latency, codes)
+    return monitors
+
+
+def run_naive(monitors: dict) -> int:
+    controllable = 0
+    for monitor in monitors.values():
+        with monitor:
+            codes = parse_vcp_codes(monitor.vcp.get_vcp_capabilities())
+        values = {}
+        for code in (VCP_LUMINANCE, VCP_CONTRAST):
+            if code in codes:
+                with monitor:
+                    values[code] = monitor.vcp.get_vcp_feature(code)
+        controllable += VCP_LUMINANCE in values
+    return controllable
+
+
+def run_layer(monitors: dict, state_path: str) -> int:
+    state = BrightnessStateCache(state_path)
+    core.monitor_capabilities = MonitorCapabilities(state)
+    handles = MonitorHandlePool()
+    handles.set_monitors(monitors)
+    controllable = 0
+    for monitor_id in monitors:
+        try:
+            core.ReadMonitorState(monitor_id, handles)
+            controllable += 1
+        except UnsupportedVCPCode:
+            pass
+    handles.close_all()
+    state.close()
+    return controllable
+
+
+def measure(name: str, monitors: dict, run) -> dict:
+    for monitor in monitors.values():
+        monitor.opens = 0
+        monitor.vcp.capability_queries = 0
+    start = time.perf_counter()
+    controllable = run(monitors)
+    elapsed = time.perf_counter() - start
+    queries = sum(monitor.vcp.capability_queries for monitor in monitors.values())
+    opens = sum(monitor.opens for monitor in monitors.values())
+    print(f"  {name:6} {1000 * elapsed:8.1f} ms, {queries} capability queries, "
+          f"{opens:2d} handle opens, {controllable} controllable")
+    return {"queries": queries, "opens": max(monitor.opens for monitor in monitors.values()),
+            "controllable": controllable}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached capabilities and batched VCP reads")
+    parser.add_argument("--monitors", type=int, default=4, help="Number of fake monitors (at least 3)")
+    parser.add_argument("--caps-latency", type=float, default=1500, help="Capabilities query time in milliseconds")
+    parser.add_argument("--latency", type=float, default=40, help="Time per VCP read in milliseconds")
+    parser.add_argument("--open-latency", type=float, default=5, help="Time per handle open in milliseconds")
+    args = parser.parse_args()
+
+    monitors = make_monitors(max(3, args.monitors), args.latency / 1000, args.open_latency / 1000,
+                             args.caps_latency / 1000)
+    state_path = os.path.join(tempfile.mkdtemp(), "state.json")
+
+    print(f"{len(monitors)} monitors, {args.caps_latency:.0f} ms capabilities query, "
+          f"{args.latency:.0f} ms per read, {args.open_latency:.0f} ms per open")
+    naive = measure("naive", monitors, run_naive)
+    cold = measure("cold", monitors, lambda m: run_layer(m, state_path))
+    warm = measure("warm", monitors, lambda m: run_layer(m, state_path))
+
+    failed = []
+    for name, result in (("cold", cold), ("warm", warm)):
+        if result["opens"] > 1:
+            failed.append(f"{name}: a monitor was opened {result['opens']} times, its codes must be read in one open")
+        if result["controllable"] != naive["controllable"]:
+            failed.append(f"{name}: {result['controllable']} controllable monitors, "
+                          f"the naive reads found {naive['controllable']}")
+    if cold["queries"] > len(monitors):
+        failed.append(f"cold: {cold['queries']} capability queries for {len(monitors)} monitors")
+    if warm["queries"]:
+        failed.append(f"warm: {warm['queries']} capability queries, they should come from the state file")
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
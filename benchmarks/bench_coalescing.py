@@ -0,0 +1,72 @@
+"""
+Feeds a burst of key repeats through BrightnessWriter.post.
+
+Reports how long each post takes on the calling thread and how many of the
+posted values actually reached the fake monitors.
+
+Exits with 1 when a monitor does not end at the last posted value, or when
+a monitor was written less than once or more than --max-writes times.
+
+Usage:
+    python benchmarks/bench_coalescing.py --repeats 30 --interval 0 --latency 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import BrightnessWriter
+from bench_fanout import FakeMonitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the coalescing write queue")
+    parser.add_argument("--monitors", type=int, default=2, help="Number of fake monitors")
+    parser.add_argument("--repeats", type=int, default=30, help="Number of key repeats in the burst")
+    parser.add_argument("--interval", type=float, default=0, help="Milliseconds between key repeats")
+    parser.add_argument("--latency", type=float, default=50, help="Write latency per monitor in milliseconds")
+    parser.add_argument("--max-writes", type=int, default=3, help="Allowed writes per monitor for the whole burst")
+    args = parser.parse_args()
+
+    monitors = [FakeMonitor(args.latency / 1000) for _ in range(args.monitors)]
+    writer = BrightnessWriter(monitors=monitors)
+
+    post_times = []
+    value = None
+    for i in range(args.repeats):
+        value = min(100, 10 + i)
+        start = time.perf_counter()
+        writer.post({idx: value for idx in range(len(monitors))})
+        post_times.append(time.perf_counter() - start)
+        if args.interval:
+            time.sleep(args.interval / 1000)
+
+    while writer.queue.is_busy():
+        time.sleep(0.001)
+    writer.shutdown(wait=True)
+
+    counters = writer.counters()
+    post_times.sort()
+    print(f"{args.repeats} repeats every {args.interval:.0f} ms, {args.monitors} monitors, {args.latency:.0f} ms per write")
+    print(f"  post p50:  {1e6 * post_times[len(post_times) // 2]:8.1f} us")
+    print(f"  post max:  {1e6 * post_times[-1]:8.1f} us")
+    print(f"  submitted: {counters['submitted']:5d}")
+    print(f"  coalesced: {counters['coalesced']:5d}")
+    print(f"  applied:   {counters['applied']:5d} ({counters['applied'] / args.monitors:.1f} per monitor)")
+    print(f"  final:     {[monitor.luminance for monitor in monitors]}")
+
+    failed = False
+    if any(monitor.luminance != value for monitor in monitors):
+        print(f"FAIL: the monitors did not end at the last posted value {value}")
+        failed = True
+    per_monitor = counters["applied"] / args.monitors
+    if not 1 <= per_monitor <= args.max_writes:
+        print(f"FAIL: {per_monitor:.1f} writes per monitor, expected 1 to {args.max_writes}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
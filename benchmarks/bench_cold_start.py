@@ -0,0 +1,132 @@
+"""
+Measures the cold start and memory of the application as a separate process.
+
+Launches monitor.py, or a built executable with --exe, with simulated
+monitors under Qt's offscreen platform, and asks it over its command socket
+when it is up:
+
+  ready:     the command server answers, the tray icon and slider exist
+  monitors:  every simulated monitor is listed with its brightness
+  rss:       resident memory once the monitors are ready, and the peak where the system reports it
+  modules:   Python modules imported at startup (unbundled only, from -X importtime)
+
+Every run starts a new process with an empty state directory. Exits with 1
+when the application does not come up within --timeout.
+
+Usage:
+    python benchmarks/bench_cold_start.py --runs 5
+    python benchmarks/bench_cold_start.py --exe dist/MonitorBrightness/MonitorBrightness.exe
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ipc import IPC_ADDRESS_ENV, IPCClient, IPCError
+
+POLL_INTERVAL = 0.005  # seconds
+
+
+def memory(pid: int):
+    """Returns the resident and peak resident memory of a process in MB, None where it is not available."""
+    try:
+        import psutil
+
+        info = psutil.Process(pid).memory_info()
+        peak = getattr(info, "peak_wset", None)
+        return info.rss / 2**20, None if peak is None else peak / 2**20
+    except ImportError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def run(command, monitors: int, timeout: float, importtime: bool):
+    """Starts the application once, returns its startup times in seconds, memory in MB and imported modules."""
+    workdir = tempfile.mkdtemp()
+    address = os.path.join(workdir, "ipc.sock") if sys.platform != "win32" else rf"\\.\pipe\bench-cold-start-{os.getpid()}"
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", MONITOR_BRIGHTNESS_BACKEND="simulated",
+               MONITOR_BRIGHTNESS_SIMULATION=f"monitors={monitors},capabilities_latency=0,seed=1",
+               APPDATA=workdir, **{IPC_ADDRESS_ENV: address})
+    if importtime:
+        env["PYTHONPROFILEIMPORTTIME"] = "1"
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, cwd=ROOT, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE if importtime else subprocess.DEVNULL)
+    ready = listed = None
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline and process.poll() is None:
+            try:
+                with IPCClient(address, timeout=1.0) as client:
+                    if ready is None:
+                        client.request({"cmd": "ping"})
+                        ready = time.perf_counter() - start
+                    response = client.request({"cmd": "list"})
+                if len(response["monitors"]) == monitors and \
+                        all(monitor["brightness"] is not None for monitor in response["monitors"]):
+                    listed = time.perf_counter() - start
+                    break
+            except IPCError:
+                pass
+            time.sleep(POLL_INTERVAL)
+        rss, peak = memory(process.pid)
+    finally:
+        process.terminate()
+        try:
+            _, stderr = process.communicate(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            _, stderr = process.communicate()
+    modules = None
+    if importtime and stderr:
+        modules = sum(1 for line in stderr.decode(errors="replace").splitlines() if line.startswith("import time:")) - 1
+    return ready, listed, rss, peak, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and memory of the application")
+    parser.add_argument("--runs", type=int, default=5, help="Number of launches")
+    parser.add_argument("--monitors", type=int, default=2, help="Number of simulated monitors")
+    parser.add_argument("--exe", help="Built executable to launch instead of monitor.py")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for the application to come up")
+    args = parser.parse_args()
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, os.path.join(ROOT, "monitor.py")]
+    print(f"{' '.join(command)}, {args.monitors} simulated monitors")
+    print(f"{'run':>4} {'ready ms':>9} {'monitors ms':>12} {'rss MB':>7} {'peak MB':>8} {'modules':>8}")
+    results = []
+    for number in range(1, args.runs + 1):
+        result = run(command, args.monitors, args.timeout, importtime=not args.exe)
+        ready, listed, rss, peak, modules = result
+        cells = [f"{1000 * ready:>9.0f}" if ready is not None else f"{'-':>9}",
+                 f"{1000 * listed:>12.0f}" if listed is not None else f"{'-':>12}",
+                 f"{rss:>7.1f}" if rss is not None else f"{'-':>7}",
+                 f"{peak:>8.1f}" if peak is not None else f"{'-':>8}",
+                 f"{modules:>8}" if modules is not None else f"{'-':>8}"]
+        print(f"{number:>4} " + " ".join(cells))
+        results.append(result)
+
+    complete = [result for result in results if result[1] is not None]
+    if complete:
+        print(f"median: ready {1000 * statistics.median(r[0] for r in complete):.0f} ms, "
+              f"monitors {1000 * statistics.median(r[1] for r in complete):.0f} ms"
+              + (f", rss {statistics.median(r[2] for r in complete):.1f} MB" if complete[0][2] is not None else ""))
+    if len(complete) < len(results):
+        print(f"FAIL: {len(results) - len(complete)} of {len(results)} launches did not come up within {args.timeout:.0f} s")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Counts the writes each monitor receives, to check that unchanged monitors are never touched.
+
+Runs the real BrightnessSlider and BrightnessWriter under Qt's offscreen
+platform against simulated monitors and counts the writes that reach each
+monitor in these steps:
+
+  same value:  the slider is applied again at the value every monitor already has
+  one monitor: the sun icon is clicked once and the slider dragged, only the first monitor may be written
+  hotkey:      the monitors are at different levels and Ctrl+Up is pressed, each must step from its own level
+  failure:     every write to the second monitor fails while all are dragged, it must stay dirty
+  retry:       the slider is applied again at the same value, only the failed monitor may be written
+
+Exits with 1 when any monitor receives a write it should not, or misses one.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_dirty_writes.py --monitors 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulationConfig, VCP_LUMINANCE
+
+SETTLE_TIMEOUT = 5.0  # seconds
+
+
+def settle(app: QtWidgets.QApplication, slider: modules.BrightnessSlider):
+    """Runs the event loop until no ramp or write is pending."""
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        if not slider.transitions.engine.is_active() and not slider.writer.queue.is_busy():
+            break
+        time.sleep(0.001)
+    app.processEvents()
+
+
+def drag(app, slider: modules.BrightnessSlider, start: int, end: int):
+    """Moves the slider one value per step from `start` to `end`."""
+    step = 1 if end >= start else -1
+    for value in range(start, end + step, step):
+        slider.slider.setValue(value)
+        app.processEvents()
+        time.sleep(0.002)
+    settle(app, slider)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count monitor writes with dirty tracking")
+    parser.add_argument("--monitors", type=int, default=3, help="Number of simulated monitors")
+    parser.add_argument("--write-latency", type=float, default=5, help="Median write latency in milliseconds")
+    args = parser.parse_args()
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    config = SimulationConfig(monitors=args.monitors, read_latency=0.001, write_latency=args.write_latency / 1000,
+                              capabilities_latency=0.0, open_latency=0.0, seed=1)
+    backend = SimulatedBackend(config)
+    set_backend(backend)
+    modules.RetrieveMonitors()
+    ids = list(modules.monitor_registry.snapshot())
+
+    writer = modules.BrightnessWriter()
+    slider = modules.BrightnessSlider(writer)
+    listener = modules.KeyboardListener()
+    listener.brightness_requested.connect(slider.handle_brightness_requested)
+
+    failed = []
+    writes = lambda: [len(monitor.vcp.write_log) for monitor in backend.monitors]
+    levels = lambda: [monitor.vcp.features[VCP_LUMINANCE][0] for monitor in backend.monitors]
+
+    def check(name: str, action, expected_writes, expected_levels=None):
+        before = writes()
+        action()
+        counted = [after - earlier for after, earlier in zip(writes(), before)]
+        ok = all(expect(count) for expect, count in zip(expected_writes, counted))
+        if expected_levels is not None:
+            ok = ok and levels() == expected_levels
+        print(f"{name:12} writes {counted}, levels {levels()}, skipped {writer.skipped}")
+        if not ok:
+            failed.append(name)
+
+    any_write = lambda count: count > 0
+    no_write = lambda count: count == 0
+    one_write = lambda count: count == 1
+
+    # Bring every monitor to 50 first
+    slider.slider.setValue(0)
+    drag(app, slider, 0, 50)
+
+    check("same value", lambda: (slider.apply_brightness_change(), settle(app, slider)),
+          [no_write] * args.monitors, [50] * args.monitors)
+
+    def one_monitor():
+        slider.select_next_monitor()
+        drag(app, slider, 50, 20)
+    check("one monitor", one_monitor, [any_write] + [no_write] * (args.monitors - 1),
+          [20] + [50] * (args.monitors - 1))
+    slider.target_monitor = None
+
+    def hotkey():
+        listener.on_hotkey(1, None)
+        settle(app, slider)
+    check("hotkey", hotkey, [any_write] * args.monitors, [30] + [60] * (args.monitors - 1))
+
+    failing = backend.monitors[1].vcp
+    failing.config = SimulationConfig(**dict(vars(config), failure_rate=1.0))
+
+    def failure():
+        slider.show_slider(60)
+        settle(app, slider)
+        drag(app, slider, 60, 70)
+    check("failure", failure, [any_write, no_write] + [any_write] * (args.monitors - 2),
+          [70, 60] + [70] * (args.monitors - 2))
+    if ids[1] not in modules.monitor_registry.snapshot().dirty():
+        print("the failed monitor is not dirty")
+        failed.append("failure")
+
+    failing.config = config
+    check("retry", lambda: (slider.apply_brightness_change(), settle(app, slider)),
+          [no_write, one_write] + [no_write] * (args.monitors - 2), [70] * args.monitors)
+
+    writer.shutdown(wait=True)
+    modules.monitor_handles.close_all()
+    for name in failed:
+        print(f"FAIL: {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+End-to-end latency of slider drags and hotkey presses against simulated monitors.
+
+Runs the real BrightnessSlider, BrightnessWriter and KeyboardListener under
+Qt's offscreen platform with the simulated backend, for each monitor count:
+
+  slider: the slider is dragged across its range, one value per frame
+  hotkey: Ctrl+Up/Ctrl+Down is pressed at key-repeat rate from a hook thread
+  hold:   Ctrl+Down and Ctrl+Up are held in turns, auto-repeating after a typematic delay
+
+For every input and monitor the time until the next write reaches the monitor
+is recorded, and reported as p50/p99 together with the time until every
+monitor holds the final value, the writes still made after the last input
+(the backlog), the bus writes issued, and how long the GUI thread spent
+dispatching events (its blocking time).
+
+Exits with 1 when a scenario misses its goals: writes still pending after
+SETTLE_TIMEOUT, a monitor not holding the brightness the registry shows
+(checked without failures and dropped writes only), a p99 latency above
+--max-p99 or a GUI event that blocked longer than --max-ui-block.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_e2e.py --monitors 1,2,4,8
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_e2e.py --shared-bus --drop-rate 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulationConfig, VCP_LUMINANCE
+
+SETTLE_TIMEOUT = 5.0  # seconds
+
+
+class TimedApplication(QtWidgets.QApplication):
+    """QApplication that measures how long the GUI thread spends dispatching events."""
+
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.busy = 0.0
+        self.longest = 0.0
+        self._depth = 0
+
+    def notify(self, receiver, event):
+        if self._depth:
+            return super().notify(receiver, event)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return super().notify(receiver, event)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth -= 1
+            self.busy += elapsed
+            self.longest = max(self.longest, elapsed)
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def process_for(app: QtWidgets.QApplication, seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+
+
+def wait_until_settled(app: QtWidgets.QApplication, slider: modules.BrightnessSlider) -> float:
+    """Runs the event loop until no ramp or write is pending. Returns when that happened."""
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        if not slider.transitions.engine.is_active() and not slider.writer.queue.is_busy():
+            break
+        time.sleep(0.001)
+    return time.perf_counter()
+
+
+def drag_slider(app, slider, events: int, interval: float):
+    """Moves the slider one value per frame, bouncing between 10 and 90."""
+    inputs = []
+    value, step = 50, 2
+    for _ in range(events):
+        if not 10 <= value + step <= 90:
+            step = -step
+        value += step
+        inputs.append(time.perf_counter())
+        slider.slider.setValue(value)
+        process_for(app, interval)
+    return inputs
+
+
+def press_hotkeys(app, backend: SimulatedBackend, events: int, interval: float):
+    """Presses Ctrl+Up five times, then Ctrl+Down five times, and so on, from a hook thread."""
+    inputs = []
+
+    def hook_thread():
+        for n in range(events):
+            inputs.append(time.perf_counter())
+            backend.press("ctrl", "up" if (n // 5) % 2 == 0 else "down")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=hook_thread, name="keyboard-hook")
+    thread.start()
+    while thread.is_alive():
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+    thread.join()
+    return inputs
+
+
+def hold_hotkeys(app, backend: SimulatedBackend, events: int, interval: float, delay: float):
+    """Holds Ctrl+Down and Ctrl+Up in turns for ten presses each, from a hook thread."""
+    inputs = []
+
+    def hold(key: str, presses: int):
+        backend.key_down("ctrl")
+        for n in range(presses):
+            inputs.append(time.perf_counter())
+            backend.key_down(key)
+            time.sleep(delay if n == 0 else interval)
+        backend.key_up(key)
+        backend.key_up("ctrl")
+
+    def hook_thread():
+        for n in range(0, events, 10):
+            hold("down" if (n // 10) % 2 == 0 else "up", min(10, events - n))
+
+    thread = threading.Thread(target=hook_thread, name="keyboard-hook")
+    thread.start()
+    while thread.is_alive():
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+    thread.join()
+    return inputs
+
+
+def first_write_latencies(inputs, monitors):
+    """Time from every input to the next write each monitor received."""
+    latencies = []
+    for monitor in monitors:
+        writes = [t for t, code, value in monitor.vcp.write_log if code == VCP_LUMINANCE]
+        position = 0
+        for start in inputs:
+            while position < len(writes) and writes[position] < start:
+                position += 1
+            if position < len(writes):
+                latencies.append(writes[position] - start)
+    return latencies
+
+
+def run_scenario(name, app, backend, slider, drive):
+    for monitor in backend.monitors:
+        monitor.vcp.write_log.clear()
+    before = backend.stats()
+    busy, app.longest = app.busy, 0.0
+    start = time.perf_counter()
+
+    inputs = drive()
+    last_input = inputs[-1]
+    settled = wait_until_settled(app, slider)
+
+    elapsed = settled - start
+    stats = backend.stats()
+    writes = stats["bus_writes"] - before["bus_writes"]
+    latencies = first_write_latencies(inputs, backend.monitors)
+    late_writes = sum(1 for monitor in backend.monitors for t, code, value in monitor.vcp.write_log
+                      if code == VCP_LUMINANCE and t > last_input)
+    snapshot = modules.monitor_registry.snapshot()
+    mismatched = sum(1 for monitor_id, monitor in snapshot.monitors().items()
+                     if monitor.vcp.features[VCP_LUMINANCE][0] != snapshot.get(monitor_id).brightness)
+    return {
+        "scenario": name,
+        "inputs": len(inputs),
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "settle": settled - last_input,
+        "writes": writes,
+        "late": late_writes,
+        "rate": writes / elapsed,
+        "dropped": stats["dropped"] - before["dropped"],
+        "failed": stats["failures"] - before["failures"],
+        "ui_busy": app.busy - busy,
+        "ui_max": app.longest,
+        "elapsed": elapsed,
+        "settled": not slider.transitions.engine.is_active() and not slider.writer.queue.is_busy(),
+        "mismatched": mismatched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against simulated monitors")
+    parser.add_argument("--monitors", default="1,2,4,8", help="Comma separated monitor counts")
+    parser.add_argument("--events", type=int, default=60, help="Inputs per scenario")
+    parser.add_argument("--frame", type=float, default=16, help="Milliseconds between slider moves")
+    parser.add_argument("--key-repeat", type=float, default=33, help="Milliseconds between hotkey presses")
+    parser.add_argument("--typematic-delay", type=float, default=500, help="Milliseconds before a held key repeats")
+    parser.add_argument("--write-latency", type=float, default=50, help="Median write latency in milliseconds")
+    parser.add_argument("--read-latency", type=float, default=40, help="Median read latency in milliseconds")
+    parser.add_argument("--spread", type=float, default=0.25, help="Log-normal sigma of the latencies")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of VCP calls that fail")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of writes monitors ignore")
+    parser.add_argument("--shared-bus", action="store_true", help="Put all monitors on one bus")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--max-p99", type=float, default=1000, help="Allowed p99 latency in milliseconds")
+    parser.add_argument("--max-ui-block", type=float, default=50,
+                        help="Allowed milliseconds a single GUI event may take")
+    args = parser.parse_args()
+
+    # The offscreen platform warns about every opacity change of the fading slider
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = TimedApplication(sys.argv)
+    # Keep the real state file untouched and error dialogs from blocking the run
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    print(f"write {args.write_latency:.0f} ms, read {args.read_latency:.0f} ms, spread {args.spread}, "
+          f"failures {args.failure_rate:.0%}, dropped {args.drop_rate:.0%}, "
+          f"{'shared bus' if args.shared_bus else 'one bus per monitor'}")
+    print(f"{'monitors':>8} {'scenario':>8} {'inputs':>6} {'p50 ms':>7} {'p99 ms':>7} {'settle ms':>9} "
+          f"{'late':>4} {'writes':>6} {'writes/s':>8} {'dropped':>7} {'failed':>6} {'UI busy ms':>10} {'UI max ms':>9}")
+
+    failed = []
+    exact = not args.failure_rate and not args.drop_rate
+    for count in (int(part) for part in args.monitors.split(",")):
+        config = SimulationConfig(
+            monitors=count,
+            read_latency=args.read_latency / 1000,
+            read_spread=args.spread,
+            write_latency=args.write_latency / 1000,
+            write_spread=args.spread,
+            capabilities_latency=0.0,
+            failure_rate=args.failure_rate,
+            drop_rate=args.drop_rate,
+            shared_bus=args.shared_bus,
+            seed=args.seed,
+        )
+        backend = SimulatedBackend(config)
+        set_backend(backend)
+        modules.RetrieveMonitors()
+
+        writer = modules.BrightnessWriter()
+        slider = modules.BrightnessSlider(writer)
+        listener = modules.KeyboardListener()
+        listener.brightness_requested.connect(slider.handle_brightness_requested)
+        listener.start()
+
+        results = [
+            run_scenario("slider", app, backend, slider,
+                         lambda: drag_slider(app, slider, args.events, args.frame / 1000)),
+            run_scenario("hotkey", app, backend, slider,
+                         lambda: press_hotkeys(app, backend, args.events, args.key_repeat / 1000)),
+            run_scenario("hold", app, backend, slider,
+                         lambda: hold_hotkeys(app, backend, args.events, args.key_repeat / 1000,
+                                              args.typematic_delay / 1000)),
+        ]
+        for result in results:
+            print(f"{count:>8} {result['scenario']:>8} {result['inputs']:>6} "
+                  f"{1000 * result['p50']:>7.1f} {1000 * result['p99']:>7.1f} {1000 * result['settle']:>9.1f} "
+                  f"{result['late']:>4} {result['writes']:>6} {result['rate']:>8.1f} {result['dropped']:>7} {result['failed']:>6} "
+                  f"{1000 * result['ui_busy']:>10.1f} {1000 * result['ui_max']:>9.2f}")
+            label = f"{count} monitors, {result['scenario']}"
+            if not result["settled"]:
+                failed.append(f"{label}: writes still pending after {SETTLE_TIMEOUT:.0f} s")
+            if exact and result["mismatched"]:
+                failed.append(f"{label}: {result['mismatched']} monitors do not hold the brightness shown")
+            if 1000 * result["p99"] > args.max_p99:
+                failed.append(f"{label}: p99 latency {1000 * result['p99']:.1f} ms above {args.max_p99:.0f} ms")
+            if 1000 * result["ui_max"] > args.max_ui_block:
+                failed.append(f"{label}: a GUI event took {1000 * result['ui_max']:.1f} ms, "
+                              f"more than {args.max_ui_block:.0f} ms")
+
+        backend.stop()
+        listener.wait()
+        writer.shutdown(wait=True)
+        slider.hide()
+        slider.deleteLater()
+        app.processEvents()
+
+    modules.monitor_handles.close_all()
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
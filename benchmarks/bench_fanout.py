@@ -0,0 +1,120 @@
+"""
+Compares serial and concurrent brightness writes against fake monitors.
+
+Each fake monitor sleeps for a fixed time on every set_luminance call to
+simulate DDC/CI bus latency. The serial path is the old loop over
+ChangeBrightness, the concurrent path uses BrightnessWriter.
+
+Exits with 1 when a concurrent change takes longer than --tolerance times
+the slowest monitor, for each group of MAX_WRITE_WORKERS monitors.
+
+Usage:
+    python benchmarks/bench_fanout.py --monitors 4 --latency 50
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import MAX_WRITE_WORKERS, BrightnessWriter, SetMonitorLuminance
+
+
+class FakeVCP:
+    """Stands in for the VCP of a monitorcontrol Monitor."""
+
+    def __init__(self, monitor: "FakeMonitor", codes=(0x02, 0x04, 0x10, 0x12, 0x60),
+                 capabilities_latency: float = 0.0):
+        self.monitor = monitor
+        self.codes = set(codes)
+        self.capabilities = "(prot(monitor)type(lcd)model(FAKE)cmds(01 02 03 07 0C F3)vcp({})mccs_ver(2.1))".format(
+            " ".join("60(0F 11)" if code == 0x60 else f"{code:02X}" for code in sorted(self.codes))
+        )
+        self.capabilities_latency = capabilities_latency
+        self.capability_queries = 0
+
+    def get_vcp_feature(self, code: int):
+        if code not in self.codes:
+            raise OSError(f"VCP code 0x{code:02X} not supported")
+        if code == 0x10:
+            return self.monitor.get_luminance(), 100
+        time.sleep(self.monitor.latency)
+        return (self.monitor.contrast if code == 0x12 else 0), 100
+
+    def get_vcp_capabilities(self) -> str:
+        self.capability_queries += 1
+        time.sleep(self.capabilities_latency)
+        return self.capabilities
+
+
+class FakeMonitor:
+    """Stands in for a monitorcontrol Monitor with a slow luminance write."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.luminance = 50
+        self.contrast = 75
+        self.vcp = FakeVCP(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_luminance(self, value: int):
+        time.sleep(self.latency)
+        self.luminance = value
+
+    def get_luminance(self) -> int:
+        time.sleep(self.latency)
+        return self.luminance
+
+
+def run_serial(writer: BrightnessWriter, count: int, value: int) -> float:
+    start = time.perf_counter()
+    for idx in range(count):
+        SetMonitorLuminance(idx, value, writer.handles)
+    return time.perf_counter() - start
+
+
+def run_concurrent(writer: BrightnessWriter, count: int, value: int) -> float:
+    start = time.perf_counter()
+    wait(writer.write({idx: value for idx in range(count)}))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent monitor writes")
+    parser.add_argument("--monitors", type=int, default=4, help="Number of fake monitors")
+    parser.add_argument("--latency", type=float, default=50, help="Write latency per monitor in milliseconds")
+    parser.add_argument("--rounds", type=int, default=10, help="Number of brightness changes to time")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Allowed concurrent time per change as a multiple of the slowest monitor")
+    args = parser.parse_args()
+
+    monitors = [FakeMonitor(args.latency / 1000) for _ in range(args.monitors)]
+    writer = BrightnessWriter(monitors=monitors)
+
+    serial = [run_serial(writer, len(monitors), 10 * (i % 10)) for i in range(args.rounds)]
+    concurrent = [run_concurrent(writer, len(monitors), 10 * (i % 10)) for i in range(args.rounds)]
+    writer.shutdown(wait=True)
+
+    serial_ms = 1000 * sum(serial) / len(serial)
+    concurrent_ms = 1000 * sum(concurrent) / len(concurrent)
+    print(f"{args.monitors} monitors, {args.latency:.0f} ms per write")
+    print(f"  serial:     {serial_ms:7.1f} ms per change")
+    print(f"  concurrent: {concurrent_ms:7.1f} ms per change")
+    print(f"  speedup:    {serial_ms / concurrent_ms:7.2f}x")
+
+    limit_ms = args.tolerance * args.latency * math.ceil(args.monitors / MAX_WRITE_WORKERS)
+    if concurrent_ms > limit_ms:
+        print(f"FAIL: a concurrent change took {concurrent_ms:.1f} ms, more than {limit_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
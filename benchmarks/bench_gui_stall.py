@@ -0,0 +1,224 @@
+"""
+Measures how long the GUI thread stalls while monitors are slow and failing.
+
+Runs the real BrightnessSlider, BrightnessWriter, KeyboardListener,
+MonitorEnumerator and BrightnessReconciler under Qt's offscreen platform
+against simulated monitors that take hundreds of milliseconds per call,
+share one bus and fail some of their calls. Meanwhile the slider is dragged
+one value per frame, hotkeys are pressed from a hook thread, ChangeBrightness
+is called directly and a screen change enumerates the monitors again.
+
+A heartbeat timer fires every few milliseconds, the longest gap between two
+beats beyond its interval is the longest stall of the event loop. The
+longest single event dispatch is reported as well. Error messages shown to
+the user are counted, a modal one would have blocked the event loop for as
+long as it was open.
+
+Exits with 1 when the event loop stalled for longer than --max-stall or a
+modal error message was shown.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_gui_stall.py --write-latency 300 --failure-rate 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulationConfig
+from reconcile import ReconcileSchedule
+
+HEARTBEAT_INTERVAL = 5  # milliseconds
+SETTLE_TIMEOUT = 20.0  # seconds
+
+
+class TimedApplication(QtWidgets.QApplication):
+    """QApplication that measures the longest event dispatch on the GUI thread."""
+
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.longest = 0.0
+        self._depth = 0
+
+    def notify(self, receiver, event):
+        if self._depth:
+            return super().notify(receiver, event)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return super().notify(receiver, event)
+        finally:
+            self._depth -= 1
+            self.longest = max(self.longest, time.perf_counter() - start)
+
+
+class Heartbeat(QtCore.QObject):
+    """Beats on a precise timer and records the longest gap beyond the interval."""
+
+    def __init__(self, interval: int):
+        super().__init__()
+        self.interval = interval / 1000
+        self.longest = 0.0
+        self.beats = 0
+        self.modal = 0
+        self._last = None
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self.beat)
+        self.timer.start(interval)
+
+    def beat(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.longest = max(self.longest, now - self._last - self.interval)
+        self._last = now
+        self.beats += 1
+        # A modal dialog would sit here with its own event loop, close it to let the run go on
+        dialog = QtWidgets.QApplication.activeModalWidget()
+        if dialog is not None:
+            self.modal += 1
+            dialog.close()
+
+
+def process_for(app: QtWidgets.QApplication, seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+
+
+def press_hotkeys(backend: SimulatedBackend, presses: int, interval: float) -> threading.Thread:
+    """Presses Ctrl+Up and Ctrl+Down in turns from a hook thread."""
+    def hook_thread():
+        for n in range(presses):
+            backend.press("ctrl", "up" if (n // 5) % 2 == 0 else "down")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=hook_thread, name="keyboard-hook")
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GUI thread stalls with slow, failing monitors")
+    parser.add_argument("--monitors", type=int, default=4, help="Number of simulated monitors")
+    parser.add_argument("--frames", type=int, default=180, help="Slider drag frames")
+    parser.add_argument("--frame", type=float, default=16.7, help="Milliseconds between drag frames")
+    parser.add_argument("--write-latency", type=float, default=300, help="Median write latency in milliseconds")
+    parser.add_argument("--read-latency", type=float, default=200, help="Median read latency in milliseconds")
+    parser.add_argument("--open-latency", type=float, default=100, help="Latency of opening a monitor in milliseconds")
+    parser.add_argument("--failure-rate", type=float, default=0.2, help="Fraction of VCP calls that fail")
+    parser.add_argument("--max-stall", type=float, default=50, help="Longest acceptable stall in milliseconds")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    # The offscreen platform warns about every opacity change of the fading slider
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = TimedApplication(sys.argv)
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    messages = []
+    modules.show_user_message = lambda title, message: messages.append(message)
+
+    backend = SimulatedBackend(SimulationConfig(
+        monitors=args.monitors,
+        read_latency=args.read_latency / 1000,
+        write_latency=args.write_latency / 1000,
+        open_latency=args.open_latency / 1000,
+        capabilities_latency=0.0,
+        failure_rate=args.failure_rate,
+        shared_bus=True,
+        seed=args.seed,
+    ))
+    set_backend(backend)
+
+    writer = modules.BrightnessWriter()
+    slider = modules.BrightnessSlider(writer)
+    notifications = []
+    slider.error_reported.connect(lambda title, message: notifications.append(message))
+    listener = modules.KeyboardListener()
+    listener.brightness_requested.connect(slider.handle_brightness_requested)
+    listener.start()
+    enumerator = modules.MonitorEnumerator()
+    enumerator.monitor_ready.connect(slider.handle_monitor_ready)
+    reconciler = modules.BrightnessReconciler(
+        busy=lambda: writer.queue.is_busy() or slider.transitions.engine.is_active() or enumerator.isRunning(),
+        schedule=ReconcileSchedule(0.2, 1.0),
+    )
+    enumerator.enumeration_finished.connect(reconciler.start)
+
+    heartbeat = Heartbeat(HEARTBEAT_INTERVAL)
+    start = time.perf_counter()
+    enumerator.start()
+    process_for(app, 0.1)
+
+    hotkeys = press_hotkeys(backend, args.frames // 2, 2 * args.frame / 1000)
+    value, step = 50, 2
+    direct = 0
+    for frame in range(args.frames):
+        if not 10 <= value + step <= 90:
+            step = -step
+        value += step
+        slider.slider.setValue(value)
+        reconciler.note_interaction()
+        if frame % 30 == 0:
+            for monitor_id in modules.monitor_registry.snapshot():
+                modules.ChangeBrightness(monitor_id, value)
+                direct += 1
+        if frame == args.frames // 2:
+            enumerator.start()
+        process_for(app, args.frame / 1000)
+    while hotkeys.is_alive():
+        process_for(app, 0.01)
+    hotkeys.join()
+
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while time.perf_counter() < deadline and (
+            writer.queue.is_busy() or slider.transitions.engine.is_active() or enumerator.isRunning()):
+        process_for(app, 0.01)
+    elapsed = time.perf_counter() - start
+    process_for(app, 0.1)
+
+    stats = backend.stats()
+    print(f"{args.monitors} monitors on one bus, write {args.write_latency:.0f} ms, read {args.read_latency:.0f} ms, "
+          f"open {args.open_latency:.0f} ms, failures {args.failure_rate:.0%}")
+    print(f"  ran:             {elapsed:.1f} s, {args.frames} drag frames, {args.frames // 2} hotkey presses, "
+          f"{direct} direct ChangeBrightness calls")
+    print(f"  bus:             {stats['bus_writes']} writes, {stats['bus_reads']} reads")
+    print(f"  reconciler:      {reconciler.rounds} rounds, {reconciler.reads} reads")
+    print(f"  heartbeats:      {heartbeat.beats}")
+    print(f"  longest stall:   {1000 * heartbeat.longest:.1f} ms")
+    print(f"  longest event:   {1000 * app.longest:.1f} ms")
+    print(f"  notifications:   {len(notifications)}")
+    print(f"  modal messages:  {len(messages) + heartbeat.modal}")
+
+    failed = []
+    if heartbeat.longest * 1000 > args.max_stall:
+        failed.append(f"the event loop stalled for {1000 * heartbeat.longest:.1f} ms, over {args.max_stall:.0f} ms")
+    if messages or heartbeat.modal:
+        failed.append("a modal error message was shown")
+
+    heartbeat.timer.stop()
+    reconciler.shutdown()
+    backend.stop()
+    listener.wait()
+    enumerator.wait()
+    writer.shutdown(wait=True)
+    modules.monitor_io.shutdown(wait=True)
+    modules.monitor_handles.close_all()
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
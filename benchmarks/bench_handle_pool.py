@@ -0,0 +1,123 @@
+"""
+Measures what MonitorHandlePool saves over opening a handle per VCP call.
+
+The stub monitor counts __enter__/__exit__ calls and sleeps on each of them
+to charge for handle acquisition and release, on top of a fixed cost per
+set_luminance call.
+
+It also checks when a failed call is retried: once on a handle kept open
+from an earlier call, which may have gone stale, and never on a handle
+opened for the call. Exits with 1 when the attempts differ from that.
+
+Usage:
+    python benchmarks/bench_handle_pool.py --calls 200 --open-cost 5 --write-cost 2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handle_pool import MonitorHandlePool
+
+
+class CountingMonitor:
+    """Monitor stub that counts and charges for opening and closing its handle."""
+
+    def __init__(self, open_cost: float, write_cost: float):
+        self.open_cost = open_cost
+        self.write_cost = write_cost
+        self.enters = 0
+        self.exits = 0
+        self.luminance = 50
+        self.failures = 0  # calls left to fail
+        self.attempts = 0
+
+    def __enter__(self):
+        time.sleep(self.open_cost)
+        self.enters += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        time.sleep(self.open_cost)
+        self.exits += 1
+        return False
+
+    def set_luminance(self, value: int):
+        time.sleep(self.write_cost)
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise OSError("no acknowledge")
+        self.luminance = value
+
+
+def run_per_call(monitor: CountingMonitor, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        with monitor:
+            monitor.set_luminance(i % 101)
+    return time.perf_counter() - start
+
+
+def run_pooled(monitor: CountingMonitor, calls: int) -> float:
+    pool = MonitorHandlePool()
+    pool.set_monitors([monitor])
+    start = time.perf_counter()
+    for i in range(calls):
+        pool.call(0, lambda m, value=i % 101: m.set_luminance(value))
+    elapsed = time.perf_counter() - start
+    pool.close_all()
+    return elapsed
+
+
+def retry_attempts(warm: bool, failures: int) -> int:
+    """Returns how often a call was attempted that fails `failures` times, on a warm or fresh handle."""
+    monitor = CountingMonitor(0, 0)
+    pool = MonitorHandlePool()
+    pool.set_monitors([monitor])
+    if warm:
+        pool.call(0, lambda m: m.set_luminance(10))
+    monitor.failures, monitor.attempts = failures, 0
+    try:
+        pool.call(0, lambda m: m.set_luminance(20))
+    except OSError:
+        pass
+    pool.close_all()
+    return monitor.attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the monitor handle pool")
+    parser.add_argument("--calls", type=int, default=200, help="Number of set_luminance calls")
+    parser.add_argument("--open-cost", type=float, default=5, help="Cost of opening or closing a handle in milliseconds")
+    parser.add_argument("--write-cost", type=float, default=2, help="Cost of a set_luminance call in milliseconds")
+    args = parser.parse_args()
+
+    per_call_monitor = CountingMonitor(args.open_cost / 1000, args.write_cost / 1000)
+    pooled_monitor = CountingMonitor(args.open_cost / 1000, args.write_cost / 1000)
+    per_call = run_per_call(per_call_monitor, args.calls)
+    pooled = run_pooled(pooled_monitor, args.calls)
+
+    print(f"{args.calls} calls, {args.open_cost:.1f} ms open/close, {args.write_cost:.1f} ms write")
+    print(f"  open per call: {1000 * per_call:8.1f} ms total, "
+          f"{per_call_monitor.enters} enters, {per_call_monitor.exits} exits")
+    print(f"  handle pool:   {1000 * pooled:8.1f} ms total, "
+          f"{pooled_monitor.enters} enters, {pooled_monitor.exits} exits")
+    print(f"  saved:         {1000 * (per_call - pooled):8.1f} ms ({per_call / pooled:.2f}x)")
+
+    failed = False
+    for label, warm, failures, expected in (("stale handle", True, 1, 2),
+                                            ("failing monitor, warm handle", True, 5, 2),
+                                            ("failing monitor, fresh handle", False, 5, 1)):
+        attempts = retry_attempts(warm, failures)
+        print(f"  {label}: {attempts} attempts")
+        if attempts != expected:
+            print(f"FAIL: expected {expected} attempts")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
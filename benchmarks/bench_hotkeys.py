@@ -0,0 +1,143 @@
+"""
+Feeds a synthetic typing stream through the keyboard hook and measures the cost per key event.
+
+The stream is mostly ordinary typing with Shift for capitals, some Ctrl+C and
+Ctrl+V, and an occasional Ctrl+Up or Ctrl+Down, replayed straight into the
+handlers:
+
+  polling:    the old handler, asking is_pressed for Ctrl, Up and Down on every key press
+  dispatcher: HotkeyDispatcher fed with every press and release
+
+The is_pressed used for polling is a locked set lookup, far cheaper than the
+real keyboard library, so the polling numbers are a lower bound. Exits with 1
+when either handler does not find exactly the hotkeys in the stream.
+
+Usage:
+    python benchmarks/bench_hotkeys.py --events 10000
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends.simulated import SimulatedKeyEvent
+from hotkeys import HotkeyDispatcher
+
+BINDINGS = {"ctrl+up": 1, "ctrl+down": -1}
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def typing_stream(events: int, hotkey_rate: float, seed: int):
+    """
+    Returns a list of ("down"|"up", key) steps and the number of hotkey presses in it.
+
+    Args:
+        events (int): Approximate number of key events.
+        hotkey_rate (float): Fraction of keystrokes that are a brightness hotkey.
+        seed (int): Random seed.
+    """
+    rng = random.Random(seed)
+    steps = []
+    hotkeys = 0
+    while len(steps) < events:
+        roll = rng.random()
+        if roll < hotkey_rate:
+            chord = ("ctrl", rng.choice(("up", "down")))
+            hotkeys += 1
+        elif roll < hotkey_rate + 0.02:
+            chord = ("ctrl", rng.choice("cv"))
+        elif roll < hotkey_rate + 0.10:
+            chord = (rng.choice(("shift", "right shift")), rng.choice(LETTERS))
+        else:
+            chord = (rng.choice(LETTERS + " "),)
+            chord = ("space",) if chord == (" ",) else chord
+        steps += [("down", key) for key in chord] + [("up", key) for key in reversed(chord)]
+    return steps, hotkeys
+
+
+class KeyState:
+    """Held keys with a locked is_pressed, like the simulated keyboard used to keep."""
+
+    def __init__(self):
+        self.pressed = set()
+        self.lock = threading.Lock()
+
+    def is_pressed(self, key: str) -> bool:
+        with self.lock:
+            return key in self.pressed
+
+
+def replay(events, keys: KeyState, on_press=None, on_event=None) -> float:
+    """Replays the stream into the given handlers, returns the elapsed seconds."""
+    pressed = keys.pressed
+    start = time.perf_counter()
+    for event in events:
+        if event.event_type == "down":
+            pressed.add(event.name)
+            if on_press is not None:
+                on_press(event)
+        else:
+            pressed.discard(event.name)
+        if on_event is not None:
+            on_event(event)
+    return time.perf_counter() - start
+
+
+def polling_handler(keys: KeyState, found: list):
+    """The handler KeyboardListener used before the dispatcher, without the brightness step."""
+    def on_key_press(event):
+        if not keys.is_pressed("ctrl"):
+            return
+        if keys.is_pressed("up"):
+            found.append(1)
+        elif keys.is_pressed("down"):
+            found.append(-1)
+    return on_key_press
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hotkey matching on a typing stream")
+    parser.add_argument("--events", type=int, default=10000, help="Key events in the stream")
+    parser.add_argument("--hotkey-rate", type=float, default=0.01, help="Fraction of keystrokes that are hotkeys")
+    parser.add_argument("--repeats", type=int, default=5, help="Replays per handler, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    steps, expected = typing_stream(args.events, args.hotkey_rate, args.seed)
+    events = [SimulatedKeyEvent(key, kind) for kind, key in steps]
+    print(f"{len(events)} key events, {expected} brightness hotkeys")
+
+    baseline = min(replay(events, KeyState()) for _ in range(args.repeats))
+    results = {}
+
+    times = []
+    for _ in range(args.repeats):
+        found = []
+        keys = KeyState()
+        times.append(replay(events, keys, on_press=polling_handler(keys, found)))
+    results["polling"] = (min(times), len(found))
+
+    times = []
+    for _ in range(args.repeats):
+        found = []
+        dispatcher = HotkeyDispatcher(BINDINGS, lambda action, event: found.append(action))
+        times.append(replay(events, KeyState(), on_event=dispatcher.feed))
+    results["dispatcher"] = (min(times), len(found))
+
+    failed = False
+    for name, (elapsed, found) in results.items():
+        per_event = 1e9 * (elapsed - baseline) / len(events)
+        print(f"  {name:10} {per_event:8.1f} ns per event, {found} hotkeys matched")
+        if found != expected:
+            print(f"FAIL: {name} matched {found} hotkeys, expected {expected}")
+            failed = True
+    print(f"speedup: {(results['polling'][0] - baseline) / (results['dispatcher'][0] - baseline):.2f}x")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
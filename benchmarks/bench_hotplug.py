@@ -0,0 +1,150 @@
+"""
+Simulates monitors being plugged in and out and counts the probes each change costs.
+
+A fake backend returns whatever monitors are currently "connected", each
+with its own EDID, and counts luminance reads. Every step changes the set of
+monitors, lets Qt report a screen change, and waits for the MonitorEnumerator
+to re-enumerate. The script checks that only new monitors are read, that
+disconnected monitors are dropped, and that monitors which stay connected
+keep their brightness and keep receiving their own writes when the
+enumeration order changes. It exits with status 1 when a check fails.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_hotplug.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import Backend, set_backend
+from bench_fanout import FakeMonitor
+
+
+def make_edid(product: int, serial: int) -> bytes:
+    """Builds the vendor block of an EDID for manufacturer "TST"."""
+    packed = ((ord("T") - 64) << 10) | ((ord("S") - 64) << 5) | (ord("T") - 64)
+    return (b"\x00\xff\xff\xff\xff\xff\xff\x00" + packed.to_bytes(2, "big")
+            + product.to_bytes(2, "little") + serial.to_bytes(4, "little"))
+
+
+class ProbedMonitor(FakeMonitor):
+    """Fake monitor with an EDID that counts how often it is read."""
+
+    def __init__(self, name: str, serial: int, latency: float, luminance: int):
+        super().__init__(latency)
+        self.name = name
+        self.edid = make_edid(0x1000, serial)
+        self.luminance = luminance
+        self.probes = 0
+
+    def get_luminance(self) -> int:
+        self.probes += 1
+        return super().get_luminance()
+
+
+class DeskBackend(Backend):
+    """Backend returning the monitors currently on the simulated desk, in desk order."""
+
+    name = "desk"
+
+    def __init__(self):
+        self.connected = []
+        self.enumerations = 0
+
+    def get_monitors(self):
+        self.enumerations += 1
+        return list(self.connected)
+
+
+def wait_for_refresh(app: QtWidgets.QApplication, enumerator: modules.MonitorEnumerator):
+    """Reports a screen change through Qt and waits until the enumerator has handled it."""
+    loop = QtCore.QEventLoop()
+    enumerator.enumeration_finished.connect(loop.quit)
+    enumerator.enumeration_failed.connect(loop.quit)
+    app.screenAdded.emit(app.primaryScreen())
+    loop.exec_()
+    enumerator.enumeration_finished.disconnect(loop.quit)
+    enumerator.enumeration_failed.disconnect(loop.quit)
+    enumerator.wait()
+    app.processEvents()  # deliver the queued monitor_ready/monitor_removed signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate monitor hotplug sequences")
+    parser.add_argument("--latency", type=float, default=20, help="Time per luminance read in milliseconds")
+    args = parser.parse_args()
+    latency = args.latency / 1000
+
+    backend = DeskBackend()
+    set_backend(backend)
+    app = QtWidgets.QApplication(sys.argv)
+    # Keep the real state file untouched
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+
+    writer = modules.BrightnessWriter()
+    slider = modules.BrightnessSlider(writer)
+    enumerator = modules.MonitorEnumerator(settle_delay=0)
+    enumerator.monitor_ready.connect(slider.handle_monitor_ready)
+    enumerator.monitor_removed.connect(slider.handle_monitor_removed)
+    enumerator.watch_screens(app)
+
+    laptop = ProbedMonitor("laptop", 1, latency, 40)
+    left = ProbedMonitor("left", 2, latency, 60)
+    right = ProbedMonitor("right", 3, latency, 80)
+    ids = {}
+
+    steps = [
+        ("start with the laptop panel", [laptop], 1),
+        ("dock two external monitors", [laptop, left, right], 2),
+        ("screen change, same monitors", [laptop, left, right], 0),
+        ("dock enumerates in another order", [right, laptop, left], 0),
+        ("unplug the right monitor", [laptop, left], 0),
+        ("plug the right monitor back in", [laptop, left, right], 1),
+        ("undock", [laptop], 0),
+    ]
+
+    failures = 0
+    print(f"{'step':36} {'connected':>9} {'probes':>6} {'expected':>8} {'enum ms':>8}")
+    for description, desk, expected in steps:
+        before = sum(monitor.probes for monitor in (laptop, left, right))
+        backend.connected = desk
+        start = time.perf_counter()
+        wait_for_refresh(app, enumerator)
+        elapsed = time.perf_counter() - start
+        probes = sum(monitor.probes for monitor in (laptop, left, right)) - before
+
+        snapshot = modules.monitor_registry.snapshot()
+        for monitor_id, monitor in snapshot.monitors().items():
+            ids[monitor.name] = monitor_id
+        brightness = snapshot.brightness()
+        connected = sorted(ids[monitor.name] for monitor in desk)
+        ok = probes == expected and sorted(brightness) == connected
+        failures += not ok
+        print(f"{description:36} {len(brightness):>9} {probes:>6} {expected:>8} "
+              f"{1000 * elapsed:>8.1f}{'' if ok else '  FAILED'}")
+
+        if description == "dock enumerates in another order":
+            # State follows the monitor, not its position in the list
+            ok = all(brightness[ids[m.name]] == m.luminance for m in desk)
+            wait(writer.write({ids["left"]: 15}))
+            ok = ok and left.luminance == 15 and right.luminance == 80 and laptop.luminance == 40
+            failures += not ok
+            print(f"{'  state and writes follow the ID':36}{'' if ok else '  FAILED'}")
+
+    print(f"enumerations: {backend.enumerations}, probes: {enumerator.probes}")
+    writer.shutdown(wait=True)
+    modules.monitor_handles.close_all()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures how long the application modules take to import.
+
+Each target is imported in a fresh interpreter with `python -X importtime`.
+The report shows the cumulative time of the target, the part of it spent in
+this project's own modules (the rest is the standard library and third-party
+packages), and the platform libraries it pulled in. The core is expected to
+import in milliseconds without any of them.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py core modules
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that must stay out of the platform-neutral core
+PLATFORM_MODULES = ["PyQt5", "monitorcontrol", "keyboard", "winreg", "win32gui", "win32con"]
+CORE_MODULES = ["core", "handle_pool", "write_queue", "transitions", "rate_limit", "state_cache", "hotplug",
+                "registry", "capabilities", "instrumentation", "hotkeys", "reconcile",
+                "io_worker", "ipc", "schedule", "adaptive", "profiles", "backends"]
+PROJECT_MODULES = set(CORE_MODULES) | {"modules", "monitor"}
+
+
+def measure(module: str) -> dict:
+    """Imports a module in a new interpreter and returns its import times in microseconds."""
+    check = f"import sys, {module}; print(','.join(m for m in {PLATFORM_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+
+    cumulative = None
+    own = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        name = parts[2]
+        if name.split(".")[0] in PROJECT_MODULES:
+            own += int(parts[0].rsplit(":", 1)[1])
+        if name == module:
+            cumulative = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return {"cumulative_us": cumulative, "own_us": own, "platform_modules": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark module import time")
+    parser.add_argument("modules", nargs="*", default=CORE_MODULES + ["modules"], help="Modules to import")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        stats = measure(module)
+        loaded = ", ".join(stats["platform_modules"]) or "none"
+        print(f"{module:12s} {stats['cumulative_us'] / 1000:8.2f} ms total, "
+              f"{stats['own_us'] / 1000:6.2f} ms own   platform modules: {loaded}")
+        if module in CORE_MODULES and stats["platform_modules"]:
+            failed = True
+    if failed:
+        print("Core modules imported platform libraries")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
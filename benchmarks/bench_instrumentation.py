@@ -0,0 +1,130 @@
+"""
+Measures what the hot path instrumentation costs per call, disabled and enabled,
+and checks that the histogram percentiles match the exact ones.
+
+  plain:    an undecorated function call, the baseline
+  timed:    the same function behind Instrumentation.timed
+  span:     a with block around the call
+  guarded:  the call timed inline behind a check of `enabled`, like the write path
+  delivery: a start_delivery/finish_delivery pair next to the call
+
+Exits with 1 when the disabled overhead of a decorated call exceeds
+--max-disabled-overhead or a percentile is off by more than the bucket width.
+
+Usage:
+    python benchmarks/bench_instrumentation.py --calls 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import SUB_BUCKET_HALF, Instrumentation, LatencyHistogram
+
+
+def best_per_call(run, calls: int, repeats: int) -> float:
+    """Returns the fastest of `repeats` runs of `calls` calls, in nanoseconds per call."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        run(calls)
+        elapsed = (time.perf_counter_ns() - start) / calls
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def make_runs(instrumentation: Instrumentation):
+    def work(value):
+        return value + 1
+
+    timed_work = instrumentation.timed("work")(work)
+
+    def plain(calls):
+        for i in range(calls):
+            work(i)
+
+    def timed(calls):
+        for i in range(calls):
+            timed_work(i)
+
+    def span(calls):
+        for i in range(calls):
+            with instrumentation.span("work"):
+                work(i)
+
+    def guarded(calls):
+        for i in range(calls):
+            if instrumentation.enabled:
+                start = time.perf_counter_ns()
+                work(i)
+                instrumentation.record("work", time.perf_counter_ns() - start)
+            else:
+                work(i)
+
+    def delivery(calls):
+        for i in range(calls):
+            instrumentation.start_delivery("signal")
+            work(i)
+            instrumentation.finish_delivery("signal")
+
+    return {"plain": plain, "timed": timed, "span": span, "guarded": guarded, "delivery": delivery}
+
+
+def check_percentiles(samples: int, seed: int) -> float:
+    """Returns the largest relative error of the reported percentiles on log-normal durations."""
+    rng = random.Random(seed)
+    values = [int(rng.lognormvariate(17, 1.0)) for _ in range(samples)]  # around 24 ms
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    ordered = sorted(values)
+    worst = 0.0
+    for percent in (1, 10, 50, 90, 99, 99.9, 100):
+        exact = ordered[max(0, int(-(-len(ordered) * percent // 100)) - 1)]
+        reported = histogram.percentile(percent)
+        worst = max(worst, abs(reported - exact) / exact)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of the latency instrumentation")
+    parser.add_argument("--calls", type=int, default=200000, help="Calls per measurement")
+    parser.add_argument("--repeats", type=int, default=5, help="Measurements per case, the fastest is kept")
+    parser.add_argument("--samples", type=int, default=100000, help="Values recorded for the percentile check")
+    parser.add_argument("--max-disabled-overhead", type=float, default=1000,
+                        help="Allowed nanoseconds a disabled decorated call may add")
+    args = parser.parse_args()
+
+    instrumentation = Instrumentation()
+    runs = make_runs(instrumentation)
+    baseline = best_per_call(runs["plain"], args.calls, args.repeats)
+    print(f"plain call: {baseline:.1f} ns")
+    print(f"{'case':>9} {'disabled ns':>12} {'enabled ns':>11}")
+    overhead = {}
+    for name in ("timed", "span", "guarded", "delivery"):
+        instrumentation.set_enabled(False)
+        disabled = best_per_call(runs[name], args.calls, args.repeats) - baseline
+        instrumentation.set_enabled(True)
+        enabled = best_per_call(runs[name], args.calls, args.repeats) - baseline
+        overhead[name] = disabled
+        print(f"{name:>9} {disabled:>+12.1f} {enabled:>+11.1f}")
+
+    error = check_percentiles(args.samples, seed=1)
+    print(f"largest percentile error: {100 * error:.2f}% (bucket width {100 / SUB_BUCKET_HALF:.2f}%)")
+
+    failed = False
+    if overhead["timed"] > args.max_disabled_overhead:
+        print(f"FAIL: a disabled decorated call costs {overhead['timed']:.1f} ns, "
+              f"more than {args.max_disabled_overhead:.0f} ns")
+        failed = True
+    if error > 1 / SUB_BUCKET_HALF:
+        print("FAIL: percentiles are less precise than a bucket")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Exercises the command server over a Unix domain socket with simulated monitors.
+
+Runs a CommandServer with the real BrightnessSlider and BrightnessWriter
+under Qt's offscreen platform, and talks to it from a client thread and from
+separate processes:
+
+  get:      round trips of single "get" commands
+  adjust:   round trips of relative "set +1" / "set -1" commands
+  batch:    pipelined batches of "get" commands, per command
+  errors:   unknown commands, bad monitors and malformed lines are refused, the connection stays usable
+  cli:      monitorctl.py sets and reads the brightness in a new process
+  hand-off: monitor.py is launched a second time and must show the running instance and exit
+  second:   a second server must leave the socket of a busy first one alone, and replace one left behind
+
+Exits with 1 when a command gives a wrong answer, the monitors do not end
+at the requested brightness, or p99 of a round trip exceeds --max-latency.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_ipc.py --requests 500
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulationConfig, VCP_LUMINANCE
+from ipc import IPC_ADDRESS_ENV, IPCClient, IPCError
+
+SETTLE_TIMEOUT = 5.0  # seconds
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_in_thread(app: QtWidgets.QApplication, func):
+    """Runs `func` on a thread while the event loop keeps serving, returns its result."""
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func()
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    while thread.is_alive():
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.0005)
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+def round_trips(client: IPCClient, commands, requests: int):
+    """Sends the commands in turns, one at a time, and returns the seconds per round trip."""
+    times = []
+    for n in range(requests):
+        start = time.perf_counter()
+        client.request(commands[n % len(commands)])
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the command server over a local socket")
+    parser.add_argument("--monitors", type=int, default=2, help="Number of simulated monitors")
+    parser.add_argument("--requests", type=int, default=500, help="Round trips per measurement")
+    parser.add_argument("--batch", type=int, default=100, help="Commands per pipelined batch")
+    parser.add_argument("--max-latency", type=float, default=20, help="Highest acceptable p99 round trip in ms")
+    args = parser.parse_args()
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    workdir = tempfile.mkdtemp()
+    modules.state_cache.path = os.path.join(workdir, "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    backend = SimulatedBackend(SimulationConfig(monitors=args.monitors, read_latency=0.001, write_latency=0.005,
+                                                capabilities_latency=0.0, seed=1))
+    set_backend(backend)
+    modules.RetrieveMonitors()
+
+    slider = modules.BrightnessSlider(modules.BrightnessWriter())
+    address = os.path.join(workdir, "ipc.sock")
+    server = modules.CommandServer(slider, address)
+    if not server.listen():
+        print(f"FAIL: could not listen on {address}")
+        sys.exit(1)
+
+    failed = []
+    client = IPCClient(address)
+    run_in_thread(app, client.connect)
+    print(f"{args.monitors} monitors, socket {address}")
+    print(f"{'step':>8} {'requests':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+
+    def report(name: str, times, count: int = None):
+        p99 = percentile(times, 0.99)
+        print(f"{name:>8} {count or len(times):>8} {1000 * percentile(times, 0.5):>7.3f} {1000 * p99:>7.3f} "
+              f"{1000 * max(times):>7.3f}")
+        if 1000 * p99 > args.max_latency:
+            failed.append(f"{name} p99 {1000 * p99:.1f} ms is over {args.max_latency:.0f} ms")
+
+    report("get", run_in_thread(app, lambda: round_trips(client, [{"cmd": "get"}], args.requests)))
+    report("adjust", run_in_thread(app, lambda: round_trips(
+        client, [{"cmd": "adjust", "delta": 1}, {"cmd": "adjust", "delta": -1}], args.requests)))
+
+    def batches():
+        times = []
+        for _ in range(max(1, args.requests // args.batch)):
+            start = time.perf_counter()
+            responses = client.batch([{"cmd": "get", "monitor": 1}] * args.batch)
+            times.append((time.perf_counter() - start) / len(responses))
+        return times
+    report("batch", run_in_thread(app, batches), args.batch * max(1, args.requests // args.batch))
+
+    # errors
+    def errors():
+        responses = client.batch([{"cmd": "launch"}, {"cmd": "get", "monitor": 99}, {"cmd": "set", "value": "x"},
+                                  {"cmd": "ping"}], check=False)
+        client._send(b"not json\n")
+        malformed = client._read_line()
+        return responses, malformed
+    responses, malformed = run_in_thread(app, errors)
+    refused = [not response["ok"] for response in responses]
+    print(f"  errors: {sum(refused)} of 3 bad commands refused, ping {'ok' if responses[3]['ok'] else 'failed'}, "
+          f"malformed line answered: {malformed.decode()}")
+    if refused != [True, True, True, False] or b'"ok":false' not in malformed:
+        failed.append("bad commands were not refused cleanly")
+
+    # cli
+    def cli():
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, os.path.join(ROOT, "monitorctl.py"), "--address", address,
+                                 "set 30", "set +10 1", "get"], capture_output=True, text=True, timeout=30)
+        return result, time.perf_counter() - start
+    result, elapsed = run_in_thread(app, cli)
+    print(f"  cli: exit {result.returncode} in {1000 * elapsed:.0f} ms (process start included)")
+    for line in result.stdout.strip().splitlines():
+        print(f"    {line}")
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while time.perf_counter() < deadline and (slider.writer.queue.is_busy() or slider.transitions.engine.is_active()):
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    app.processEvents()
+    levels = [monitor.vcp.features[VCP_LUMINANCE][0] for monitor in backend.monitors]
+    expected = [40] + [30] * (args.monitors - 1)
+    print(f"    monitors at {levels}")
+    if result.returncode != 0 or levels != expected:
+        failed.append(f"monitorctl.py did not set the monitors to {expected}")
+
+    # hand-off
+    def second_launch():
+        env = dict(os.environ, **{IPC_ADDRESS_ENV: address, "MONITOR_BRIGHTNESS_BACKEND": "simulated"})
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, os.path.join(ROOT, "monitor.py")], env=env,
+                                capture_output=True, text=True, timeout=30)
+        return result, time.perf_counter() - start
+    slider.hide()
+    result, elapsed = run_in_thread(app, second_launch)
+    app.processEvents()
+    print(f"  hand-off: second launch exited with {result.returncode} after {1000 * elapsed:.0f} ms, "
+          f"slider {'shown' if slider.isVisible() else 'NOT shown'}")
+    if result.returncode != 0 or not slider.isVisible():
+        failed.append("a second launch did not hand off to the running instance")
+
+    # second, the first server cannot accept while the GUI thread is busy in the second one's listen()
+    requests = server.requests
+    second = modules.CommandServer(slider, address)
+    replaced = second.listen()
+
+    def ping():
+        with IPCClient(address) as pinger:
+            pinger.request({"cmd": "ping"})
+    run_in_thread(app, ping)
+    stale_address = os.path.join(workdir, "stale.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(stale_address)
+    stale.close()
+    third = modules.CommandServer(slider, stale_address)
+    print(f"  second: socket of the busy server {'REPLACED' if replaced else 'kept'}, "
+          f"first server answered {server.requests - requests} ping, "
+          f"socket left behind {'replaced' if third.listen() else 'NOT replaced'}")
+    if replaced or server.requests != requests + 1:
+        failed.append("a second server took over the socket of a running one")
+    if not third.server.isListening():
+        failed.append("a second server did not replace a socket left behind")
+    second.close()
+    third.close()
+
+    client.close()
+    server.close()
+    slider.writer.shutdown(wait=True)
+    modules.monitor_handles.close_all()
+    try:
+        IPCClient(address, timeout=0.2).connect()
+        failed.append("the server still answers after closing")
+    except IPCError:
+        pass
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
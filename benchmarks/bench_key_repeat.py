@@ -0,0 +1,130 @@
+"""
+Replays scripted hotkey holds through KeyRepeatPolicy and compares it with fixed steps.
+
+Each hold presses Ctrl+Up once, waits the typematic delay and then
+auto-repeats at the given interval until the brightness reaches 100, starting
+from 0. For every repeat interval it reports how long that takes and how many
+distinct levels were passed on the way, for fixed BRIGHTNESS_STEP steps and
+for the policy. The times are scripted, so the output is the same on every
+run.
+
+Exits with 1 when the policy misbehaves: a single press must move
+BRIGHTNESS_STEP, steps must never shrink during a hold, holding must never
+reach full brightness later than fixed steps, and a release must start the
+next hold over. The same goes for a release KeyboardListener never saw
+because the session was locked while the hotkey was held.
+
+Usage:
+    python benchmarks/bench_key_repeat.py --intervals 33,100,400 --delay 500
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore
+
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulatedKeyEvent
+from core import BRIGHTNESS_STEP, MAX_BRIGHTNESS, step_brightness
+from hotkeys import KeyRepeatPolicy
+
+UP = 1
+
+
+def hold_until_full(step_for, delay: float, interval: float):
+    """
+    Presses at 0, then at `delay` and every `interval` after that, until the brightness is full.
+
+    Args:
+        step_for (Callable): Returns the step of a press at the given time.
+
+    Returns:
+        Seconds until full brightness, the levels passed and the steps taken.
+    """
+    brightness, now = 0, 0.0
+    levels, steps = [brightness], []
+    while brightness < MAX_BRIGHTNESS:
+        step = step_for(now)
+        steps.append(step)
+        brightness = step_brightness(brightness, UP, step)
+        levels.append(brightness)
+        now = delay if len(steps) == 1 else now + interval
+    return now if len(steps) == 1 else now - interval, levels, steps
+
+
+def missed_release_resets() -> bool:
+    """
+    Holds Ctrl+Up, locks the session and presses Ctrl+Up again without the releases in between.
+
+    Returns:
+        Whether the press after the lock counted as a new press rather than an auto-repeat.
+    """
+    import modules
+
+    backend = SimulatedBackend()
+    set_backend(backend)
+    listener = modules.KeyboardListener()
+    listener.on_hotkey = lambda direction, event: listener.repeat_policy.press(direction)
+    listener.dispatcher._on_action = listener.on_hotkey
+
+    def down(*keys):
+        for key in keys:
+            listener.feed(SimulatedKeyEvent(key, "down"))
+
+    down("ctrl", "up", "up", "up")
+    held = listener.repeat_policy.repeats > 0
+    backend.locked = True
+    listener.check_session()  # the releases go to the lock screen, the hook never sees them
+    backend.locked = False
+    listener.check_session()
+    down("ctrl", "up")
+    return held and listener.repeat_policy.repeats == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay scripted hotkey holds through the key-repeat policy")
+    parser.add_argument("--intervals", default="33,50,100,400", help="Comma separated auto-repeat intervals in ms")
+    parser.add_argument("--delay", type=float, default=500, help="Typematic delay before the first repeat in ms")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"0 -> {MAX_BRIGHTNESS} with {args.delay:.0f} ms typematic delay")
+    print(f"{'repeat ms':>9} {'fixed s':>8} {'levels':>6} {'policy s':>9} {'levels':>6}  policy steps")
+    for interval in (float(part) / 1000 for part in args.intervals.split(",")):
+        fixed_time, fixed_levels, _ = hold_until_full(lambda now: BRIGHTNESS_STEP, args.delay / 1000, interval)
+
+        policy = KeyRepeatPolicy(first_step=BRIGHTNESS_STEP)
+        policy_time, policy_levels, steps = hold_until_full(lambda now: policy.press(UP, now),
+                                                            args.delay / 1000, interval)
+        print(f"{1000 * interval:>9.0f} {fixed_time:>8.2f} {len(set(fixed_levels)):>6} "
+              f"{policy_time:>9.2f} {len(set(policy_levels)):>6}  {' '.join(map(str, steps))}")
+
+        if steps[0] != BRIGHTNESS_STEP:
+            print(f"FAIL: a single press moved {steps[0]}, expected {BRIGHTNESS_STEP}")
+            failed = True
+        if any(step < BRIGHTNESS_STEP for step in steps):
+            print(f"FAIL: a repeat moved less than a single press ({min(steps)} < {BRIGHTNESS_STEP})")
+            failed = True
+        if policy_time > fixed_time + 1e-9:
+            print(f"FAIL: holding took {policy_time:.2f} s, fixed steps take {fixed_time:.2f} s")
+            failed = True
+        if any(later < earlier for earlier, later in zip(steps[1:], steps[2:])):
+            print("FAIL: the step shrank while the hotkey was held")
+            failed = True
+        if not policy.release() or policy.press(UP, policy_time + 1.0) != BRIGHTNESS_STEP:
+            print("FAIL: releasing the hotkey did not start the next hold over")
+            failed = True
+
+    app = QtCore.QCoreApplication(sys.argv)
+    if not missed_release_resets():
+        print("FAIL: a hotkey held while the session was locked still auto-repeated after unlocking")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
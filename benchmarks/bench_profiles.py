@@ -0,0 +1,163 @@
+"""
+Switches between brightness profiles and counts the writes each monitor receives.
+
+Runs a ProfileManager with the real BrightnessSlider and BrightnessWriter
+under Qt's offscreen platform against simulated monitors, and applies
+profiles in turn. Every switch must write exactly the monitors whose
+brightness differs or that have not confirmed it, all at once, and report a
+single result:
+
+  Day:          every monitor changes
+  Day again:    nothing changes
+  Presentation: only the second monitor changes
+  Night:        every monitor changes, the first to a value of its own
+  Evening:      only the first monitor differs from Night
+  failure:      writes to the second monitor fail while switching to Day, one result names it
+  retry:        Day again, only the failed monitor is written
+  queued:       slider values are still queued when Night is applied, Night must be what the monitors end at
+  hotkey:       a hotkey ramps the first monitor to 60, Night sets it to 20, and the next hotkey step
+                to 30 must ramp up from 20 rather than down from 60
+
+Exits with 1 when a monitor receives a write it should not or misses one, a
+switch reports more or less than one result, failures are reported per
+monitor, or a batch takes much longer than one write.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_profiles.py --monitors 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulationConfig, VCP_LUMINANCE
+from profiles import ALL_MONITORS, ProfileStore
+
+SETTLE_TIMEOUT = 5.0  # seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count monitor writes when switching brightness profiles")
+    parser.add_argument("--monitors", type=int, default=3, help="Number of simulated monitors")
+    parser.add_argument("--write-latency", type=float, default=50, help="Median write latency in milliseconds")
+    args = parser.parse_args()
+    if args.monitors < 2:
+        parser.error("--monitors must be at least 2")
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    workdir = tempfile.mkdtemp()
+    modules.state_cache.path = os.path.join(workdir, "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    config = SimulationConfig(monitors=args.monitors, read_latency=0.001, write_latency=args.write_latency / 1000,
+                              write_spread=0.0, capabilities_latency=0.0, open_latency=0.0, seed=1)
+    backend = SimulatedBackend(config)
+    set_backend(backend)
+    modules.RetrieveMonitors()
+    ids = list(modules.monitor_registry.snapshot())
+    first, second = ids[0], ids[1]
+
+    store = ProfileStore(os.path.join(workdir, "profiles.json"))
+    store.save("Presentation", {ALL_MONITORS: 80, second: 100})
+    store.save("Night", {ALL_MONITORS: 30, first: 20})
+    store.save("Evening", {ALL_MONITORS: 30, first: 40})
+    slider = modules.BrightnessSlider(modules.BrightnessWriter())
+    manager = modules.ProfileManager(slider, ProfileStore(store.path))
+    results, reports = [], []
+    manager.profile_applied.connect(results.append)
+    slider.error_reported.connect(lambda title, message: reports.append(message))
+
+    failed = []
+    writes = lambda: [len(monitor.vcp.write_log) for monitor in backend.monitors]
+    levels = lambda: [monitor.vcp.features[VCP_LUMINANCE][0] for monitor in backend.monitors]
+    others = args.monitors - 2
+    print(f"{args.monitors} monitors, {args.write_latency:.0f} ms per write")
+    print(f"{'profile':>14} {'writes':>12} {'levels':>16} {'ms':>6}  result")
+
+    def switch(label: str, name: str, expected_writes, expected_levels, expect_ok: bool = True):
+        before, count = writes(), len(results)
+        start = time.perf_counter()
+        manager.apply(name)
+        deadline = start + SETTLE_TIMEOUT
+        while len(results) == count and time.perf_counter() < deadline:
+            app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        elapsed = time.perf_counter() - start
+        app.processEvents()
+        counted = [after - earlier for after, earlier in zip(writes(), before)]
+        new_results = results[count:]
+        summary = new_results[0].summary(modules.monitor_label) if new_results else "no result"
+        print(f"{label:>14} {str(counted):>12} {str(levels()):>16} {1000 * elapsed:>6.0f}  {summary}")
+        deadline = time.perf_counter() + SETTLE_TIMEOUT
+        while slider.writer.queue.is_busy() and time.perf_counter() < deadline:
+            app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        counted = [after - earlier for after, earlier in zip(writes(), before)]
+        if (expected_writes is not None and counted != expected_writes) or levels() != expected_levels:
+            failed.append(f"{label}: writes {counted}, expected {expected_writes}")
+        if len(new_results) != 1 or new_results[0].ok != expect_ok:
+            failed.append(f"{label}: {len(new_results)} results, expected one {'success' if expect_ok else 'failure'}")
+        # Concurrent writes take about as long as one, sequential ones as long as all of them. A failing
+        # monitor is retried, which takes longer
+        if expect_ok and sum(counted) > 1 and elapsed > 0.5 * sum(counted) * args.write_latency / 1000 + 0.05:
+            failed.append(f"{label}: {sum(counted)} writes took {1000 * elapsed:.0f} ms, they did not run concurrently")
+
+    switch("Day", "Day", [1] * args.monitors, [80] * args.monitors)
+    switch("Day again", "Day", [0] * args.monitors, [80] * args.monitors)
+    switch("Presentation", "Presentation", [0, 1] + [0] * others, [80, 100] + [80] * others)
+    switch("Night", "Night", [1] * args.monitors, [20] + [30] * (args.monitors - 1))
+    switch("Evening", "Evening", [1, 0] + [0] * others, [40] + [30] * (args.monitors - 1))
+
+    failing = backend.monitors[1].vcp
+    failing.config = SimulationConfig(**dict(vars(config), failure_rate=1.0))
+    switch("failure", "Day", [1, 0] + [1] * others, [80, 30] + [80] * others, expect_ok=False)
+    if results and second not in results[-1].failed:
+        failed.append("the failed monitor is missing from the result")
+    failing.config = config
+    switch("retry", "Day", [0, 1] + [0] * others, [80] * args.monitors)
+
+    def queue_slider_values():
+        for value in (55, 56, 57):
+            slider.writer.post({monitor_id: value for monitor_id in ids})
+    original = manager.apply
+    manager.apply = lambda name: (queue_slider_values(), original(name))
+    switch("queued", "Night", None, [20] + [30] * (args.monitors - 1))
+    manager.apply = original
+
+    def ramp(value: int):
+        """Steps the first monitor like a hotkey and returns the values written to it."""
+        start = time.perf_counter()
+        slider.handle_brightness_requested({first: value})
+        deadline = start + SETTLE_TIMEOUT
+        while (slider.transitions.engine.is_active() or slider.writer.queue.is_busy()) and time.perf_counter() < deadline:
+            app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        return [value for t, code, value in backend.monitors[0].vcp.write_log if code == VCP_LUMINANCE and t > start]
+
+    ramp(60)
+    switch("hotkey", "Night", None, [20] + [30] * (args.monitors - 1))
+    stepped = ramp(30)
+    print(f"{'':>14} hotkey step to 30 after Night wrote {stepped}")
+    if not stepped or not 20 <= stepped[0] <= 30 or stepped[-1] != 30:
+        failed.append(f"hotkey: the step after a profile wrote {stepped}, it must ramp from 20 to 30")
+
+    print(f"per-monitor error reports: {len(reports)}, batches {manager.batches}, writes {manager.writes}")
+    if reports:
+        failed.append(f"{len(reports)} failures were reported per monitor")
+
+    slider.writer.shutdown(wait=True)
+    modules.monitor_handles.close_all()
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
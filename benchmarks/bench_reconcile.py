@@ -0,0 +1,171 @@
+"""
+Runs the BrightnessReconciler against simulated monitors with a compressed schedule.
+
+  stable: nothing changes, the interval backs off and reads become rare
+  rounded: a monitor started at 47, shown as 50, must stay at 50 in the registry
+  osd:    a monitor's brightness is changed behind the application's back,
+          the time until the registry holds the new value is reported
+  drag:   the slider is dragged while the reconciler keeps polling, the
+          reconciler must give way and must not undo the drag
+  hotkey: a monitor is dimmed on its own buttons after the drag, the next
+          hotkey ramp must start from the adopted value, not from the drag's
+  locked: the session is locked, no monitor may be read
+  idle:   nobody interacts for longer than the idle timeout, reading stops
+
+Exits with 1 when any of these expectations fails.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_reconcile.py --monitors 2 --min-interval 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from backends import set_backend
+from backends.simulated import SimulatedBackend, SimulationConfig, VCP_LUMINANCE
+from reconcile import ReconcileSchedule
+
+
+def process_for(app: QtWidgets.QApplication, seconds: float, until=None) -> float:
+    """Runs the event loop for `seconds` or until `until()` is true. Returns the seconds it ran."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        if until is not None and until():
+            break
+        time.sleep(0.001)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the brightness reconciler with a compressed schedule")
+    parser.add_argument("--monitors", type=int, default=2, help="Number of simulated monitors")
+    parser.add_argument("--min-interval", type=float, default=50, help="Shortest interval in milliseconds")
+    parser.add_argument("--max-interval", type=float, default=800, help="Longest interval in milliseconds")
+    parser.add_argument("--idle-timeout", type=float, default=3000, help="Idle timeout in milliseconds")
+    parser.add_argument("--read-latency", type=float, default=20, help="Median read latency in milliseconds")
+    parser.add_argument("--write-latency", type=float, default=30, help="Median write latency in milliseconds")
+    args = parser.parse_args()
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    backend = SimulatedBackend(SimulationConfig(
+        monitors=args.monitors,
+        read_latency=args.read_latency / 1000,
+        write_latency=args.write_latency / 1000,
+        capabilities_latency=0.0,
+        seed=1,
+    ))
+    set_backend(backend)
+    backend.monitors[0].vcp.features[VCP_LUMINANCE][0] = 47  # read as 50 at startup
+    modules.RetrieveMonitors()
+    first_id = next(iter(modules.monitor_registry.snapshot()))
+
+    writer = modules.BrightnessWriter()
+    slider = modules.BrightnessSlider(writer)
+    schedule = ReconcileSchedule(args.min_interval / 1000, args.max_interval / 1000, 2.0, args.idle_timeout / 1000)
+    reconciler = modules.BrightnessReconciler(
+        busy=lambda: writer.queue.is_busy() or slider.transitions.engine.is_active(), schedule=schedule
+    )
+    slider.slider.sliderMoved.connect(reconciler.note_interaction)
+    reconciler.brightness_reconciled.connect(lambda monitor_id, value: slider.transitions.forget(monitor_id))
+    reconciler.start()
+
+    failed = []
+    bus_reads = lambda: backend.stats()["bus_reads"]
+
+    # stable
+    before = reconciler.reads
+    elapsed = process_for(app, 2.0)
+    stable_reads = reconciler.reads - before
+    print(f"stable: {stable_reads} reads in {elapsed:.1f} s, interval now {1000 * schedule.interval:.0f} ms")
+    if stable_reads > args.monitors * 10:
+        failed.append("the interval did not back off while stable")
+
+    # rounded
+    record = modules.monitor_registry.snapshot().get(first_id)
+    print(f"rounded: registry at {record.last_brightness}, confirmed {record.confirmed_brightness}")
+    if record.last_brightness != 50 or record.confirmed_brightness != 47:
+        failed.append("a value rounded at startup was taken for a change made on the monitor")
+
+    # osd
+    reconciler.note_interaction()
+    backend.monitors[0].vcp.features[VCP_LUMINANCE][0] = 30
+    elapsed = process_for(app, 3.0, lambda: modules.monitor_registry.snapshot().get(first_id).last_brightness == 30)
+    found = modules.monitor_registry.snapshot().get(first_id).last_brightness == 30
+    print(f"osd:    change {'found' if found else 'NOT found'} after {1000 * elapsed:.0f} ms")
+    if not found:
+        failed.append("a change made on the monitor was not picked up")
+
+    # drag
+    rounds, reads = reconciler.rounds, reconciler.reads
+    value = 30
+    for n in range(60):
+        value = 80 if value >= 80 else value + 1
+        slider.slider.setValue(value)
+        reconciler.note_interaction()
+        process_for(app, 0.016)
+    process_for(app, 2.0, lambda: not writer.queue.is_busy() and not slider.transitions.engine.is_active())
+    process_for(app, 0.5)
+    levels = {monitor.vcp.features[VCP_LUMINANCE][0] for monitor in backend.monitors}
+    registry = set(modules.monitor_registry.snapshot().last_brightness().values())
+    print(f"drag:   {reconciler.rounds - rounds} rounds, {reconciler.reads - reads} reads during and after the drag, "
+          f"monitors at {sorted(levels)}, registry at {sorted(registry)}")
+    if levels != {value} or registry != {value}:
+        failed.append(f"the drag did not end at {value} on every monitor")
+
+    # hotkey
+    reconciler.note_interaction()
+    backend.monitors[0].vcp.features[VCP_LUMINANCE][0] = 20
+    process_for(app, 3.0, lambda: modules.monitor_registry.snapshot().get(first_id).last_brightness == 20)
+    pressed = time.perf_counter()
+    slider.handle_brightness_requested({first_id: 10})
+    process_for(app, 2.0, lambda: not writer.queue.is_busy() and not slider.transitions.engine.is_active())
+    after = [value for t, code, value in backend.monitors[0].vcp.write_log if code == VCP_LUMINANCE and t > pressed]
+    print(f"hotkey: writes after adopting 20 and stepping to 10: {after}")
+    if not after or after[0] > 20 or after[-1] != 10:
+        failed.append("the hotkey ramp after a change on the monitor did not start from the adopted value")
+
+    # locked
+    backend.locked = True
+    reconciler.note_interaction()
+    before = bus_reads()
+    process_for(app, 1.0)
+    locked_reads = bus_reads() - before
+    backend.locked = False
+    print(f"locked: {locked_reads} bus reads")
+    if locked_reads:
+        failed.append("monitors were read while the session was locked")
+
+    # idle
+    reconciler.note_interaction()
+    process_for(app, args.idle_timeout / 1000 + 0.5)
+    before = bus_reads()
+    process_for(app, 1.5)
+    idle_reads = bus_reads() - before
+    print(f"idle:   {idle_reads} bus reads after the idle timeout, timer active: {reconciler.timer.isActive()}")
+    if idle_reads:
+        failed.append("monitors were still read while idle")
+
+    reconciler.shutdown()
+    writer.shutdown(wait=True)
+    modules.monitor_handles.close_all()
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Replays a day of the brightness schedule with a simulated clock and counts its wakeups.
+
+The TimeOfDaySchedule is driven by a fake clock from local midnight to the
+next, waking up only when `next_delay` says so, and compared with polling
+the curve on a fixed interval:
+
+  wakeups: timer expirations per simulated day, against 86400 / --poll-interval for polling
+  writes:  levels handed to the monitors, which must be the same for both
+  level:   between two wakeups the curve must stay at the level applied last
+  override: a manual change at --override-at holds the schedule off until the next segment starts
+  timer:   a BrightnessScheduler on a steep real-time ramp under Qt's offscreen platform
+  hotplug: a second enumeration leaves the monitors alone, one plugged in gets the level applied last
+
+Exits with 1 when the schedule misses a change, writes a level the curve
+does not have at that time, or breaks an override.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_schedule.py --schedule "07:00=40,08:00=80,19:00=80,22:00=30"
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schedule import DAY, BrightnessCurve, TimeOfDaySchedule, parse_time_of_day
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def local_midnight() -> float:
+    """Returns today's local midnight in seconds since the epoch."""
+    today = time.localtime()
+    return time.mktime((today.tm_year, today.tm_mon, today.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+def replay(curve: BrightnessCurve, start: float, override_at: float = None):
+    """
+    Runs the schedule for one day as a single timer would.
+
+    Returns:
+        The writes as (time, level) pairs, the number of wakeups, and the
+        intervals between wakeups as (start, end, level applied) triples.
+    """
+    clock = FakeClock(start)
+    schedule = TimeOfDaySchedule(curve, clock)
+    writes, intervals, wakeups = [], [], 0
+    while clock.now < start + DAY:
+        level = schedule.due()
+        if level is not None:
+            writes.append((clock.now, level))
+        wake = clock.now + schedule.next_delay()
+        if override_at is not None and clock.now < start + override_at <= wake:
+            intervals.append((clock.now, start + override_at, schedule.applied))
+            clock.now = start + override_at
+            schedule.override()
+            override_at = None
+            wake = clock.now + schedule.next_delay()
+        intervals.append((clock.now, wake, None if schedule.is_overridden() else schedule.applied))
+        clock.now = wake
+        wakeups += 1
+    return writes, wakeups, intervals
+
+
+def poll(curve: BrightnessCurve, start: float, interval: float):
+    """Returns the writes of a timer polling the curve every `interval` seconds, and its wakeups."""
+    clock = FakeClock(start)
+    schedule = TimeOfDaySchedule(curve, clock)
+    writes, wakeups = [], 0
+    while clock.now < start + DAY:
+        level = schedule.due()
+        if level is not None:
+            writes.append((clock.now, level))
+        clock.now += interval
+        wakeups += 1
+    return writes, wakeups
+
+
+def check_timer(failed):
+    """Lets a BrightnessScheduler follow a two second ramp on a real Qt timer."""
+    from PyQt5 import QtCore, QtWidgets
+
+    import modules
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    now = time.time()
+    start = (now + time.localtime(now).tm_gmtoff) % DAY
+    schedule = TimeOfDaySchedule(BrightnessCurve([(start, 0), (start + 2, 100)], resolution=50))
+    applied = []
+    scheduler = modules.BrightnessScheduler(schedule, applied.append)
+    scheduler.start()
+    deadline = time.perf_counter() + 2.5
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        time.sleep(0.001)
+    scheduler.shutdown()
+    print(f"timer: applied {applied} in {scheduler.wakeups} wakeups over 2.5 s")
+    if applied != [0, 50, 100] or scheduler.wakeups > 4:
+        failed.append("the scheduler did not follow the ramp with one wakeup per change")
+
+
+def check_hotplug(failed, curve: BrightnessCurve, start: float):
+    """Enumerates again under a BrightnessScheduler, with a monitor plugged in before and after a manual change."""
+    import modules
+
+    clock = FakeClock(start + 12 * 3600)
+    applied, applied_to = [], []
+    scheduler = modules.BrightnessScheduler(TimeOfDaySchedule(curve, clock), applied.append,
+                                            lambda monitor_id, level: applied_to.append((monitor_id, level)))
+    scheduler.add_monitor("first", 50)  # reported by the first enumeration, before the start
+    scheduler.start()
+    clock.now += 60
+    scheduler.start()  # another enumeration, after a hotplug
+    scheduler.add_monitor("added", 50)
+    scheduler.note_override()
+    scheduler.add_monitor("overridden", 50)
+    scheduler.shutdown()
+    print(f"hotplug: applied {applied} to all, {applied_to} to single monitors")
+    if applied != [curve.level_at(12 * 3600)] or applied_to != [("added", applied[0])]:
+        failed.append("an enumeration did not leave the brightness to the schedule and the user")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a day of the brightness schedule")
+    parser.add_argument("--schedule", default="07:00=40,08:00=80,19:00=80,22:00=30", help="Brightness schedule")
+    parser.add_argument("--resolution", type=int, default=5, help="Brightness levels per scheduled write")
+    parser.add_argument("--poll-interval", type=float, default=60, help="Polling interval to compare with, seconds")
+    parser.add_argument("--override-at", default="20:00", help="Time of day of a manual change")
+    parser.add_argument("--no-timer", action="store_true", help="Skip the check with a real Qt timer")
+    args = parser.parse_args()
+
+    curve = BrightnessCurve.parse(args.schedule, args.resolution)
+    start = local_midnight()
+    failed = []
+
+    writes, wakeups, intervals = replay(curve, start)
+    polled_writes, polled_wakeups = poll(curve, start, args.poll_interval)
+    print(f"schedule {args.schedule}, resolution {args.resolution}")
+    print(f"{'':>10} {'wakeups':>8} {'writes':>7}")
+    print(f"{'timer':>10} {wakeups:>8} {len(writes):>7}")
+    print(f"{'polling':>10} {polled_wakeups:>8} {len(polled_writes):>7}  every {args.poll_interval:g} s")
+    if [level for _, level in writes] != [level for _, level in polled_writes]:
+        failed.append("the timer wrote other levels than polling")
+
+    schedule = TimeOfDaySchedule(curve)
+    wrong = 0
+    for begin, end, applied in intervals:
+        for fraction in (0.01, 0.5, 0.99):
+            if curve.level_at(schedule.time_of_day(begin + fraction * (end - begin))) != applied:
+                wrong += 1
+    print(f"level: {wrong} samples between wakeups differ from the level applied")
+    if wrong:
+        failed.append("the curve changed between two wakeups")
+
+    override_at = parse_time_of_day(args.override_at)
+    overridden, _, override_intervals = replay(curve, start, override_at)
+    boundary = override_at + curve.next_boundary(override_at)
+    during = [(when - start, level) for when, level in overridden if override_at <= when - start < boundary]
+    resumed = [(when - start, level) for when, level in overridden if when - start >= boundary]
+    held = max(end for begin, end, applied in override_intervals if applied is None) - start
+    print(f"override: held from {args.override_at} for {(held - override_at) / 3600:.2f} h, "
+          f"{len(during)} writes meanwhile, first write after it {resumed[:1]}")
+    if during or not resumed or abs(resumed[0][0] - boundary) > 1:
+        failed.append("the override was not held until the next segment")
+
+    if not args.no_timer:
+        check_timer(failed)
+        check_hotplug(failed, curve, start)
+
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compares the frame time of the slider's render modes during a fade.
+
+For each mode a BrightnessSlider is shown and faded in and out frame by
+frame. Every frame sets the window opacity, moves the slider by one and
+repaints synchronously, the time of the repaint is the frame time:
+
+  effect: QGraphicsDropShadowEffect on the whole widget
+  cached: background and shadow painted from a cached pixmap
+
+Exits with 1 when the cached mode redraws its background during the fade,
+which it must only do on a resize or a change of the pixel ratio.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_slider_render.py --frames 600
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def fade_frames(app: QtWidgets.QApplication, slider: modules.BrightnessSlider, frames: int):
+    """Fades the slider in and out, returns the seconds each synchronous repaint took."""
+    times = []
+    for frame in range(frames):
+        phase = frame % 60
+        slider.setWindowOpacity(0.9 * (phase if phase < 30 else 60 - phase) / 30)
+        slider.slider.setValue(frame % 101)
+        start = time.perf_counter()
+        slider.repaint()
+        times.append(time.perf_counter() - start)
+        app.processEvents()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the frame time of the slider render modes")
+    parser.add_argument("--frames", type=int, default=600, help="Frames per mode")
+    args = parser.parse_args()
+
+    # The offscreen platform warns about every opacity change
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    failed = []
+    results = {}
+    print(f"{args.frames} frames, {app.primaryScreen().devicePixelRatio()}x")
+    print(f"{'mode':>8} {'mean ms':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'backgrounds':>11}")
+    for mode in (modules.RENDER_EFFECT, modules.RENDER_CACHED):
+        slider = modules.BrightnessSlider(modules.BrightnessWriter(monitors={}), render_mode=mode)
+        slider.show()
+        app.processEvents()
+        fade_frames(app, slider, 30)  # warm up
+        renders = slider.background_renders
+        times = fade_frames(app, slider, args.frames)
+        renders = slider.background_renders - renders
+        results[mode] = sum(times) / len(times)
+        print(f"{mode:>8} {1000 * results[mode]:>8.3f} {1000 * percentile(times, 0.5):>7.3f} "
+              f"{1000 * percentile(times, 0.99):>7.3f} {1000 * max(times):>7.3f} {renders:>11}")
+        if mode == modules.RENDER_CACHED and renders:
+            failed.append(f"the cached background was redrawn {renders} times during the fade")
+        slider.hide()
+        slider.writer.shutdown()
+        slider.deleteLater()
+        app.processEvents()
+
+    print(f"speedup: {results[modules.RENDER_EFFECT] / results[modules.RENDER_CACHED]:.2f}x")
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measures time-to-tray and time-to-fully-ready at startup.
+
+The active backend is replaced by a stub whose get_monitors takes
+--enum-delay to detect the monitors and returns fake monitors that take
+--read-latency per luminance read. The old startup, which enumerated and read every monitor before creating
+the QApplication, is timed for comparison.
+
+Exits with 1 when the tray icon does not appear before the enumeration
+could have finished, when the background startup is not ready sooner than
+the old one, or when not every monitor became ready.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_startup.py --monitors 4 --enum-delay 300 --read-latency 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+from core import monitor_tracker, CacheMonitors
+from backends import Backend, set_backend
+from monitor import create_ui
+from bench_fanout import FakeMonitor
+
+
+class StubBackend(Backend):
+    """Backend whose monitor detection and reads take a configurable time."""
+
+    name = "stub"
+
+    def __init__(self, count: int, enum_delay: float, read_latency: float):
+        self.count = count
+        self.enum_delay = enum_delay
+        self.read_latency = read_latency
+
+    def get_monitors(self):
+        time.sleep(self.enum_delay)
+        return [FakeMonitor(self.read_latency) for _ in range(self.count)]
+
+
+def run_background(app: QtWidgets.QApplication):
+    start = time.perf_counter()
+    slider, tray_icon, enumerator = create_ui()
+    time_to_tray = time.perf_counter() - start
+
+    loop = QtCore.QEventLoop()
+    enumerator.enumeration_finished.connect(loop.quit)
+    enumerator.enumeration_failed.connect(loop.quit)
+    if not enumerator.isFinished():
+        loop.exec_()
+    time_to_ready = time.perf_counter() - start
+    enumerator.wait()
+    tray_icon.hide()
+    return time_to_tray, time_to_ready
+
+
+def run_serial():
+    start = time.perf_counter()
+    modules.RetrieveMonitors()
+    time_to_ready = time.perf_counter() - start
+    return time_to_ready, time_to_ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application startup")
+    parser.add_argument("--monitors", type=int, default=4, help="Number of fake monitors")
+    parser.add_argument("--enum-delay", type=float, default=300, help="Time get_monitors takes in milliseconds")
+    parser.add_argument("--read-latency", type=float, default=200, help="Time per luminance read in milliseconds")
+    args = parser.parse_args()
+
+    set_backend(StubBackend(args.monitors, args.enum_delay / 1000, args.read_latency / 1000))
+    app = QtWidgets.QApplication(sys.argv)
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    serial_tray, serial_ready = run_serial()
+    # Start the background run cold, as if the monitors had never been seen
+    monitor_tracker.monitors = {}
+    CacheMonitors({})
+    background_tray, background_ready = run_background(app)
+
+    print(f"{args.monitors} monitors, {args.enum_delay:.0f} ms enumeration, {args.read_latency:.0f} ms per read")
+    print(f"  enumerate before UI: {1000 * serial_tray:7.1f} ms to tray, {1000 * serial_ready:7.1f} ms to ready")
+    print(f"  background:          {1000 * background_tray:7.1f} ms to tray, {1000 * background_ready:7.1f} ms to ready")
+    ready = len(modules.monitor_registry.snapshot().brightness())
+    print(f"  monitors ready:      {ready}")
+    modules.monitor_handles.close_all()
+
+    failed = False
+    if background_tray >= args.enum_delay / 1000:
+        print(f"FAIL: the tray took {1000 * background_tray:.1f} ms, it has to appear before the "
+              f"{args.enum_delay:.0f} ms enumeration finishes")
+        failed = True
+    if background_ready >= serial_ready:
+        print("FAIL: the background startup was not ready sooner than enumerating before the UI")
+        failed = True
+    if ready != args.monitors:
+        print(f"FAIL: {ready} of {args.monitors} monitors ready")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Plans brightness ramps with TransitionEngine on a simulated clock and checks where they start.
+
+  fast:     a monitor taking 100 writes per second, 60 -> 10
+  slow:     a monitor taking 20 writes per second, 60 -> 10
+  retarget: a new target halfway through a ramp
+  outside:  the monitor is set to 20 outside the engine after a ramp, the
+            next ramp must start from 20 rather than from the engine's last value
+
+For each case it reports the values written. Exits with 1 when a ramp
+starts away from where it should: a retargeted ramp must continue from the
+value it last wrote, an idle monitor must start from the `current` value
+passed to set_target.
+
+Usage:
+    python benchmarks/bench_transitions.py --duration 200
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transitions import TransitionEngine
+
+FAST_SPACING = 0.01  # seconds between two writes
+SLOW_SPACING = 0.05  # seconds between two writes
+TICK = 0.001  # seconds the simulated clock advances per tick
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(engine: TransitionEngine, clock: SimulatedClock, until: float = None):
+    """Ticks the engine until its ramps are done, or until `until`. Returns the values written per monitor."""
+    written = {}
+    while engine.is_active() and (until is None or clock.now < until):
+        for key, value in engine.tick().items():
+            written.setdefault(key, []).append(value)
+        clock.now += TICK
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check where brightness ramps start")
+    parser.add_argument("--duration", type=float, default=200, help="Ramp length in milliseconds")
+    args = parser.parse_args()
+    duration = args.duration / 1000
+
+    clock = SimulatedClock()
+    spacing = {"fast": FAST_SPACING, "slow": SLOW_SPACING}
+    engine = TransitionEngine(clock, spacing=spacing.get)
+    failed = []
+
+    for key in ("fast", "slow"):
+        engine.set_target(key, 10, duration, current=60)
+        values = run(engine, clock)[key]
+        print(f"{key:>8}: {' '.join(map(str, values))}")
+        if values[-1] != 10:
+            failed.append(f"{key}: the ramp ended at {values[-1]}, expected 10")
+
+    engine.set_target("fast", 90, duration, current=10)
+    first = run(engine, clock, until=clock.now + duration / 2)["fast"]
+    engine.set_target("fast", 20, duration, current=10)
+    second = run(engine, clock)["fast"]
+    print(f"retarget: {' '.join(map(str, first))} | {' '.join(map(str, second))}")
+    if abs(second[0] - first[-1]) > 5:
+        failed.append(f"retarget: the new ramp jumped from {first[-1]} to {second[0]}")
+
+    engine.set_target("fast", 60, duration, current=10)
+    run(engine, clock)
+    engine.set_target("fast", 10, duration, current=20)  # set to 20 by a profile or the monitor's buttons
+    values = run(engine, clock)["fast"]
+    print(f" outside: {' '.join(map(str, values))}")
+    if values[0] > 20:
+        failed.append(f"outside: the ramp from 20 started at {values[0]}, from the engine's stale value")
+
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures the cost of the sun icons and how often a slider drag replaces the tray icon.
+
+  render: drawing a sun pixmap with create_sun_pixmap
+  cached: getting the same pixmap from SunIconCache
+
+Then the slider is dragged from 0 to 100 and back in steps of one, and the
+tray icon updates are counted. Exits with 1 when the tray icon is replaced
+on anything but a change of the icon level, or the cache grows beyond its
+bound.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_tray_icon.py --repeats 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets
+
+import modules
+
+
+def per_call(func, repeats: int) -> float:
+    """Returns the microseconds per call of `func(n)`."""
+    start = time.perf_counter()
+    for n in range(repeats):
+        func(n)
+    return 1e6 * (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sun icon cache and tray icon updates")
+    parser.add_argument("--repeats", type=int, default=2000, help="Icons drawn per measurement")
+    parser.add_argument("--ratio", type=float, default=1.5, help="Device pixel ratio to render at")
+    args = parser.parse_args()
+
+    QtCore.qInstallMessageHandler(lambda mode, context, message: None)
+    app = QtWidgets.QApplication(sys.argv)
+    modules.state_cache.path = os.path.join(tempfile.mkdtemp(), "state.json")
+    modules.state_cache.load()
+    modules.show_user_message = lambda title, message: None
+
+    size = modules.TRAY_ICON_SIZE
+    levels = modules.ICON_LEVELS + 1
+    render = per_call(lambda n: modules.create_sun_pixmap(size, size, n % levels, args.ratio), args.repeats)
+    cache = modules.SunIconCache()
+    cached = per_call(lambda n: cache.pixmap(size, size, n % levels, args.ratio), args.repeats)
+    print(f"{size}x{size} at {args.ratio}x, {levels} levels")
+    print(f"  render:  {render:8.1f} us per icon")
+    print(f"  cached:  {cached:8.1f} us per icon, {cache.misses} drawn, {cache.hits} from the cache")
+
+    failed = []
+    for width in range(8, 8 + 2 * cache.max_entries):
+        cache.pixmap(width, width)
+    if len(cache) > cache.max_entries:
+        failed.append(f"the cache holds {len(cache)} pixmaps, over its bound of {cache.max_entries}")
+
+    slider = modules.BrightnessSlider(modules.BrightnessWriter(monitors={}))
+    tray = modules.SystemTrayIcon(parent=slider)
+    slider.slider.setValue(0)
+    app.processEvents()
+    updates = tray.icon_updates
+    drag = list(range(1, 101)) + list(range(99, -1, -1))
+    start = time.perf_counter()
+    for value in drag:
+        slider.slider.setValue(value)
+    elapsed = time.perf_counter() - start
+    updates = tray.icon_updates - updates
+    expected = sum(modules.icon_level(a) != modules.icon_level(b) for a, b in zip([0] + drag, drag))
+    print(f"drag 0 -> 100 -> 0: {len(drag)} values, {updates} tray icon updates (expected {expected}), "
+          f"{1e6 * elapsed / len(drag):.1f} us per value")
+    if updates != expected:
+        failed.append(f"the tray icon was replaced {updates} times, expected {expected}")
+
+    slider.writer.shutdown()
+    for message in failed:
+        print(f"FAIL: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Hammers the MonitorRegistry from several threads and checks it stays consistent.
+
+Stepper threads do what the hotkey and slider do: read a snapshot, step the
+brightness of a monitor and commit it with the snapshot's version, retrying on
+a conflict. Each update writes the same value to brightness and last_brightness,
+so a snapshot where they differ was torn. A hotplug thread keeps connecting and
+disconnecting an extra monitor, and reader threads check every snapshot they
+see. At the end no step may be lost and the versions every reader saw must
+never go backwards. The same steps on a plain dict, as the old globals did it,
+are run for comparison. Exits with status 1 when a check fails.
+
+Usage:
+    python benchmarks/stress_registry.py --threads 8 --steps 5000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry import MonitorRegistry
+
+MONITORS = {f"edid:TST-0000-{n:08X}": object() for n in range(4)}
+HOTPLUG_ID = "edid:TST-0000-FFFFFFFF"
+
+
+def stepper(registry: MonitorRegistry, thread: int, steps: int, retries: list):
+    monitor_ids = list(MONITORS)
+    for step in range(steps):
+        monitor_id = monitor_ids[(thread + step) % len(monitor_ids)]
+        while True:
+            snapshot = registry.snapshot()
+            value = snapshot.get(monitor_id).brightness + 1
+            time.sleep(0)  # the hotkey handler queries the keyboard in between
+            if registry.update(brightness={monitor_id: value}, last_brightness={monitor_id: value},
+                               expected_version=snapshot.version) is not None:
+                break
+            retries[thread] += 1
+
+
+def hotplugger(registry: MonitorRegistry, stop: threading.Event, toggles: list):
+    with_extra = dict(MONITORS, **{HOTPLUG_ID: object()})
+    while not stop.wait(0.001):
+        registry.set_monitors(with_extra if toggles[0] % 2 == 0 else MONITORS)
+        toggles[0] += 1
+
+
+def reader(registry: MonitorRegistry, stop: threading.Event, errors: list, reads: list, index: int):
+    last_version = -1
+    while not stop.is_set():
+        snapshot = registry.snapshot()
+        reads[index] += 1
+        if snapshot.version < last_version:
+            errors.append(f"version went back from {last_version} to {snapshot.version}")
+        last_version = snapshot.version
+        for monitor_id in MONITORS:
+            record = snapshot.get(monitor_id)
+            if record is None:
+                errors.append(f"{monitor_id} disappeared at version {snapshot.version}")
+            elif record.brightness != record.last_brightness:
+                errors.append(f"torn record {monitor_id} at version {snapshot.version}")
+            elif record.version > snapshot.version:
+                errors.append(f"record from the future at version {snapshot.version}")
+
+
+def run_registry(threads: int, steps: int, readers: int):
+    registry = MonitorRegistry()
+    registry.set_monitors(MONITORS)
+    registry.update(brightness={key: 0 for key in MONITORS}, last_brightness={key: 0 for key in MONITORS})
+
+    stop = threading.Event()
+    errors, reads, retries, toggles = [], [0] * readers, [0] * threads, [0]
+    workers = [threading.Thread(target=stepper, args=(registry, n, steps, retries)) for n in range(threads)]
+    background = [threading.Thread(target=reader, args=(registry, stop, errors, reads, n)) for n in range(readers)]
+    background.append(threading.Thread(target=hotplugger, args=(registry, stop, toggles)))
+
+    start = time.perf_counter()
+    for thread in background + workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in background:
+        thread.join()
+
+    total = sum(registry.snapshot().brightness()[key] for key in MONITORS)
+    return total, elapsed, errors, sum(reads), sum(retries), toggles[0]
+
+
+def run_plain_dict(threads: int, steps: int) -> int:
+    brightness = {key: 0 for key in MONITORS}
+    monitor_ids = list(MONITORS)
+
+    def step(thread: int):
+        for n in range(steps):
+            monitor_id = monitor_ids[(thread + n) % len(monitor_ids)]
+            value = brightness[monitor_id]
+            time.sleep(0)
+            brightness[monitor_id] = value + 1
+
+    workers = [threading.Thread(target=step, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(brightness.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress the monitor registry from several threads")
+    parser.add_argument("--threads", type=int, default=8, help="Number of stepping threads")
+    parser.add_argument("--steps", type=int, default=5000, help="Steps per thread")
+    parser.add_argument("--readers", type=int, default=2, help="Number of snapshot reading threads")
+    args = parser.parse_args()
+
+    # Switch threads often to provoke races
+    sys.setswitchinterval(1e-6)
+    expected = args.threads * args.steps
+
+    total, elapsed, errors, reads, retries, toggles = run_registry(args.threads, args.steps, args.readers)
+    plain_total = run_plain_dict(args.threads, args.steps)
+
+    print(f"{args.threads} threads x {args.steps} steps, {args.readers} readers, hotplug toggles: {toggles}")
+    print(f"  registry:   {total}/{expected} steps kept, {retries} retries, "
+          f"{reads} snapshots checked, {expected / elapsed:,.0f} steps/s")
+    print(f"  plain dict: {plain_total}/{expected} steps kept")
+    for error in errors[:10]:
+        print(f"  error: {error}")
+
+    ok = total == expected and not errors
+    print("consistent" if ok else "INCONSISTENT")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,39 @@
 import os
 import sys
+import ast
+import fnmatch
 import subprocess
 import shutil
 import argparse
 
+ENTRY_POINT = "monitor.py"
+# Backends are imported by name at runtime, so PyInstaller cannot see them
+HIDDEN_IMPORTS = ['PyQt5.sip', 'backends.windows', 'backends.generic', 'backends.simulated']
+
+# Qt modules PyQt5 can bundle, with the Qt libraries each one needs besides Qt5Core
+QT_LIBRARIES = {
+    "QtCore": [], "QtGui": ["Qt5Gui"], "QtWidgets": ["Qt5Gui", "Qt5Widgets"], "QtNetwork": ["Qt5Network"],
+    "QtDBus": ["Qt5DBus"], "QtSvg": ["Qt5Gui", "Qt5Widgets", "Qt5Svg"], "QtQml": ["Qt5Network", "Qt5Qml"],
+    "QtQuick": ["Qt5Gui", "Qt5Network", "Qt5Qml", "Qt5QmlModels", "Qt5Quick"],
+    "QtQuickWidgets": ["Qt5Gui", "Qt5Widgets", "Qt5Network", "Qt5Qml", "Qt5Quick", "Qt5QuickWidgets"],
+    "QtWebSockets": ["Qt5Network", "Qt5WebSockets"], "QtOpenGL": ["Qt5Gui", "Qt5Widgets", "Qt5OpenGL"],
+    "QtPrintSupport": ["Qt5Gui", "Qt5Widgets", "Qt5PrintSupport"], "QtSql": ["Qt5Sql"], "QtTest": ["Qt5Test"],
+    "QtXml": ["Qt5Xml"], "QtXmlPatterns": ["Qt5Network", "Qt5XmlPatterns"], "QtMultimedia": ["Qt5Multimedia"],
+    "QtMultimediaWidgets": ["Qt5Multimedia", "Qt5MultimediaWidgets"], "QtBluetooth": ["Qt5Bluetooth"],
+    "QtNfc": ["Qt5Nfc"], "QtPositioning": ["Qt5Positioning"], "QtLocation": ["Qt5Location"],
+    "QtSensors": ["Qt5Sensors"], "QtSerialPort": ["Qt5SerialPort"], "QtRemoteObjects": ["Qt5RemoteObjects"],
+    "QtTextToSpeech": ["Qt5TextToSpeech"], "QtWinExtras": ["Qt5WinExtras"], "QtHelp": ["Qt5Help"],
+    "QtDesigner": ["Qt5Designer"], "QtWebChannel": ["Qt5WebChannel"], "Qt3DCore": ["Qt53DCore"],
+}
+# Qt plugins a widgets application on Windows loads. The icons are drawn, no image file is ever read
+SLIM_PLUGINS = ["platforms/qwindows", "styles/qwindowsvistastyle"]
+# OpenGL and Direct3D libraries, a widgets application painting in software never loads them
+OPENGL_LIBRARIES = ["d3dcompiler_47", "libEGL", "libGLESv2", "opengl32sw"]
+# Libraries only optional features import, left out of a slim build unless --keep-optional is given
+OPTIONAL_MODULES = {"numpy": "content-adaptive brightness"}
+# Standard library packages that neither the application nor the modules it uses import
+UNUSED_STDLIB = ["tkinter", "unittest", "pydoc", "doctest", "lib2to3", "distutils", "test", "pdb", "sqlite3"]
+
 def check_pyinstaller():
     """Check if PyInstaller is installed, install if not."""
     try:
@@ -14,11 +44,144 @@ def check_pyinstaller():
         subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
         print("PyInstaller installed successfully.")
 
-def build_exe(one_file=False, console=False):
+def find_imports(entry_points, root="."):
+    """
+    Follows the imports of the application's own modules, starting at the entry points.
+
+    Returns:
+        The modules outside the project the application imports, top-level
+        names except for PyQt5, whose modules are listed one by one.
+    """
+    def is_project_module(name):
+        path = os.path.join(root, *name.split("."))
+        return os.path.exists(path + ".py") or os.path.isdir(path)
+
+    imports, seen = set(), set()
+    pending = list(entry_points)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = os.path.join(root, *name.split("."))
+        path = path + ".py" if os.path.exists(path + ".py") else os.path.join(path, "__init__.py")
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        # Imports inside functions count too, the backends import their libraries lazily
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for imported in names:
+                top = imported.split(".")[0]
+                if is_project_module(top):
+                    if is_project_module(imported):
+                        pending.append(imported)
+                elif top == "PyQt5":
+                    imports.add(".".join(imported.split(".")[:2]))
+                else:
+                    imports.add(top)
+    return imports
+
+def slim_exclusions(imports, keep_optional=False):
+    """
+    Derives what a slim build leaves out from the modules the application imports.
+
+    Returns:
+        The modules to exclude from the analysis, and file name patterns of
+        the Qt libraries, plugins and translations to drop from the bundle.
+    """
+    used_qt = {name.split(".")[1] for name in imports if name.startswith("PyQt5.")}
+    libraries = {"Qt5Core"}
+    for module in used_qt:
+        libraries.update(QT_LIBRARIES.get(module, []))
+    excludes = [f"PyQt5.{module}" for module in sorted(set(QT_LIBRARIES) - used_qt)] + UNUSED_STDLIB
+    if not keep_optional:
+        excludes += sorted(set(OPTIONAL_MODULES) & imports)
+    unused = sorted({library for needed in QT_LIBRARIES.values() for library in needed} - libraries)
+    patterns = [f"*/qt5/bin/{library.lower()}.dll" for library in unused + OPENGL_LIBRARIES]
+    patterns += ["*/qt5/translations/*"]
+    return excludes, patterns
+
+def is_excluded(path, patterns, plugins=SLIM_PLUGINS):
+    """Tells whether a slim build drops a file, given its path inside the bundle."""
+    path = path.replace("\\", "/").lower()
+    if "/qt5/plugins/" in path:
+        plugin = os.path.splitext(path.split("/qt5/plugins/", 1)[1])[0]
+        return plugin not in plugins
+    return any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+
+def excluded_files(bundle, patterns):
+    """Returns the files of a built bundle a slim build would drop, with their sizes in bytes."""
+    dropped = []
+    for directory, _, files in os.walk(bundle):
+        for name in files:
+            path = os.path.join(directory, name)
+            if is_excluded(os.path.relpath(path, bundle), patterns):
+                dropped.append((path, os.path.getsize(path)))
+    return dropped
+
+def directory_size(path):
+    """Returns the size of all files below a directory in bytes."""
+    return sum(os.path.getsize(os.path.join(directory, name)) for directory, _, files in os.walk(path) for name in files)
+
+def analyze(keep_optional=False, bundle=os.path.join("dist", "MonitorBrightness")):
+    """Prints what a slim build keeps and drops, and how much smaller an existing bundle would get."""
+    imports = find_imports([ENTRY_POINT[:-3]] + [name for name in HIDDEN_IMPORTS if name.startswith("backends")])
+    excludes, patterns = slim_exclusions(imports, keep_optional)
+    print("Imported by the application: " + ", ".join(sorted(imports)))
+    print("Optional: " + ", ".join(f"{name} ({feature})" for name, feature in OPTIONAL_MODULES.items()
+                                    if name in imports) + ("" if keep_optional else ", left out"))
+    print(f"Plugins kept: {', '.join(SLIM_PLUGINS)}")
+    print("Excluded modules: " + ", ".join(excludes))
+    if os.path.isdir(bundle):
+        dropped = excluded_files(bundle, patterns)
+        total = directory_size(bundle)
+        removed = sum(size for _, size in dropped)
+        for path, size in sorted(dropped, key=lambda item: -item[1])[:15]:
+            print(f"  {size / 1024:8.0f} KB  {os.path.relpath(path, bundle)}")
+        print(f"{bundle}: {len(dropped)} files would be dropped, {total / 2**20:.1f} MB -> "
+              f"{(total - removed) / 2**20:.1f} MB ({-100 * removed / total:.0f}%)")
+    return excludes, patterns
+
+def build_exe(one_file=False, console=False, slim=False, keep_optional=False):
     """Build the executable using PyInstaller."""
     # Ensure PyInstaller is installed
     check_pyinstaller()
     
+    # The size of the previous build, to report what a slim build saves
+    bundle = os.path.join("dist", "MonitorBrightness.exe" if one_file else "MonitorBrightness")
+    previous_size = None
+    if os.path.isdir(bundle):
+        previous_size = directory_size(bundle)
+    elif os.path.isfile(bundle):
+        previous_size = os.path.getsize(bundle)
+
+    # A slim build leaves out every module, Qt library, plugin and translation the application does not use
+    excludes, patterns = analyze(keep_optional) if slim else ([], [])
+    slim_part = "" if not slim else f"""
+import fnmatch
+
+SLIM_PLUGINS = {SLIM_PLUGINS!r}
+SLIM_PATTERNS = {patterns!r}
+
+def is_excluded(path):
+    path = path.replace("\\\\", "/").lower()
+    if "/qt5/plugins/" in path:
+        plugin = os.path.splitext(path.split("/qt5/plugins/", 1)[1])[0]
+        return plugin not in SLIM_PLUGINS
+    return any(fnmatch.fnmatch(path, pattern) for pattern in SLIM_PATTERNS)
+
+dropped = [entry for entry in a.binaries + a.datas if is_excluded(entry[0])]
+print("Slim build: dropping %d files, %.1f MB" % (
+    len(dropped), sum(os.path.getsize(entry[1]) for entry in dropped if os.path.exists(entry[1])) / 2**20))
+a.binaries = [entry for entry in a.binaries if not is_excluded(entry[0])]
+a.datas = [entry for entry in a.datas if not is_excluded(entry[0])]
+"""
+
     # Clean previous build if exists
     if os.path.exists("build"):
         shutil.rmtree("build")
@@ -44,24 +207,26 @@ coll = COLLECT(
 """
     
     spec_content = f"""# -*- mode: python ; coding: utf-8 -*-
+import os
 
 block_cipher = None
 
 a = Analysis(
-    ['monitor.py'],
+    [{ENTRY_POINT!r}],
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['PyQt5.sip'],
+    hiddenimports={HIDDEN_IMPORTS!r},
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes=[],
+    excludes={excludes!r},
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
 )
+{slim_part}
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
 exe = EXE(
@@ -103,6 +268,9 @@ exe = EXE(
     exe_path = os.path.join("dist", "MonitorBrightness.exe" if one_file else "MonitorBrightness", "MonitorBrightness.exe")
     if os.path.exists(exe_path):
         print(f"Build successful! Executable created at: {os.path.abspath(exe_path)}")
+        size = directory_size(bundle) if os.path.isdir(bundle) else os.path.getsize(bundle)
+        delta = "" if previous_size is None else f", {(size - previous_size) / 2**20:+.1f} MB against the previous build"
+        print(f"Bundle size: {size / 2**20:.1f} MB{delta}")
     else:
         print("Build failed. Executable not found.")
 
@@ -136,13 +304,21 @@ def main():
     parser.add_argument("--onefile", action="store_true", help="Build a single executable file")
     parser.add_argument("--console", action="store_true", help="Show console window when running")
     parser.add_argument("--installer", action="store_true", help="Build the installer executable")
+    parser.add_argument("--slim", action="store_true",
+                        help="Leave out the Qt modules, libraries, plugins and translations the application does not use")
+    parser.add_argument("--keep-optional", action="store_true",
+                        help="With --slim, keep libraries only optional features import, such as NumPy")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Only print what --slim would leave out and how much smaller the current bundle would get")
     
     args = parser.parse_args()
     
-    if args.installer:
+    if args.analyze:
+        analyze(args.keep_optional)
+    elif args.installer:
         build_installer_exe()
     else:
-        build_exe(one_file=args.onefile, console=args.console)
+        build_exe(one_file=args.onefile, console=args.console, slim=args.slim, keep_optional=args.keep_optional)
 
 if __name__ == "__main__":
     main()
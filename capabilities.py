@@ -0,0 +1,163 @@
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+VCP_LUMINANCE = 0x10
+VCP_CONTRAST = 0x12
+
+logger = logging.getLogger(__name__)
+
+_VCP_SECTION = re.compile(r"(?<![a-z_])vcp\(", re.IGNORECASE)
+_HEX_RUN = re.compile(r"[0-9a-f]+", re.IGNORECASE)
+
+
+class UnsupportedVCPCode(ValueError):
+    """Raised when a monitor does not support the VCP code that was asked for."""
+
+
+def parse_vcp_codes(capabilities: str) -> Optional[FrozenSet[int]]:
+    """
+    Extracts the supported VCP codes from a DDC/CI capabilities string.
+
+    Only the codes themselves are returned, the allowed values listed in
+    parentheses after a code are skipped. Some monitors leave out the spaces
+    between codes, so runs of hex digits are split into pairs.
+
+    Args:
+        capabilities (str): The raw string, e.g. "(prot(monitor)vcp(02 10 12 14(05 08))mccs_ver(2.1))".
+
+    Returns:
+        The supported codes, or None when the string has no vcp section.
+    """
+    match = _VCP_SECTION.search(capabilities or "")
+    if match is None:
+        return None
+
+    codes = set()
+    depth = 1
+    top_level = []
+    for char in capabilities[match.end():]:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                break
+        elif depth == 1:
+            top_level.append(char)
+            continue
+        top_level.append(" ")
+
+    for run in _HEX_RUN.findall("".join(top_level)):
+        if len(run) % 2:
+            continue
+        codes.update(int(run[i:i + 2], 16) for i in range(0, len(run), 2))
+    return frozenset(codes)
+
+
+def is_persistent(monitor_id) -> bool:
+    """Returns whether a monitor ID is stable enough to cache capabilities on disk for."""
+    return isinstance(monitor_id, str) and not monitor_id.startswith("index:")
+
+
+def read_vcp_features(monitor, codes: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    Reads several VCP codes from an opened monitor.
+
+    A code that fails is left out of the result. If every code fails, the
+    last error is raised so the caller can retry on a fresh handle.
+
+    Args:
+        monitor: Opened monitorcontrol Monitor.
+        codes (Iterable[int]): The VCP codes to read.
+
+    Returns:
+        (current, maximum) keyed by VCP code.
+    """
+    values = {}
+    error = None
+    for code in codes:
+        try:
+            values[code] = tuple(monitor.vcp.get_vcp_feature(code))
+        except Exception as e:
+            logger.debug("Failed to read VCP code 0x%02X: %s", code, e)
+            error = e
+    if not values and error is not None:
+        raise error
+    return values
+
+
+class MonitorCapabilities:
+    """
+    Knows which VCP codes each monitor supports.
+
+    Querying the capabilities string of a monitor can take seconds, so it is
+    done once per monitor. The parsed codes are kept in memory for the session
+    and on disk in the state cache for monitors with a stable ID. A remembered
+    entry without VCP 0x10 is only trusted for monitors identified by their
+    EDID serial. For IDs that another monitor could share it is queried again,
+    so a stale entry can never lock the user out of a monitor's brightness.
+    """
+
+    def __init__(self, store=None):
+        """
+        Args:
+            store: BrightnessStateCache the codes are remembered in across restarts, or None.
+        """
+        self._store = store
+        self._lock = threading.Lock()
+        self._codes: Dict[Any, Optional[FrozenSet[int]]] = {}
+        self.queries = 0
+
+    def get(self, monitor_id, query: Callable[[], str]) -> Optional[FrozenSet[int]]:
+        """
+        Returns the VCP codes a monitor supports, querying the monitor only the first time.
+
+        Args:
+            monitor_id: ID of the monitor.
+            query (Callable): Returns the raw capabilities string of the monitor.
+
+        Returns:
+            The supported codes, or None when the monitor's capabilities are unknown.
+        """
+        with self._lock:
+            if monitor_id in self._codes:
+                return self._codes[monitor_id]
+
+        codes = None
+        if self._store is not None and is_persistent(monitor_id):
+            codes = self._store.get_capabilities(monitor_id)
+            if codes is not None and VCP_LUMINANCE not in codes and not monitor_id.startswith("edid:"):
+                codes = None
+
+        if codes is None:
+            self.queries += 1
+            try:
+                codes = parse_vcp_codes(query())
+            except Exception as e:
+                logger.warning("Failed to query capabilities of monitor %s: %s", monitor_id, e)
+            if codes is not None and self._store is not None and is_persistent(monitor_id):
+                self._store.set_capabilities(monitor_id, codes)
+
+        # Unknown capabilities are remembered too, the query is too slow to repeat
+        with self._lock:
+            self._codes[monitor_id] = codes
+        return codes
+
+    def supported(self, monitor_id, codes: Iterable[int], query: Callable[[], str]) -> List[int]:
+        """
+        Returns the given codes the monitor supports. All of them when its capabilities are unknown.
+
+        Args:
+            monitor_id: ID of the monitor.
+            codes (Iterable[int]): The VCP codes wanted.
+            query (Callable): Returns the raw capabilities string of the monitor.
+        """
+        known = self.get(monitor_id, query)
+        return [code for code in codes if known is None or code in known]
+
+    def forget(self, monitor_id):
+        """Drops what is known about a monitor for this session."""
+        with self._lock:
+            self._codes.pop(monitor_id, None)
@@ -0,0 +1,259 @@
+"""
+Platform-neutral brightness state and helpers.
+
+Nothing in here imports Qt or any platform library, monitors are whatever
+objects the active backend returned from get_monitors. This keeps the
+brightness logic importable, and testable, on any system.
+"""
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from backends import get_backend
+from capabilities import (
+    VCP_CONTRAST,
+    VCP_LUMINANCE,
+    MonitorCapabilities,
+    UnsupportedVCPCode,
+    read_vcp_features,
+)
+from handle_pool import MonitorHandlePool
+from hotplug import MonitorChanges, MonitorTracker
+from instrumentation import Instrumentation
+from io_worker import IOWorker
+from registry import MonitorRegistry
+from state_cache import BrightnessStateCache, default_state_dir, STATE_FILE_NAME
+
+# Constants
+APP_NAME = "MonitorBrightnessApp"
+MIN_BRIGHTNESS = 0
+MAX_BRIGHTNESS = 100
+BRIGHTNESS_STEP = 10  # hotkey step size
+RECONCILE_TOLERANCE = 5  # brightness levels a read-back may differ from the set value, ReadMonitorState rounds to tens
+HANDLE_IDLE_TIMEOUT = 30000  # milliseconds
+MAX_IO_WORKERS = 8  # concurrent DDC/CI calls
+INSTRUMENTATION_ENV = "MONITOR_BRIGHTNESS_INSTRUMENTATION"  # set to 1 to record latencies from the start
+
+# Connected monitors and their brightness keyed by stable monitor ID, shared by all threads
+monitor_registry = MonitorRegistry()
+
+# Open handles to the registered monitors, shared by all VCP calls
+monitor_handles = MonitorHandlePool(HANDLE_IDLE_TIMEOUT / 1000)
+
+# Threads every monitor read and write runs on, never the GUI thread
+monitor_io = IOWorker(MAX_IO_WORKERS)
+
+# Re-enumerates the monitors of the active backend and reports what changed
+monitor_tracker = MonitorTracker(lambda: get_backend().get_monitors())
+
+# Brightness remembered across restarts, keyed by monitor ID
+state_cache = BrightnessStateCache(os.path.join(default_state_dir(APP_NAME), STATE_FILE_NAME))
+
+# VCP codes each monitor supports, queried once and remembered in the state cache
+monitor_capabilities = MonitorCapabilities(state_cache)
+
+# Latency histograms of the brightness hot path, off unless enabled in the diagnostics
+instrumentation = Instrumentation(enabled=os.environ.get(INSTRUMENTATION_ENV) == "1")
+
+logger = logging.getLogger(__name__)
+
+
+def clamp_brightness(brightness: int) -> int:
+    """Limits a brightness level to the 0-100 range."""
+    return max(MIN_BRIGHTNESS, min(MAX_BRIGHTNESS, brightness))
+
+
+def step_brightness(brightness: int, direction: int, step: int = BRIGHTNESS_STEP) -> int:
+    """
+    Returns the brightness one hotkey step up or down.
+
+    Args:
+        brightness (int): The current brightness level.
+        direction (int): 1 to step up, -1 to step down.
+        step (int): Size of the step.
+    """
+    return clamp_brightness(brightness + direction * step)
+
+
+def CacheMonitors(monitors: Dict[str, Any]):
+    """
+    Makes the given monitors the registered monitors and pools their handles.
+
+    Monitors that stay connected keep their brightness, and their open handle
+    if the backend returned the same object for them.
+
+    Args:
+        monitors (Dict[str, Any]): Monitor objects keyed by monitor ID.
+    """
+    monitor_registry.set_monitors(monitors)
+    monitor_handles.update_monitors(monitors)
+
+
+def RefreshMonitors() -> MonitorChanges:
+    """
+    Enumerates the monitors again and caches the result.
+
+    Returns:
+        The monitor IDs that were added, removed and kept since the last enumeration.
+    """
+    changes = monitor_tracker.refresh()
+    CacheMonitors(monitor_tracker.monitors)
+    for monitor_id in changes.removed:
+        monitor_capabilities.forget(monitor_id)
+    return changes
+
+
+def monitor_label(monitor_id) -> str:
+    """Returns a name for a monitor in messages, like "Monitor 2"."""
+    position = monitor_registry.snapshot().position(monitor_id)
+    return f"Monitor {monitor_id}" if position is None else f"Monitor {position + 1}"
+
+
+def remember_brightness(monitor_id: str, brightness: int):
+    """
+    Stores the brightness written to a monitor in the on-disk state cache.
+
+    Args:
+        monitor_id (str): The monitor that was written.
+        brightness (int): The brightness that was written.
+    """
+    if monitor_id in monitor_registry.snapshot():
+        state_cache.set(monitor_id, brightness)
+
+
+def ReadMonitorFeatures(monitor_id: str, codes: Iterable[int] = (VCP_LUMINANCE, VCP_CONTRAST),
+                        handles: MonitorHandlePool = None) -> Dict[int, Tuple[int, int]]:
+    """
+    Reads several VCP codes of a single monitor with one handle open.
+
+    Codes the monitor's capabilities do not list are skipped without asking
+    the monitor. The capabilities are queried on first use only.
+
+    Args:
+        monitor_id (str): The monitor to read.
+        codes (Iterable[int]): The VCP codes to read.
+        handles (MonitorHandlePool): Pool holding the monitor. Defaults to monitor_handles.
+
+    Returns:
+        (current, maximum) keyed by VCP code, for the codes that could be read.
+    """
+    handles = monitor_handles if handles is None else handles
+    supported = monitor_capabilities.supported(
+        monitor_id, codes, lambda: handles.call(monitor_id, lambda monitor: monitor.vcp.get_vcp_capabilities())
+    )
+    if not supported:
+        return {}
+    return handles.call(monitor_id, lambda monitor: read_vcp_features(monitor, supported))
+
+
+def ReadMonitorState(monitor_id: str, handles: MonitorHandlePool = None) -> Dict[str, int]:
+    """
+    Reads the brightness, maximum luminance and, if supported, contrast of a monitor.
+
+    Args:
+        monitor_id (str): The monitor to read.
+        handles (MonitorHandlePool): Pool holding the monitor. Defaults to monitor_handles.
+
+    Returns:
+        Dict with "brightness" rounded to the nearest ten like the hotkey steps,
+        "luminance" as the monitor reported it, "max_luminance" and
+        "contrast" (None when not supported).
+
+    Raises:
+        UnsupportedVCPCode: The monitor does not support luminance (VCP 0x10).
+    """
+    values = ReadMonitorFeatures(monitor_id, (VCP_LUMINANCE, VCP_CONTRAST), handles)
+    if VCP_LUMINANCE not in values:
+        raise UnsupportedVCPCode(f"Monitor {monitor_id} does not support VCP code 0x{VCP_LUMINANCE:02X}")
+    luminance, max_luminance = values[VCP_LUMINANCE]
+    contrast = values.get(VCP_CONTRAST)
+    return {
+        "brightness": round(luminance, -1),
+        "luminance": luminance,
+        "max_luminance": max_luminance,
+        "contrast": None if contrast is None else contrast[0],
+    }
+
+
+def record_monitor_state(monitor_id: str, state: Dict[str, int]):
+    """Stores the values from ReadMonitorState in the registry."""
+    monitor_registry.update(
+        brightness={monitor_id: state["brightness"]},
+        last_brightness={monitor_id: state["brightness"]},
+        confirmed_brightness={monitor_id: state["luminance"]},
+        contrast={monitor_id: state["contrast"]},
+        max_luminance={monitor_id: state["max_luminance"]},
+    )
+
+
+def SetMonitorLuminance(monitor_id: str, brightness: int, handles: MonitorHandlePool = None):
+    """
+    Writes the luminance of a single monitor through the handle pool.
+
+    Blocks until the monitor answered and propagates any exception raised by
+    the monitor to the caller, so it is only called on the I/O worker.
+
+    Args:
+        monitor_id (str): The monitor to adjust.
+        brightness (int): The brightness level to set (0-100).
+        handles (MonitorHandlePool): Pool holding the monitor. Defaults to monitor_handles.
+    """
+    handles = monitor_handles if handles is None else handles
+    handles.call(monitor_id, lambda monitor: monitor.set_luminance(brightness))
+
+
+def ReconcileMonitorBrightness(monitor_id: str, handles: MonitorHandlePool = None,
+                               busy: Callable[[], bool] = None) -> Optional[int]:
+    """
+    Reads the luminance of a monitor back and adopts it if it was changed outside the application.
+
+    The value is only adopted when nothing about the brightness changed in
+    the registry while the monitor was being read, and no write is under way,
+    so a read that raced with the user can never undo their change. A value
+    within RECONCILE_TOLERANCE of the last one set counts as unchanged, as
+    ReadMonitorState rounded it at startup, and is only noted as the value
+    the monitor confirmed.
+
+    Args:
+        monitor_id (str): The monitor to read.
+        handles (MonitorHandlePool): Pool holding the monitor. Defaults to monitor_handles.
+        busy (Callable): Returns whether brightness writes are pending or running.
+
+    Returns:
+        The adopted brightness, or None when it was unchanged or could not be adopted.
+    """
+    snapshot = monitor_registry.snapshot()
+    record = snapshot.get(monitor_id)
+    if record is None or record.last_brightness is None:
+        return None
+    values = ReadMonitorFeatures(monitor_id, (VCP_LUMINANCE,), handles)
+    if VCP_LUMINANCE not in values:
+        return None
+    luminance = values[VCP_LUMINANCE][0]
+    if busy is not None and busy():
+        return None
+    if abs(luminance - record.last_brightness) <= RECONCILE_TOLERANCE:
+        if luminance != record.confirmed_brightness:
+            monitor_registry.update(expected_version=snapshot.version, confirmed_brightness={monitor_id: luminance})
+        return None
+    version = monitor_registry.update(
+        expected_version=snapshot.version,
+        brightness={monitor_id: luminance},
+        last_brightness={monitor_id: luminance},
+        confirmed_brightness={monitor_id: luminance},
+    )
+    return None if version is None else luminance
+
+
+def RetrieveBrightness():
+    """
+    Retrieves current brightness, contrast and maximum luminance of all monitors
+    and updates the registry. Monitors without luminance support are skipped.
+    """
+    for monitor_id in monitor_registry.snapshot():
+        try:
+            record_monitor_state(monitor_id, ReadMonitorState(monitor_id))
+        except UnsupportedVCPCode as e:
+            logger.info("%s", e)
+        except Exception as e:
+            logger.error("Failed to read monitor %s: %s", monitor_id, e)
@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+DEFAULT_IDLE_TIMEOUT = 30.0  # seconds
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledHandle:
+    """A monitor together with the state of its open handle."""
+
+    __slots__ = ("monitor", "lock", "is_open", "last_used")
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.lock = threading.Lock()
+        self.is_open = False
+        self.last_used = 0.0
+
+
+class MonitorHandlePool:
+    """
+    Keeps monitor handles open across VCP calls.
+
+    Entering a monitorcontrol Monitor acquires its physical handle and leaving it
+    releases the handle again. Doing that around every single call is costly when
+    a key is held down, so the pool enters each monitor once and keeps it open
+    until it has been idle for `idle_timeout` seconds. Calls on the same monitor
+    are serialized, calls on different monitors may run in parallel. A call that
+    fails on a handle kept open from an earlier call is retried once on a
+    freshly opened handle in case the old one went stale. A failure on a
+    handle opened for the call itself is raised right away, a new handle
+    would not help and retrying would double the time a failing monitor holds
+    the bus.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            idle_timeout (float): Seconds of inactivity after which a handle is closed.
+            clock (Callable): Monotonic time source, injectable for testing.
+        """
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._handles: Dict[Hashable, _PooledHandle] = {}
+        self._reaper = None
+        self._stop_reaper = threading.Event()
+        self.opens = 0
+        self.closes = 0
+        self.reopens = 0
+
+    def set_monitors(self, monitors: Iterable):
+        """
+        Replaces the pooled monitors, closing any handle that is still open.
+
+        Args:
+            monitors: Either a list of monitors, pooled by index, or a dict of
+                monitors keyed by any hashable key.
+        """
+        items = monitors.items() if isinstance(monitors, dict) else enumerate(monitors)
+        self.close_all()
+        with self._lock:
+            self._handles = {key: _PooledHandle(monitor) for key, monitor in items}
+
+    def update_monitors(self, monitors: Dict[Hashable, Any]):
+        """
+        Brings the pool in line with a new enumeration without touching unchanged monitors.
+
+        Handles of monitors that are gone, or that now come with a different
+        monitor object, are closed. Handles of monitors whose object is the same
+        stay open.
+
+        Args:
+            monitors (Dict): Monitors keyed by any hashable key.
+        """
+        with self._lock:
+            stale = [handle for key, handle in self._handles.items()
+                     if monitors.get(key) is not handle.monitor]
+            self._handles = {
+                key: (self._handles[key] if key in self._handles and self._handles[key].monitor is monitor
+                      else _PooledHandle(monitor))
+                for key, monitor in monitors.items()
+            }
+
+        for handle in stale:
+            with handle.lock:
+                if handle.is_open:
+                    self._close(handle)
+
+    def call(self, key: Hashable, func: Callable[[Any], Any]):
+        """
+        Runs `func(monitor)` with the monitor's handle open.
+
+        Args:
+            key (Hashable): Key of the monitor in the pool.
+            func (Callable): Function receiving the opened monitor.
+
+        Returns:
+            Whatever `func` returns.
+
+        Raises:
+            KeyError: The key is not in the pool.
+            Exception: Whatever `func` raised on a fresh handle, or on the retry with one.
+        """
+        with self._lock:
+            handle = self._handles[key]
+
+        with handle.lock:
+            for attempt in range(2):
+                reused = handle.is_open
+                if not reused:
+                    self._open(handle)
+                    if attempt:
+                        self.reopens += 1
+                try:
+                    result = func(handle.monitor)
+                except (ValueError, TypeError):
+                    # Bad arguments, a new handle would not help
+                    handle.last_used = self._clock()
+                    raise
+                except Exception as e:
+                    self._close(handle)
+                    if not reused:
+                        raise
+                    logger.debug("VCP call on monitor %s failed, reopening handle: %s", key, e)
+                    continue
+                handle.last_used = self._clock()
+                return result
+
+    def close_idle(self) -> int:
+        """
+        Closes every handle that has not been used for `idle_timeout` seconds.
+
+        Returns:
+            The number of handles closed.
+        """
+        with self._lock:
+            handles = list(self._handles.values())
+
+        closed = 0
+        now = self._clock()
+        for handle in handles:
+            # Skip handles that are busy, they are clearly not idle
+            if not handle.lock.acquire(blocking=False):
+                continue
+            try:
+                if handle.is_open and now - handle.last_used >= self.idle_timeout:
+                    self._close(handle)
+                    closed += 1
+            finally:
+                handle.lock.release()
+        return closed
+
+    def close_all(self):
+        """Closes every open handle and stops the idle reaper."""
+        self._stop_reaper.set()
+        with self._lock:
+            handles = list(self._handles.values())
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None and reaper is not threading.current_thread():
+            reaper.join()
+
+        for handle in handles:
+            with handle.lock:
+                if handle.is_open:
+                    self._close(handle)
+
+    def open_count(self) -> int:
+        """Returns the number of handles currently open."""
+        with self._lock:
+            return sum(1 for handle in self._handles.values() if handle.is_open)
+
+    def _open(self, handle: _PooledHandle):
+        handle.monitor.__enter__()
+        handle.is_open = True
+        handle.last_used = self._clock()
+        self.opens += 1
+        self._ensure_reaper()
+
+    def _close(self, handle: _PooledHandle):
+        handle.is_open = False
+        self.closes += 1
+        try:
+            handle.monitor.__exit__(None, None, None)
+        except Exception as e:
+            logger.debug("Failed to close monitor handle: %s", e)
+
+    def _ensure_reaper(self):
+        """Starts the background thread that closes idle handles, once."""
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._stop_reaper.clear()
+            self._reaper = threading.Thread(target=self._reap, name="ddc-handle-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        while not self._stop_reaper.wait(self.idle_timeout / 2):
+            self.close_idle()
@@ -0,0 +1,223 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+FIRST_STEP = 10  # brightness points of a single press
+MAX_REPEAT_STEP = 20  # brightness points per auto-repeat at most
+SLOW_REPEAT_RATE = 40.0  # brightness points per second when a hotkey starts repeating
+FAST_REPEAT_RATE = 300.0  # brightness points per second after ACCELERATION_TIME
+ACCELERATION_TIME = 0.75  # seconds of holding until FAST_REPEAT_RATE is reached
+DEFAULT_REPEAT_INTERVAL = 0.033  # seconds between auto-repeats until the cadence is measured
+CADENCE_SMOOTHING = 0.3  # weight of the newest repeat interval in the cadence
+
+# Bit per modifier, names as the keyboard library reports them after dropping "left "/"right "
+MODIFIER_BITS = {
+    "ctrl": 1,
+    "shift": 2,
+    "alt": 4,
+    "alt gr": 4,
+    "windows": 8,
+}
+
+# Every name a modifier key event can carry, with its bit
+MODIFIER_KEYS = dict(MODIFIER_BITS)
+MODIFIER_KEYS.update({f"{side} {name}": bit for name, bit in MODIFIER_BITS.items() for side in ("left", "right")})
+
+
+def parse_hotkey(hotkey: str) -> Tuple[int, str]:
+    """
+    Splits a hotkey like "ctrl+up" into its modifier mask and trigger key.
+
+    Raises:
+        ValueError: The hotkey has no trigger key or an unknown modifier.
+    """
+    parts = [part.strip().lower() for part in hotkey.split("+")]
+    *modifiers, key = parts
+    if not key or key in MODIFIER_BITS:
+        raise ValueError(f"Hotkey '{hotkey}' has no trigger key")
+    mask = 0
+    for modifier in modifiers:
+        bit = MODIFIER_KEYS.get(modifier)
+        if bit is None:
+            raise ValueError(f"Unknown modifier '{modifier}' in hotkey '{hotkey}'")
+        mask |= bit
+    return mask, key
+
+
+class HotkeyDispatcher:
+    """
+    Matches raw key events against a fixed set of hotkeys.
+
+    The global hook sees every key typed anywhere in the system, so the work
+    per event has to be tiny. Modifier state is tracked from the events
+    themselves instead of asking the hook library, and the hotkeys are
+    compiled into a table keyed by (modifier mask, key), so an event costs a
+    set lookup and at most one dictionary lookup. Keys that are neither a
+    modifier nor a trigger key of any hotkey return right away.
+
+    Only exact matches fire: with "ctrl+up" bound, Ctrl+Shift+Up does nothing.
+    """
+
+    def __init__(self, bindings: Dict[str, Any], on_action: Callable[[Any, Any], None],
+                 on_release: Callable[[Any, Any], None] = None):
+        """
+        Args:
+            bindings (Dict[str, Any]): Action keyed by hotkey, e.g. `{"ctrl+up": 1, "ctrl+down": -1}`.
+            on_action (Callable): Called as `on_action(action, event)` when a hotkey is pressed
+                or auto-repeats, on the thread that feeds the events.
+            on_release (Callable): Called as `on_release(action, event)` when the trigger key or
+                a modifier of the last pressed hotkey is released.
+
+        Raises:
+            ValueError: A hotkey could not be parsed.
+        """
+        self._on_action = on_action
+        self._on_release = on_release
+        self._table: Dict[Tuple[int, str], Any] = {}
+        for hotkey, action in bindings.items():
+            self._table[parse_hotkey(hotkey)] = action
+        self._trigger_keys = frozenset(key for _, key in self._table)
+        self._modifiers = 0
+        self._active: Optional[Tuple[str, Any]] = None  # trigger key and action of the held hotkey
+        self.matches = 0
+
+    def feed(self, event) -> bool:
+        """
+        Handles one key event from the hook.
+
+        Args:
+            event: Event with a lower case `name` and `event_type` ("down" or "up"),
+                like keyboard.KeyboardEvent.
+
+        Returns:
+            Whether the event triggered a hotkey.
+        """
+        name = event.name
+        if name not in self._trigger_keys:
+            bit = MODIFIER_KEYS.get(name)
+            if bit is not None:
+                if event.event_type == "down":
+                    self._modifiers |= bit
+                else:
+                    self._modifiers &= ~bit
+                    self._release(event)
+            return False
+
+        if event.event_type != "down":
+            if self._active is not None and self._active[0] == name:
+                self._release(event)
+            return False
+        action = self._table.get((self._modifiers, name))
+        if action is None:
+            self._release(event)
+            return False
+        self.matches += 1
+        self._active = (name, action)
+        self._on_action(action, event)
+        return True
+
+    def reset(self):
+        """Forgets the held keys, e.g. after the hook missed releases while the desktop was locked."""
+        self._modifiers = 0
+        self._active = None
+
+    def _release(self, event):
+        """Ends the held hotkey, if any."""
+        if self._active is None:
+            return
+        action = self._active[1]
+        self._active = None
+        if self._on_release is not None:
+            self._on_release(action, event)
+
+
+class KeyRepeatPolicy:
+    """
+    Decides how far each press of a held hotkey moves the brightness.
+
+    A single press moves FIRST_STEP points. While the key is held, the
+    keyboard's auto-repeat fires the hotkey again and again. The policy
+    measures that cadence and hands out steps that move the brightness at a
+    rate in points per second, starting at SLOW_REPEAT_RATE and accelerating
+    to FAST_REPEAT_RATE over ACCELERATION_TIME. No repeat moves less than a
+    single press, so holding the key is never slower than pressing it
+    repeatedly. Above that, the speed depends on how long the key is held,
+    not on the repeat rate set in the operating system. Times are passed in, so a scripted sequence of
+    presses gives the same steps every time.
+    """
+
+    def __init__(self, first_step: int = FIRST_STEP, max_step: int = MAX_REPEAT_STEP,
+                 slow_rate: float = SLOW_REPEAT_RATE, fast_rate: float = FAST_REPEAT_RATE,
+                 acceleration_time: float = ACCELERATION_TIME, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            first_step (int): Points a single press moves.
+            max_step (int): Most points one repeat may move.
+            slow_rate (float): Points per second when repeating starts.
+            fast_rate (float): Points per second after `acceleration_time`.
+            acceleration_time (float): Seconds of repeating until `fast_rate` is reached.
+            clock (Callable): Monotonic time source in seconds, used when no time is passed.
+        """
+        self.first_step = first_step
+        self.max_step = max_step
+        self.slow_rate = slow_rate
+        self.fast_rate = fast_rate
+        self.acceleration_time = acceleration_time
+        self._clock = clock
+        self._action = None
+        self._last_press = None
+        self._repeat_start = None
+        self.interval: Optional[float] = None  # measured seconds between auto-repeats
+        self.repeats = 0
+
+    @property
+    def held(self) -> bool:
+        """Whether a hotkey is currently held."""
+        return self._action is not None
+
+    def press(self, action: Any, now: float = None) -> int:
+        """
+        Returns the number of points a press of `action` moves.
+
+        A press of the action that is already held counts as an auto-repeat.
+
+        Args:
+            action: The hotkey action that fired.
+            now (float): Time of the press in seconds. Defaults to the clock.
+        """
+        now = self._clock() if now is None else now
+        if action != self._action:
+            self._action = action
+            self._last_press = now
+            self._repeat_start = None
+            self.repeats = 0
+            return self.first_step
+
+        elapsed = now - self._last_press
+        self._last_press = now
+        self.repeats += 1
+        if self._repeat_start is None:
+            # The gap before the first repeat is the typematic delay, not the cadence
+            self._repeat_start = now
+        elif self.interval is None:
+            self.interval = elapsed
+        else:
+            self.interval += CADENCE_SMOOTHING * (elapsed - self.interval)
+
+        held_for = now - self._repeat_start
+        progress = min(1.0, held_for / self.acceleration_time) if self.acceleration_time > 0 else 1.0
+        rate = self.slow_rate + (self.fast_rate - self.slow_rate) * progress
+        interval = self.interval if self.interval is not None else DEFAULT_REPEAT_INTERVAL
+        return max(self.first_step, min(self.max_step, int(round(rate * interval))))
+
+    def release(self) -> bool:
+        """
+        Ends the held hotkey.
+
+        Returns:
+            Whether the hotkey had been auto-repeating.
+        """
+        repeated = self.repeats > 0
+        self._action = None
+        self._repeat_start = None
+        self.repeats = 0
+        return repeated
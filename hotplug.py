@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from state_cache import monitor_identity
+
+
+class MonitorChanges(NamedTuple):
+    """Monitor IDs that appeared, disappeared or stayed between two enumerations."""
+
+    added: List[str]
+    removed: List[str]
+    kept: List[str]
+
+
+def identify_monitors(monitors: List, identify: Callable[[Any, int], str] = monitor_identity) -> Dict[str, Any]:
+    """
+    Keys the given monitors by their stable ID.
+
+    Identical monitors without a serial number share an ID, those get a "#2",
+    "#3" suffix in enumeration order.
+
+    Args:
+        monitors (List): Monitor objects in enumeration order.
+        identify (Callable): Returns the ID of `identify(monitor, index)`.
+
+    Returns:
+        The monitors keyed by ID, in enumeration order.
+    """
+    keyed = {}
+    for idx, monitor in enumerate(monitors):
+        key = identify(monitor, idx)
+        if key in keyed:
+            suffix = 2
+            while f"{key}#{suffix}" in keyed:
+                suffix += 1
+            key = f"{key}#{suffix}"
+        keyed[key] = monitor
+    return keyed
+
+
+class MonitorTracker:
+    """
+    Tracks the connected monitors across re-enumerations.
+
+    Every `refresh` enumerates the monitors again and compares their IDs with
+    the previous enumeration, so callers only need to probe the monitors that
+    were added and can drop the ones that were removed. Monitors that stay
+    connected keep their ID no matter where they show up in the new list.
+    """
+
+    def __init__(self, enumerate: Callable[[], List], identify: Callable[[Any, int], str] = monitor_identity):
+        """
+        Args:
+            enumerate (Callable): Returns the connected monitors, e.g. Backend.get_monitors.
+            identify (Callable): Returns the stable ID of `identify(monitor, index)`.
+        """
+        self._enumerate = enumerate
+        self._identify = identify
+        self._lock = threading.Lock()
+        self.monitors: Dict[str, Any] = {}
+        self.enumerations = 0
+
+    def refresh(self) -> MonitorChanges:
+        """
+        Enumerates the monitors and records what changed since the last call.
+
+        Returns:
+            The IDs that were added, removed and kept.
+        """
+        found = identify_monitors(self._enumerate(), self._identify)
+        with self._lock:
+            previous, self.monitors = self.monitors, found
+            self.enumerations += 1
+        return MonitorChanges(
+            added=[key for key in found if key not in previous],
+            removed=[key for key in previous if key not in found],
+            kept=[key for key in found if key in previous],
+        )
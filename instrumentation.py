@@ -0,0 +1,271 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+SUB_BUCKET_BITS = 7  # 64 buckets per power of two, values are kept to within 1/64 (1.6%)
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+MAX_PENDING_DELIVERIES = 1024  # emitted signals waiting to be delivered, per stage
+REPORTED_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def bucket_index(value: int) -> int:
+    """
+    Returns the histogram bucket of a non-negative integer value.
+
+    Values below SUB_BUCKET_COUNT get a bucket each, above that every power
+    of two is split into SUB_BUCKET_HALF equally wide buckets, like an
+    HdrHistogram with a fixed relative precision.
+    """
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def bucket_range(index: int) -> Tuple[int, int]:
+    """Returns the lowest and highest value that fall into a bucket."""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    sub_bucket = index - (shift << (SUB_BUCKET_BITS - 1))
+    return sub_bucket << shift, ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in nanoseconds.
+
+    Recording is a dictionary increment and memory grows with the number of
+    distinct buckets hit, not with the number of values, so a histogram can
+    stay enabled for a whole session. Percentiles are exact to within the
+    bucket width. Not thread-safe, Instrumentation serializes access.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value: int):
+        """Adds a duration in nanoseconds."""
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self) -> Optional[float]:
+        """Returns the average duration in nanoseconds, None when nothing was recorded."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[int]:
+        """
+        Returns the duration in nanoseconds that `percent` percent of the recorded values do not exceed.
+
+        Args:
+            percent (float): Between 0 and 100.
+
+        Returns:
+            The highest value of the bucket the percentile falls into, limited
+            to the largest recorded value. None when nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.max, bucket_range(index)[1])
+        return self.max
+
+    def to_dict(self) -> Dict:
+        """Returns the summary and the non-empty buckets, durations in nanoseconds."""
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean(),
+            "percentiles": {str(percent): self.percentile(percent) for percent in REPORTED_PERCENTILES},
+            "buckets": [[bucket_range(index)[0], self.counts[index]] for index in sorted(self.counts)],
+        }
+
+
+class _Span:
+    """Times the body of a with statement into one stage."""
+
+    __slots__ = ("_instrumentation", "_stage", "_start")
+
+    def __init__(self, instrumentation: "Instrumentation", stage: str):
+        self._instrumentation = instrumentation
+        self._stage = stage
+        self._start = 0
+
+    def __enter__(self):
+        self._start = self._instrumentation._clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._instrumentation.record(self._stage, self._instrumentation._clock() - self._start)
+        return False
+
+
+class _NullSpan:
+    """Span handed out while instrumentation is disabled, does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """
+    Per-stage latency histograms of the brightness hot path.
+
+    Stages are timed with the `timed` decorator or a `span` context manager.
+    The time a queued Qt signal spends between the emitting thread and its
+    slot is measured by calling `start_delivery` before the emit and
+    `finish_delivery` in the slot, queued signals are delivered in order.
+
+    While disabled every hook returns after checking a single attribute, so
+    the instrumentation can stay in place in release builds. That still
+    costs a call, on hot paths check `enabled` first and `record` a duration
+    measured anyway, so a disabled stage costs the attribute lookup only.
+    """
+
+    def __init__(self, enabled: bool = False, clock: Callable[[], int] = time.perf_counter_ns):
+        """
+        Args:
+            enabled (bool): Whether to record from the start.
+            clock (Callable): Monotonic time source in nanoseconds.
+        """
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._pending: Dict[str, Deque[int]] = {}
+
+    def set_enabled(self, enabled: bool):
+        """Starts or stops recording. Histograms recorded so far are kept."""
+        self.enabled = enabled
+        if not enabled:
+            with self._lock:
+                self._pending.clear()
+
+    def record(self, stage: str, duration: int):
+        """
+        Adds a duration to the histogram of a stage.
+
+        Args:
+            stage (str): Name of the stage.
+            duration (int): Duration in nanoseconds.
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.record(duration)
+
+    def span(self, stage: str):
+        """Returns a context manager that times its body into `stage`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator that times every call of a function into `stage`."""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = self._clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(stage, self._clock() - start)
+            return wrapper
+        return decorator
+
+    def start_delivery(self, stage: str):
+        """Notes that a queued signal measured as `stage` is being emitted now."""
+        if not self.enabled:
+            return
+        with self._lock:
+            pending = self._pending.get(stage)
+            if pending is None:
+                pending = self._pending[stage] = deque(maxlen=MAX_PENDING_DELIVERIES)
+            pending.append(self._clock())
+
+    def finish_delivery(self, stage: str):
+        """Records the delivery time of the oldest signal of `stage` that is still pending."""
+        if not self.enabled:
+            return
+        with self._lock:
+            pending = self._pending.get(stage)
+            if not pending:
+                return  # emitted before recording was enabled
+            start = pending.popleft()
+        self.record(stage, self._clock() - start)
+
+    def reset(self):
+        """Drops everything recorded so far."""
+        with self._lock:
+            self._histograms.clear()
+            self._pending.clear()
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Returns count, min, mean, max and percentiles per stage, for diagnostics.
+
+        Durations are in nanoseconds, None for a stage without values.
+        """
+        with self._lock:
+            histograms = list(self._histograms.items())
+            return {
+                stage: {
+                    "count": histogram.count,
+                    "min": histogram.min,
+                    "mean": histogram.mean(),
+                    "max": histogram.max,
+                    "percentiles": {percent: histogram.percentile(percent) for percent in REPORTED_PERCENTILES},
+                }
+                for stage, histogram in sorted(histograms)
+            }
+
+    def to_json(self) -> str:
+        """Returns all histograms, including their buckets, as a JSON document."""
+        with self._lock:
+            stages = {stage: histogram.to_dict() for stage, histogram in sorted(self._histograms.items())}
+        return json.dumps({
+            "unit": "ns",
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "enabled": self.enabled,
+            "stages": stages,
+        }, indent=2)
+
+    def export(self, path: str):
+        """
+        Writes the histograms as JSON to a file.
+
+        Raises:
+            OSError: The file could not be written.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+
+class IOWorker:
+    """
+    Runs monitor I/O jobs on a bounded pool of threads.
+
+    Jobs are queued like on a ThreadPoolExecutor and each returns a Future.
+    A job can also be queued with a delay, e.g. until a monitor may be written
+    again. Delayed jobs wait on a single scheduler thread instead of occupying
+    a pool thread, so one slow monitor never keeps the others waiting.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "ddc-io",
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_workers (int): Maximum number of jobs running at the same time.
+            thread_name_prefix (str): Name prefix of the pool threads.
+            clock (Callable): Monotonic time source in seconds.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._thread_name_prefix = thread_name_prefix
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._delayed: List[Tuple[float, int, Future, Callable, tuple, dict]] = []
+        self._sequence = itertools.count()
+        self._scheduler = None
+        self._shutdown = False
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Queues `func(*args, **kwargs)` to run as soon as a thread is free."""
+        return self._executor.submit(func, *args, **kwargs)
+
+    def submit_after(self, delay: float, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queues `func(*args, **kwargs)` to run once `delay` seconds have passed.
+
+        Raises:
+            RuntimeError: The worker has been shut down.
+        """
+        if delay <= 0:
+            return self.submit(func, *args, **kwargs)
+        future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+            heapq.heappush(self._delayed, (self._clock() + delay, next(self._sequence), future, func, args, kwargs))
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(
+                    target=self._run_scheduler, name=f"{self._thread_name_prefix}-scheduler", daemon=True
+                )
+                self._scheduler.start()
+            self._condition.notify()
+        return future
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stops accepting jobs and cancels the delayed ones that are not due yet.
+
+        Args:
+            wait (bool): Wait for the running and queued jobs to finish.
+        """
+        with self._condition:
+            self._shutdown = True
+            delayed, self._delayed = self._delayed, []
+            scheduler = self._scheduler
+            self._condition.notify()
+        for _, _, future, _, _, _ in delayed:
+            future.cancel()
+        if wait and scheduler is not None and scheduler is not threading.current_thread():
+            scheduler.join()
+        self._executor.shutdown(wait=wait)
+
+    def _run_scheduler(self):
+        with self._condition:
+            while not self._shutdown:
+                if not self._delayed:
+                    self._condition.wait()
+                    continue
+                remaining = self._delayed[0][0] - self._clock()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                _, _, future, func, args, kwargs = heapq.heappop(self._delayed)
+                self._start(future, func, args, kwargs)
+
+    def _start(self, future: Future, func: Callable, args: tuple, kwargs: dict):
+        """Moves a due job onto the pool, forwarding its outcome to the future handed out for it."""
+        if not future.set_running_or_notify_cancel():
+            return
+
+        def forward(job: Future):
+            error = job.exception()
+            if error is None:
+                future.set_result(job.result())
+            else:
+                future.set_exception(error)
+
+        self._executor.submit(func, *args, **kwargs).add_done_callback(forward)
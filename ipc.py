@@ -0,0 +1,318 @@
+import getpass
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+IPC_NAME = "MonitorBrightnessControl"
+IPC_ADDRESS_ENV = "MONITOR_BRIGHTNESS_IPC"  # overrides the socket path or pipe name, e.g. for tests
+IPC_TIMEOUT = 2.0  # seconds
+MAX_LINE_LENGTH = 65536  # bytes, longer requests are refused
+PIPE_PREFIX = "\\\\.\\pipe\\"
+PIPE_POLL_INTERVAL = 0.005  # seconds between two checks whether a pipe has data
+
+# Commands and the fields they take besides "id"
+COMMANDS = {
+    "ping": (),
+    "list": (),
+    "get": ("monitor",),
+    "set": ("value", "monitor"),
+    "adjust": ("delta", "monitor"),
+    "show": (),
+}
+
+
+class IPCError(Exception):
+    """Raised when the running application cannot be reached or refuses a command."""
+
+
+def default_address() -> str:
+    """
+    Returns where the running application listens for commands.
+
+    A named pipe on Windows and a Unix domain socket in the temporary
+    directory elsewhere, one per user, so two users logged in at once each
+    reach their own instance. $MONITOR_BRIGHTNESS_IPC overrides it.
+    """
+    address = os.environ.get(IPC_ADDRESS_ENV)
+    if address:
+        return address
+    if sys.platform == "win32":
+        user = getpass.getuser().replace("\\", "-")
+        return f"{PIPE_PREFIX}{IPC_NAME}-{user}"
+    return os.path.join(tempfile.gettempdir(), f"{IPC_NAME}-{os.getuid()}.sock")
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    """Encodes a request or response as one line of JSON."""
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> Dict[str, Any]:
+    """
+    Decodes one line of JSON into a request or response.
+
+    Raises:
+        ValueError: The line is not a JSON object.
+    """
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Expected a JSON object")
+    return message
+
+
+def parse_command(text: str) -> Dict[str, Any]:
+    """
+    Parses a command as typed on the command line into a request.
+
+    `get [MONITOR]`, `set VALUE [MONITOR]`, `set +STEP [MONITOR]`,
+    `set -STEP [MONITOR]`, `list`, `show` and `ping`. MONITOR is the monitor's
+    position starting at 1 or its ID, all monitors without it.
+
+    Raises:
+        ValueError: The command is unknown or malformed.
+    """
+    words = text.split()
+    if not words:
+        raise ValueError("Empty command")
+    name, args = words[0].lower(), words[1:]
+    if name not in COMMANDS:
+        raise ValueError(f"Unknown command '{name}'")
+    request: Dict[str, Any] = {"cmd": name}
+    if name == "set":
+        if not args:
+            raise ValueError("set needs a value")
+        value, args = args[0], args[1:]
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid brightness '{value}'") from None
+        if value[0] in "+-":
+            request.update(cmd="adjust", delta=number)
+        else:
+            request["value"] = number
+    if args and "monitor" in COMMANDS[request["cmd"]]:
+        monitor, args = args[0], args[1:]
+        request["monitor"] = int(monitor) if monitor.isdigit() else monitor
+    if args:
+        raise ValueError(f"Unexpected arguments to {name}: {' '.join(args)}")
+    return request
+
+
+class IPCClient:
+    """
+    Sends commands to the running application.
+
+    Imports neither Qt nor any monitor library, so a script pays for the
+    round trip only. Several commands can be pipelined with `batch`, they are
+    sent at once and answered in order. Connecting and every response wait
+    at most `timeout` seconds, on named pipes too, which have no timeouts of
+    their own.
+    """
+
+    def __init__(self, address: str = None, timeout: float = IPC_TIMEOUT):
+        """
+        Args:
+            address (str): Socket path or pipe name. Defaults to default_address().
+            timeout (float): Seconds to wait for the connection and each response.
+        """
+        self.address = address or default_address()
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._socket = None
+        self._pipe = None
+        self._buffer = b""
+
+    def connect(self) -> "IPCClient":
+        """
+        Connects to the running application.
+
+        Raises:
+            IPCError: Nothing is listening at the address.
+        """
+        try:
+            if self.address.startswith(PIPE_PREFIX):
+                self._open_pipe()
+            else:
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._socket.settimeout(self.timeout)
+                self._socket.connect(self.address)
+        except OSError as e:
+            self.close()
+            raise IPCError(f"{IPC_NAME} is not running: {e}") from e
+        return self
+
+    def close(self):
+        """Closes the connection."""
+        for stream in (self._socket, self._pipe):
+            if stream is not None:
+                stream.close()
+        self._socket = self._pipe = None
+        self._buffer = b""
+
+    def __enter__(self) -> "IPCClient":
+        return self.connect() if self._socket is None and self._pipe is None else self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def request(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sends a command and returns the response.
+
+        Args:
+            command (Dict): Request such as {"cmd": "set", "value": 40}.
+
+        Raises:
+            IPCError: The connection failed or the command was refused.
+        """
+        return self.batch([command])[0]
+
+    def batch(self, commands: List[Dict[str, Any]], check: bool = True) -> List[Dict[str, Any]]:
+        """
+        Sends several commands at once and returns their responses in order.
+
+        Args:
+            commands (List[Dict]): Requests to send.
+            check (bool): Raise IPCError for the first refused command.
+
+        Raises:
+            IPCError: The connection failed, or a command was refused while checking.
+        """
+        if self._socket is None and self._pipe is None:
+            self.connect()
+        requests = [dict(command, id=next(self._ids)) for command in commands]
+        try:
+            self._send(b"".join(encode(request) for request in requests))
+            responses = [decode(self._read_line()) for _ in requests]
+        except (OSError, ValueError) as e:
+            self.close()
+            raise IPCError(f"Lost the connection to {IPC_NAME}: {e}") from e
+        if check:
+            for response in responses:
+                if not response.get("ok"):
+                    raise IPCError(response.get("error", "Command failed"))
+        return responses
+
+    def _open_pipe(self):
+        """
+        Opens the named pipe, waiting at most `timeout` for a free instance.
+
+        Raises:
+            OSError: The pipe does not exist or stayed busy.
+        """
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        if not kernel32.WaitNamedPipeW(self.address, max(1, int(self.timeout * 1000))):
+            raise ctypes.WinError()
+        self._pipe = open(self.address, "r+b", buffering=0)
+
+    def _wait_for_pipe(self):
+        """
+        Waits until the pipe has data to read.
+
+        Raises:
+            TimeoutError: Nothing arrived within `timeout`.
+            OSError: The pipe was closed.
+        """
+        import ctypes
+        import msvcrt
+        from ctypes import wintypes
+
+        handle = msvcrt.get_osfhandle(self._pipe.fileno())
+        available = wintypes.DWORD()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if not ctypes.windll.kernel32.PeekNamedPipe(handle, None, 0, None, ctypes.byref(available), None):
+                raise ctypes.WinError()
+            if available.value:
+                return
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"no response within {self.timeout:g} s")
+            time.sleep(PIPE_POLL_INTERVAL)
+
+    def _send(self, data: bytes):
+        if self._socket is not None:
+            self._socket.sendall(data)
+        else:
+            self._pipe.write(data)
+
+    def _read_line(self) -> bytes:
+        while b"\n" not in self._buffer:
+            if self._socket is not None:
+                chunk = self._socket.recv(4096)
+            else:
+                self._wait_for_pipe()
+                chunk = self._pipe.read(4096)
+            if not chunk:
+                raise ConnectionError("connection closed")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line
+
+
+def hand_off(address: str = None, timeout: float = 0.5) -> bool:
+    """
+    Asks an instance that is already running to show its slider.
+
+    Args:
+        address (str): Socket path or pipe name. Defaults to default_address().
+        timeout (float): Seconds to wait for the running instance.
+
+    Returns:
+        True when an instance answered, so this one can exit.
+    """
+    try:
+        with IPCClient(address, timeout) as client:
+            client.request({"cmd": "show"})
+        return True
+    except IPCError:
+        return False
+
+
+def format_response(response: Dict[str, Any]) -> str:
+    """Formats a response for the command line, one monitor per line."""
+    if not response.get("ok"):
+        return f"error: {response.get('error', 'command failed')}"
+    if "monitors" in response:
+        return "\n".join(f"{monitor['position']}  {monitor['brightness'] if monitor['brightness'] is not None else '-':>3}"
+                         f"  {monitor['label']}  ({monitor['id']})" for monitor in response["monitors"])
+    if "brightness" in response:
+        return "\n".join(f"{monitor_id}  {value}" for monitor_id, value in response["brightness"].items())
+    return "ok"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line client, see `parse_command` for the commands.
+
+    Returns:
+        The exit status: 0 on success, 1 when a command failed, 2 when the application is not running.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Control the running Monitor Brightness Control")
+    parser.add_argument("commands", nargs="+",
+                        help='Commands, e.g. "get", "set 40", "set +10 2". Several are sent as one batch')
+    parser.add_argument("--address", help="Socket path or pipe name of the running application")
+    parser.add_argument("--timeout", type=float, default=IPC_TIMEOUT, help="Seconds to wait for an answer")
+    args = parser.parse_args(argv)
+
+    try:
+        requests = [parse_command(command) for command in args.commands]
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        with IPCClient(args.address, args.timeout) as client:
+            responses = client.batch(requests, check=False)
+    except IPCError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for response in responses:
+        print(format_response(response))
+    return 0 if all(response.get("ok") for response in responses) else 1
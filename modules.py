@@ -1,15 +1,47 @@
-from monitorcontrol import get_monitors
-from PyQt5 import QtWidgets, QtCore, QtGui
-import ctypes
-import sys
-import keyboard
+from PyQt5 import QtWidgets, QtCore, QtGui, QtNetwork
 import math
 import os
 import logging
-from typing import List
-import winreg
-import win32con
-import win32gui
+import sys
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, List, Optional
+from adaptive import SAMPLE_WIDTH, ContentAnalyzer
+from backends import CLOCK_CHANGED, SYSTEM_RESUMED, get_backend
+from handle_pool import MonitorHandlePool
+from io_worker import IOWorker
+from ipc import COMMANDS, MAX_LINE_LENGTH, decode, default_address, encode
+from write_queue import CoalescingWriteQueue, Superseded
+from transitions import TransitionEngine
+from rate_limit import MonitorRateLimiter
+from hotkeys import HotkeyDispatcher, KeyRepeatPolicy
+from profiles import BatchResult, ProfileStore, plan_writes, resolve_targets
+from reconcile import ReconcileSchedule
+from schedule import TimeOfDaySchedule
+from core import (
+    APP_NAME,
+    BRIGHTNESS_STEP,
+    MAX_BRIGHTNESS,
+    clamp_brightness,
+    HANDLE_IDLE_TIMEOUT,
+    monitor_registry,
+    monitor_handles,
+    monitor_io,
+    state_cache,
+    step_brightness,
+    RefreshMonitors,
+    monitor_label,
+    remember_brightness,
+    ReadMonitorState,
+    ReconcileMonitorBrightness,
+    SetMonitorLuminance,
+    RetrieveBrightness,
+    UnsupportedVCPCode,
+    instrumentation,
+)
 
 # Constants
 SLIDER_WIDTH = 240
@@ -25,22 +57,46 @@ GEOMETRY_OFFSET_Y = 30
 TICK_INTERVAL = 10
 TICK_POSITION = QtWidgets.QSlider.TicksBelow
 INACTIVITY_INTERVAL = 2000  # milliseconds
-DEBOUNCE_INTERVAL = 100  # milliseconds
+MAX_WRITE_WORKERS = 4  # concurrent DDC/CI writes of a writer with monitors of its own
+TRANSITION_DURATION = 200  # milliseconds
+DIAGNOSTICS_REFRESH_INTERVAL = 1000  # milliseconds
 FADE_IN_DURATION = 300  # milliseconds
 FADE_OUT_DURATION = 1000  # milliseconds
-APP_NAME = "MonitorBrightnessApp"
-
-# Debug dictionaries to store brightness levels by monitor index
-monitor_brightness = {}
-last_brightness = {}
-
-# Cached list of monitor objects
-cached_monitors: List = []
+HOTPLUG_SETTLE_DELAY = 1500  # milliseconds, new monitors need a moment before they answer DDC/CI
+ERROR_REPORT_INTERVAL = 30000  # milliseconds between two reports of failing writes to one monitor
+ICON_LEVELS = 10  # brightness levels a sun icon can show, besides empty
+ICON_CACHE_SIZE = 64  # pre-rendered sun icons kept
+TRAY_ICON_SIZE = 32
+SHADOW_BLUR = 20  # pixels
+SHADOW_COLOR = QtGui.QColor(0, 0, 0, 100)
+BACKGROUND_COLOR = QtGui.QColor(30, 30, 30, 220)
+BACKGROUND_RADIUS = 30  # pixels
+RENDER_EFFECT = "effect"  # live QGraphicsDropShadowEffect, re-rendered with every frame
+RENDER_CACHED = "cached"  # background and shadow baked into a pixmap
+RENDER_MODE_ENV = "MONITOR_BRIGHTNESS_RENDER_MODE"  # set to "effect" to use the live drop shadow
+ADAPTIVE_HOLD = 300000  # milliseconds content-adaptive brightness waits after the user set the brightness
+FRAME_CHANNELS = "bgra" if sys.byteorder == "little" else "argb"  # byte order of QImage.Format_RGB32
+BRIGHTNESS_HOTKEYS = {"ctrl+up": 1, "ctrl+down": -1}  # step direction keyed by hotkey
+SESSION_CHECK_INTERVAL = 2000  # milliseconds between two checks whether the session got locked or unlocked
+SERVER_PROBE_TIMEOUT = 500  # milliseconds a socket in use gets to accept before it counts as left behind
+
+
+def create_sun_pixmap(width: int, height: int, level: int = None, device_pixel_ratio: float = 1.0) -> QtGui.QPixmap:
+    """
+    Creates a sun-shaped QPixmap by drawing with QPainter.
 
+    Drawing is slow compared to copying a pixmap, use `sun_icons` for icons
+    that are shown more than once.
 
-def create_sun_pixmap(width: int, height: int) -> QtGui.QPixmap:
-    """Creates a sun-shaped QPixmap by drawing with QPainter."""
-    pixmap = QtGui.QPixmap(width, height)
+    Args:
+        width (int): Width in device independent pixels.
+        height (int): Height in device independent pixels.
+        level (int): Fills the sun's core up to this fraction of ICON_LEVELS
+            and leaves the rest dim. Draws a full sun when None.
+        device_pixel_ratio (float): Physical pixels per device independent pixel.
+    """
+    pixmap = QtGui.QPixmap(round(width * device_pixel_ratio), round(height * device_pixel_ratio))
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
     pixmap.fill(QtCore.Qt.transparent)
 
     painter = QtGui.QPainter(pixmap)
@@ -48,11 +104,23 @@ def create_sun_pixmap(width: int, height: int) -> QtGui.QPixmap:
 
     # Draw the sun's core
     core_color = QtGui.QColor('yellow')
-    painter.setBrush(core_color)
-    painter.setPen(QtGui.QPen(core_color))
     center = QtCore.QPoint(width // 2, height // 2)
     radius = min(width, height) // 4
-    painter.drawEllipse(center, radius, radius)
+    if level is None:
+        painter.setBrush(core_color)
+        painter.setPen(QtGui.QPen(core_color))
+        painter.drawEllipse(center, radius, radius)
+    else:
+        # Dim core with the lit part filled from the bottom
+        painter.setBrush(QtGui.QColor(core_color).darker(300))
+        painter.setPen(QtGui.QPen(core_color))
+        painter.drawEllipse(center, radius, radius)
+        lit = 2 * radius * level / ICON_LEVELS
+        painter.save()
+        painter.setClipRect(QtCore.QRectF(center.x() - radius, center.y() + radius - lit, 2 * radius, lit))
+        painter.setBrush(core_color)
+        painter.drawEllipse(center, radius, radius)
+        painter.restore()
 
     # Draw sun rays
     ray_color = QtGui.QColor('orange')
@@ -76,7 +144,107 @@ def create_sun_pixmap(width: int, height: int) -> QtGui.QPixmap:
     painter.end()
     return pixmap
 
+def icon_level(brightness: int) -> int:
+    """Quantizes a brightness (0-100) to one of the ICON_LEVELS + 1 sun icon levels."""
+    brightness = max(0, min(MAX_BRIGHTNESS, brightness))
+    return round(brightness * ICON_LEVELS / MAX_BRIGHTNESS)
+
+class SunIconCache:
+    """
+    Pre-rendered sun pixmaps, drawn on first use and kept in an LRU.
+
+    Pixmaps are keyed by size, device pixel ratio and icon level, so a slider
+    drag that only moves within one level, or back to a level shown before,
+    copies a pixmap instead of drawing one. Only used on the GUI thread.
+    """
+
+    def __init__(self, max_entries: int = ICON_CACHE_SIZE):
+        """
+        Args:
+            max_entries (int): Pixmaps kept before the least recently used is dropped.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pixmaps = OrderedDict()
+
+    def pixmap(self, width: int, height: int, level: int = None, device_pixel_ratio: float = 1.0) -> QtGui.QPixmap:
+        """
+        Returns the sun pixmap for the given size, icon level and pixel ratio.
+
+        Args:
+            width (int): Width in device independent pixels.
+            height (int): Height in device independent pixels.
+            level (int): Icon level from icon_level, or None for a full sun.
+            device_pixel_ratio (float): Physical pixels per device independent pixel.
+        """
+        key = (width, height, device_pixel_ratio, level)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        self.misses += 1
+        pixmap = create_sun_pixmap(width, height, level, device_pixel_ratio)
+        self._pixmaps[key] = pixmap
+        if len(self._pixmaps) > self.max_entries:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def __len__(self) -> int:
+        return len(self._pixmaps)
+
+    def clear(self):
+        """Drops all pixmaps, e.g. after the screens changed."""
+        self._pixmaps.clear()
+
+# Sun icons of the slider and the tray
+sun_icons = SunIconCache()
+
+def render_slider_background(width: int, height: int, device_pixel_ratio: float = 1.0) -> QtGui.QPixmap:
+    """
+    Draws the slider's rounded background with its drop shadow into a pixmap.
+
+    The shadow is blurred once here, instead of by a QGraphicsDropShadowEffect
+    on every frame the slider is painted.
 
+    Args:
+        width (int): Width in device independent pixels.
+        height (int): Height in device independent pixels.
+        device_pixel_ratio (float): Physical pixels per device independent pixel.
+    """
+    size = QtCore.QSize(round(width * device_pixel_ratio), round(height * device_pixel_ratio))
+    inset = SHADOW_BLUR / 2 * device_pixel_ratio
+    rect = QtCore.QRectF(0, 0, size.width(), size.height()).adjusted(inset, inset, -inset, -inset)
+    radius = min(BACKGROUND_RADIUS * device_pixel_ratio, rect.height() / 2)
+
+    # Shadow shape, blurred by rendering it through a scene once
+    shape = QtGui.QPixmap(size)
+    shape.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(shape)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    painter.setPen(QtCore.Qt.NoPen)
+    painter.setBrush(SHADOW_COLOR)
+    painter.drawRoundedRect(rect, radius, radius)
+    painter.end()
+    scene = QtWidgets.QGraphicsScene()
+    item = scene.addPixmap(shape)
+    blur = QtWidgets.QGraphicsBlurEffect()
+    blur.setBlurRadius(SHADOW_BLUR * device_pixel_ratio)
+    item.setGraphicsEffect(blur)
+
+    pixmap = QtGui.QPixmap(size)
+    pixmap.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(pixmap)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    scene.render(painter, QtCore.QRectF(0, 0, size.width(), size.height()),
+                 QtCore.QRectF(0, 0, size.width(), size.height()))
+    painter.setPen(QtCore.Qt.NoPen)
+    painter.setBrush(BACKGROUND_COLOR)
+    painter.drawRoundedRect(rect, radius, radius)
+    painter.end()
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    return pixmap
 
 def show_user_message(title, message):
     """Shows a user-friendly message dialog."""
@@ -88,39 +256,10 @@ def show_user_message(title, message):
 
 def ensure_admin():
     """
-    Checks if the current process has administrator privileges on Windows.
-    If not, attempts to restart the script with admin rights.
-    Ensures this request happens only once by setting a registry key.
+    Makes sure the process has the privileges needed to control the monitors.
+    On Windows this restarts the application with admin rights, once.
     """
-    try:
-        is_admin = ctypes.windll.shell32.IsUserAnAdmin()
-    except Exception as e:
-        is_admin = False
-
-    if not is_admin:
-        # Check if admin has been requested before
-        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software", 0, winreg.KEY_READ | winreg.KEY_WRITE)
-        try:
-            winreg.OpenKey(key, APP_NAME)
-            admin_requested = True
-        except FileNotFoundError:
-            admin_requested = False
-
-        if not admin_requested:
-            try:
-                ctypes.windll.shell32.ShellExecuteW(
-                    None, "runas",
-                    sys.executable,
-                    " ".join([os.path.abspath(sys.argv[0])] + sys.argv[1:]),
-                    None, 1
-                )
-                # Set registry key to indicate admin has been requested
-                app_key = winreg.CreateKey(key, APP_NAME)
-                winreg.SetValueEx(app_key, "AdminRequested", 0, winreg.REG_SZ, "True")
-                winreg.CloseKey(app_key)
-            except Exception as e:
-                show_user_message("Error", "Administrator privileges are required to run this application.")
-            sys.exit()
+    get_backend().ensure_admin(APP_NAME, lambda message: show_user_message("Error", message))
 
 # This function has been removed as it will be handled by the installer
 # def add_to_startup():
@@ -145,63 +284,760 @@ def RetrieveMonitors() -> List:
     Returns:
         List of Monitor objects from the monitorcontrol library.
     """
-    global cached_monitors
+    monitors = []
     try:
-        monitors = get_monitors()
-        cached_monitors = monitors  # Cache the monitors for later use
-
-        for idx, monitor in enumerate(monitors):
-            with monitor:
-                try:
-                    brightness = monitor.get_luminance()
-                    brightness = round(brightness, -1)
-                    monitor_brightness[idx] = brightness
-                    last_brightness[idx] = brightness
-                except Exception as e:
-                    if hasattr(e, 'response'):
-                        pass
+        RefreshMonitors()  # Cache the monitors for later use
+        monitors = list(monitor_registry.snapshot().monitors().values())
+        RetrieveBrightness()
     except Exception as e:
         show_user_message("Error", "Failed to detect monitors. Please ensure your monitors support DDC/CI.")
     return monitors
 
-def ChangeBrightness(idx: int, brightness: int):
+def ChangeBrightness(monitor_id: str, brightness: int) -> Optional[Future]:
     """
-    Changes the brightness of the monitor at the given index.
+    Changes the brightness of the given monitor on the I/O worker.
+
+    Not used by the application itself, which writes through
+    BrightnessWriter. Kept for scripts and the benchmarks that compare
+    against a single write path. Returns at once. A failure is logged, callers that need the outcome can
+    wait on the returned future.
 
     Args:
-        idx (int): The monitor index to adjust.
+        monitor_id (str): The monitor to adjust.
         brightness (int): The brightness level to set (0-100).
+
+    Returns:
+        Future of the write, or None when the monitor is not connected.
     """
-    global cached_monitors
-    if idx < 0 or idx >= len(cached_monitors):
-        return
+    if monitor_id not in monitor_registry.snapshot():
+        return None
+    return monitor_io.submit(_change_brightness, monitor_id, brightness)
 
-    monitor = cached_monitors[idx]
+def _change_brightness(monitor_id: str, brightness: int):
     try:
-        with monitor:
-            monitor.set_luminance(brightness)
+        SetMonitorLuminance(monitor_id, brightness)
     except Exception as e:
-        show_user_message("Error", f"Failed to change brightness for Monitor {idx+1}")
+        logging.error("Failed to change brightness for %s: %s", monitor_label(monitor_id), e)
+        raise
 
-def RetrieveBrightness():
+def hide_console():
+    """Hide the console window"""
+    get_backend().hide_console()
+
+class MonitorEnumerator(QtCore.QThread):
     """
-    Retrieves current brightness for all monitors and updates the dictionaries.
+    Thread that detects the monitors and reads their brightness in the background.
+
+    Every run enumerates the monitors again and compares them with the previous
+    run by their stable ID, so only monitors that were just connected are read,
+    and monitors that were disconnected are reported with 'monitor_removed'.
+    Monitors that stay connected keep their state untouched.
+
+    New monitors with a brightness in the state cache are reported with
+    'monitor_ready' straight away. They are then read in parallel and reported
+    again as soon as they answer, so the tray icon and slider can be shown
+    before the slowest monitor has responded, and a monitor whose read fails
+    stays under control with its cached value. Each read also stores the
+    contrast and maximum luminance in the registry. Monitors that do not
+    support luminance at all are reported with 'monitor_unsupported'.
+
+    After `watch_screens`, a screen being added or removed schedules another
+    run once the display configuration has settled.
     """
-    for idx, monitor in enumerate(cached_monitors):
+    monitors_found = QtCore.pyqtSignal(int)  # number of monitors connected
+    monitor_ready = QtCore.pyqtSignal(object, int)  # monitor ID, brightness
+    monitor_removed = QtCore.pyqtSignal(object)  # monitor ID
+    monitor_unsupported = QtCore.pyqtSignal(object)  # monitor ID
+    enumeration_finished = QtCore.pyqtSignal(int)  # number of new monitors that answered
+    enumeration_failed = QtCore.pyqtSignal(str)  # error message
+
+    def __init__(self, settle_delay: int = HOTPLUG_SETTLE_DELAY, parent=None):
+        """
+        Args:
+            settle_delay (int): Milliseconds to wait after a screen change before enumerating.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.probes = 0
+        self._refresh_pending = False
+        self.settle_timer = QtCore.QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(settle_delay)
+        self.settle_timer.timeout.connect(self.refresh)
+        self.finished.connect(self._run_pending_refresh)
+
+    def watch_screens(self, app: QtGui.QGuiApplication):
+        """Re-enumerates the monitors whenever the application sees a screen come or go."""
+        app.screenAdded.connect(self.schedule_refresh)
+        app.screenRemoved.connect(self.schedule_refresh)
+
+    def schedule_refresh(self, *args):
+        """Re-enumerates after the settle delay, restarting the delay on every call."""
+        self.settle_timer.start()
+
+    def refresh(self):
+        """Re-enumerates now, or right after the run in progress."""
+        if self.isRunning():
+            self._refresh_pending = True
+        else:
+            self.start()
+
+    def _run_pending_refresh(self):
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.start()
+
+    def run(self):
         try:
-            with monitor:
-                brightness = monitor.get_luminance()
-            brightness = round(brightness, -1)
-            monitor_brightness[idx] = brightness
-            last_brightness[idx] = brightness
+            changes = RefreshMonitors()
         except Exception as e:
-            if hasattr(e, 'response'):
-                pass
+            logging.error("Failed to detect monitors: %s", e)
+            self.enumeration_failed.emit(str(e))
+            return
+
+        for monitor_id in changes.removed:
+            self.monitor_removed.emit(monitor_id)
+        self.monitors_found.emit(len(changes.added) + len(changes.kept))
+
+        # Start from the cached values, the hardware is reconciled below
+        ready = set()
+        for monitor_id in changes.added:
+            cached = state_cache.get(monitor_id)
+            if cached is not None:
+                ready.add(monitor_id)
+                self.monitor_ready.emit(monitor_id, cached)
+
+        if changes.added:
+            self.probes += len(changes.added)
+            futures = {monitor_io.submit(ReadMonitorState, monitor_id): monitor_id for monitor_id in changes.added}
+            for future in as_completed(futures):
+                monitor_id = futures[future]
+                try:
+                    state = future.result()
+                except UnsupportedVCPCode as e:
+                    logging.info("%s", e)
+                    ready.discard(monitor_id)
+                    self.monitor_unsupported.emit(monitor_id)
+                    continue
+                except Exception as e:
+                    logging.error("Failed to read brightness of %s: %s", monitor_label(monitor_id), e)
+                    continue
+                ready.add(monitor_id)
+                monitor_registry.update(
+                    confirmed_brightness={monitor_id: state["luminance"]},
+                    contrast={monitor_id: state["contrast"]},
+                    max_luminance={monitor_id: state["max_luminance"]},
+                )
+                state_cache.set(monitor_id, state["brightness"])
+                self.monitor_ready.emit(monitor_id, state["brightness"])
+        self.enumeration_finished.emit(len(ready))
 
-def hide_console():
-    """Hide the console window"""
-    window = win32gui.GetForegroundWindow()
-    win32gui.ShowWindow(window, win32con.SW_HIDE)
+class BrightnessWriter(QtCore.QObject):
+    """
+    Writes brightness to several monitors concurrently.
+
+    Each monitor write is submitted to an IOWorker, so a change that touches
+    every monitor takes about as long as the slowest monitor instead of the sum
+    of all of them, and the GUI thread never waits for a monitor. Results are
+    reported through Qt signals, which Qt queues onto the thread of the
+    connected receiver.
+
+    `write` starts one write per monitor right away, while `post` goes through a
+    per-monitor CoalescingWriteQueue and is meant for bursts such as held hotkeys
+    and slider drags, where only the newest value matters. Queued writes are
+    spaced per monitor by a MonitorRateLimiter that learns from every write,
+    a queued write that has to wait is scheduled for later instead of holding
+    a worker thread.
+
+    Every write is checked against the brightness the monitor last
+    confirmed, and skipped when the monitor already has that value. A failed
+    write makes the confirmed value unknown, so the monitor stays dirty until
+    it is written or read successfully.
+    """
+    monitor_changed = QtCore.pyqtSignal(object, int)  # monitor ID, brightness
+    monitor_failed = QtCore.pyqtSignal(object, str)  # monitor ID, error message
+    batch_finished = QtCore.pyqtSignal(int, int)  # succeeded, failed
+
+    def __init__(self, monitors: List = None, max_workers: int = MAX_WRITE_WORKERS, io: IOWorker = None,
+                 parent=None):
+        """
+        Args:
+            monitors: Monitor objects to write to, either keyed by monitor ID or a
+                list keyed by index. Defaults to the monitors in monitor_registry.
+            max_workers (int): Maximum number of writes running at the same time,
+                when the writer has a worker of its own.
+            io (IOWorker): Worker the writes run on. Defaults to the shared
+                monitor_io for the registry's monitors, and to a worker of the
+                writer's own for the given monitors.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        if monitors is not None and not isinstance(monitors, dict):
+            monitors = dict(enumerate(monitors))
+        self._monitors = monitors
+        if monitors is None:
+            self.handles = monitor_handles
+        else:
+            self.handles = MonitorHandlePool(HANDLE_IDLE_TIMEOUT / 1000)
+            self.handles.set_monitors(monitors)
+        self._owns_io = io is None and monitors is not None
+        if io is None:
+            io = IOWorker(max_workers, thread_name_prefix="ddc-write") if self._owns_io else monitor_io
+        self.io = io
+        self.limiter = MonitorRateLimiter()
+        self.skipped = 0
+        self._confirmed = {}
+        self._confirmed_lock = threading.Lock()
+        self.queue = CoalescingWriteQueue(
+            self._timed_write,
+            self.io.submit,
+            on_applied=self.monitor_changed.emit,
+            on_failed=lambda key, value, error: self.monitor_failed.emit(key, str(error)),
+            delay=self.limiter.delay,
+            defer=self.io.submit_after,
+        )
+
+    def monitors(self):
+        """Returns the monitors this writer targets, anything that supports `monitor_id in monitors`."""
+        return monitor_registry.snapshot() if self._monitors is None else self._monitors
+
+    def write(self, targets: Dict) -> List:
+        """
+        Starts writing the given brightness values without waiting for them.
+
+        Args:
+            targets (Dict): Brightness level keyed by monitor ID.
+
+        Returns:
+            List of futures, one per monitor write that was started.
+        """
+        monitors = self.monitors()
+        targets = {key: value for key, value in targets.items() if key in monitors}
+        if not targets:
+            return []
+
+        batch = {"total": len(targets), "remaining": len(targets), "failed": 0, "lock": threading.Lock()}
+        futures = []
+        for key, value in targets.items():
+            future = self.io.submit(self._timed_write, key, value)
+            future.add_done_callback(partial(self._write_done, batch, key, value))
+            futures.append(future)
+        return futures
+
+    def post(self, targets: Dict, on_finished=None):
+        """
+        Queues the given brightness values, replacing any value not yet written.
+
+        Returns immediately, the writes happen on the worker pool.
+
+        Args:
+            targets (Dict): Brightness level keyed by monitor ID.
+            on_finished (Callable): Called once every value is written, failed
+                or replaced by a newer post, as `on_finished(written, failed,
+                superseded)`: the monitors written, the error messages keyed by
+                the monitors that failed, and the monitors whose value was
+                replaced. Failures are then left to it to report, instead of
+                emitting 'monitor_failed' for each.
+        """
+        monitors = self.monitors()
+        targets = {key: value for key, value in targets.items() if key in monitors}
+        if on_finished is None:
+            for key, value in targets.items():
+                self.queue.post(key, value)
+            return
+        if not targets:
+            on_finished([], {}, [])
+            return
+
+        batch = {"remaining": len(targets), "written": [], "failed": {}, "superseded": [], "lock": threading.Lock()}
+
+        def done(key, error: Optional[Exception]):
+            with batch["lock"]:
+                if error is None:
+                    batch["written"].append(key)
+                elif isinstance(error, Superseded):
+                    batch["superseded"].append(key)
+                else:
+                    batch["failed"][key] = str(error)
+                batch["remaining"] -= 1
+                finished = batch["remaining"] == 0
+            if finished:
+                on_finished(batch["written"], batch["failed"], batch["superseded"])
+
+        for key, value in targets.items():
+            self.queue.post(key, value, done=partial(done, key))
+
+    def counters(self) -> Dict[str, int]:
+        """Returns the submitted, coalesced, applied and failed counts of queued writes, and the skipped writes."""
+        return dict(self.queue.counters(), skipped=self.skipped)
+
+    def confirmed(self, key) -> Optional[int]:
+        """Returns the brightness a monitor last confirmed, or None when it is unknown."""
+        if self._monitors is None:
+            record = monitor_registry.snapshot().get(key)
+            return None if record is None else record.confirmed_brightness
+        with self._confirmed_lock:
+            return self._confirmed.get(key)
+
+    def _confirm(self, key, value: Optional[int]):
+        # Recorded on the worker thread, so the next write of the monitor already sees it
+        if self._monitors is None:
+            monitor_registry.update(confirmed_brightness={key: value})
+        else:
+            with self._confirmed_lock:
+                self._confirmed[key] = value
+
+    def _timed_write(self, key, value: int):
+        """
+        Writes a single monitor unless it already has the value, and feeds the rate limiter.
+
+        The duration is recorded as the "ChangeBrightness" stage as well,
+        this is the path every brightness change of the application takes.
+        """
+        if self.confirmed(key) == value:
+            with self._confirmed_lock:
+                self.skipped += 1
+            return
+        self.limiter.mark_write(key)
+        start = time.perf_counter_ns()
+        ok = False
+        try:
+            SetMonitorLuminance(key, value, self.handles)
+            ok = True
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self.limiter.record(key, elapsed / 1e9, ok)
+            self._confirm(key, value if ok else None)
+            if instrumentation.enabled:
+                instrumentation.record("ChangeBrightness", elapsed)
+
+    def _write_done(self, batch: dict, key, value: int, future):
+        """Emits the per-monitor result and, for the last write of a batch, the batch result."""
+        error = future.exception()
+        if error is None:
+            self.monitor_changed.emit(key, value)
+        else:
+            logging.error("Failed to set brightness for %s: %s", monitor_label(key), error)
+            self.monitor_failed.emit(key, str(error))
+
+        with batch["lock"]:
+            batch["remaining"] -= 1
+            if error is not None:
+                batch["failed"] += 1
+            finished = batch["remaining"] == 0
+        if finished:
+            self.batch_finished.emit(batch["total"] - batch["failed"], batch["failed"])
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stops writing and closes monitor handles.
+
+        A worker of the writer's own is shut down, the shared one is left to the
+        application.
+
+        Args:
+            wait (bool): Wait for the pending writes to finish first.
+        """
+        if self._owns_io:
+            self.io.shutdown(wait=wait)
+        elif wait:
+            while self.queue.is_busy():
+                time.sleep(0.01)
+        self.handles.close_all()
+
+class BrightnessTransition(QtCore.QObject):
+    """
+    Ramps monitors smoothly to new brightness targets.
+
+    Drives a TransitionEngine with a single-shot QTimer that is armed for the
+    next due step, and posts every step to a BrightnessWriter. The engine plans
+    the steps from the write spacing the writer's rate limiter has learned.
+    """
+
+    def __init__(self, writer: BrightnessWriter, duration: int = TRANSITION_DURATION, parent=None):
+        """
+        Args:
+            writer (BrightnessWriter): Writer the ramp steps are posted to.
+            duration (int): Length of a transition in milliseconds.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.writer = writer
+        self.duration = duration
+        self.engine = TransitionEngine(spacing=writer.limiter.spacing)
+
+        self.step_timer = QtCore.QTimer(self)
+        self.step_timer.setSingleShot(True)
+        self.step_timer.timeout.connect(self.advance)
+
+    @QtCore.pyqtSlot(object)
+    def transition_to(self, targets: Dict[str, int], duration: int = None):
+        """
+        Starts or retargets the ramps of the given monitors.
+
+        Args:
+            targets (Dict[str, int]): Target brightness keyed by monitor ID.
+            duration (int): Length of the ramp in milliseconds, 0 to post the targets at once.
+                Defaults to the transition duration.
+        """
+        duration = self.duration if duration is None else duration
+        current = monitor_registry.snapshot().last_brightness()
+        for monitor_id, value in targets.items():
+            self.engine.set_target(monitor_id, value, duration / 1000, current=current.get(monitor_id))
+        self.advance()
+
+    def forget(self, monitor_id: str):
+        """Stops the ramp of a monitor that was disconnected or set outside the ramps, e.g. with its own buttons."""
+        self.engine.forget(monitor_id)
+
+    def advance(self):
+        """Posts the steps that are due and arms the timer for the next one."""
+        values = self.engine.tick()
+        if values:
+            self.writer.post(values)
+            monitor_registry.update(last_brightness=values)
+
+        delay = self.engine.next_delay()
+        if delay is not None:
+            self.step_timer.start(math.ceil(delay * 1000))
+
+class BrightnessReconciler(QtCore.QObject):
+    """
+    Reads the monitors' brightness back now and then, to notice changes made
+    with a monitor's own buttons.
+
+    Rounds are timed by a ReconcileSchedule: often right after the user
+    adjusted the brightness, less often while nothing changes, and not at
+    all while the user is idle or the session is locked. A round runs on
+    the shared I/O worker and reads one monitor after another. It gives
+    the bus back to the user by stopping as soon as `busy` reports a write,
+    and is retried shortly after. Values found are adopted into the registry
+    by ReconcileMonitorBrightness and reported with 'brightness_reconciled'.
+    """
+    brightness_reconciled = QtCore.pyqtSignal(object, int)  # monitor ID, brightness found on the monitor
+    round_finished = QtCore.pyqtSignal(bool, bool)  # whether anything changed, whether the round gave way to a write
+
+    def __init__(self, busy=None, schedule: ReconcileSchedule = None, parent=None):
+        """
+        Args:
+            busy (Callable): Returns whether brightness writes are pending or running.
+            schedule (ReconcileSchedule): When to read. Defaults to the standard intervals.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.busy = busy if busy is not None else (lambda: False)
+        self.schedule = schedule if schedule is not None else ReconcileSchedule()
+        self.rounds = 0
+        self.reads = 0
+        self._running = False
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_round)
+        self.round_finished.connect(self._round_finished)
+
+    def start(self, *args):
+        """Schedules the first round."""
+        self._arm()
+
+    def note_interaction(self, *args):
+        """Reads again soon, the user is at the computer."""
+        self.schedule.interaction()
+        self._arm()
+
+    def run_round(self):
+        """Starts a round on the worker thread, unless it has to wait."""
+        if self._running:
+            return
+        if get_backend().is_session_locked():
+            self.timer.start(int(self.schedule.max_interval * 1000))
+            return
+        if self.busy():
+            self.timer.start(int(self.schedule.min_interval * 1000))
+            return
+        self._running = True
+        monitor_io.submit(self._reconcile)
+
+    def shutdown(self):
+        """Stops reading. A round in progress finishes on its own."""
+        self.timer.stop()
+
+    def _arm(self):
+        if self._running:
+            return  # rescheduled when the round finishes
+        delay = self.schedule.next_delay()
+        if delay is None:
+            self.timer.stop()
+        else:
+            self.timer.start(int(delay * 1000))
+
+    def _reconcile(self):
+        changed = yielded = False
+        try:
+            for monitor_id in list(monitor_registry.snapshot()):
+                if self.busy():
+                    yielded = True
+                    break
+                self.reads += 1
+                try:
+                    brightness = ReconcileMonitorBrightness(monitor_id, busy=self.busy)
+                except Exception as e:
+                    logging.debug("Failed to read back brightness of %s: %s", monitor_label(monitor_id), e)
+                    continue
+                if brightness is not None:
+                    changed = True
+                    self.brightness_reconciled.emit(monitor_id, brightness)
+        finally:
+            self.round_finished.emit(changed, yielded)
+
+    @QtCore.pyqtSlot(bool, bool)
+    def _round_finished(self, changed: bool, yielded: bool):
+        self._running = False
+        self.rounds += 1
+        if yielded:
+            self.timer.start(int(self.schedule.min_interval * 1000))
+            return
+        self.schedule.round_finished(changed)
+        self._arm()
+
+class BrightnessScheduler(QtCore.QObject):
+    """
+    Follows a TimeOfDaySchedule with a single timer.
+
+    The timer is armed for the moment the schedule next needs a write rather
+    than on a fixed interval, so between two scheduled changes the
+    application does not wake up at all. Since the timer does not know about
+    wall clock time, it is armed again from the current time after the
+    system resumed or the clock was set. Levels that are due are handed to
+    `apply`, and a manual change holds the schedule off until its next
+    segment. Monitors plugged in later are brought to the level applied
+    last with `apply_to_monitor`, the others keep theirs.
+    """
+    schedule_applied = QtCore.pyqtSignal(int)  # brightness
+
+    def __init__(self, schedule: TimeOfDaySchedule, apply, apply_to_monitor=None, parent=None):
+        """
+        Args:
+            schedule (TimeOfDaySchedule): The schedule to follow.
+            apply (Callable): Sets all monitors to a brightness, `apply(level)`.
+            apply_to_monitor (Callable): Sets one monitor to a brightness, `apply_to_monitor(monitor_id, level)`.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.schedule = schedule
+        self.apply = apply
+        self.apply_to_monitor = apply_to_monitor
+        self.wakeups = 0
+        self._started = False
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self._wake)
+
+    def start(self, *args):
+        """Applies the level due now and arms the timer, the first time only."""
+        if self._started:
+            return
+        self._started = True
+        self.recompute()
+
+    def add_monitor(self, monitor_id: str, *args):
+        """Sets a monitor that was plugged in after the start to the level applied last, unless overridden."""
+        level = self.schedule.applied
+        if not self._started or level is None or self.schedule.is_overridden() or self.apply_to_monitor is None:
+            return
+        self.apply_to_monitor(monitor_id, level)
+
+    def recompute(self, *args):
+        """Applies the level due now, if it changed, and arms the timer for the next change."""
+        level = self.schedule.due()
+        if level is not None:
+            self.apply(level)
+            self.schedule_applied.emit(level)
+        self._arm()
+
+    def note_override(self, *args):
+        """Holds the schedule off until its next segment, the user just changed the brightness."""
+        self.schedule.override()
+        self._arm()
+
+    def shutdown(self):
+        """Stops following the schedule."""
+        self.timer.stop()
+
+    def _arm(self):
+        self.timer.start(math.ceil(self.schedule.next_delay() * 1000))
+
+    def _wake(self):
+        self.wakeups += 1
+        self.recompute()
+
+def grab_screen(screen: QtGui.QScreen = None) -> QtGui.QImage:
+    """Grabs the whole screen, the primary one by default. Has to run on the GUI thread."""
+    screen = screen or QtWidgets.QApplication.primaryScreen()
+    return screen.grabWindow(0).toImage()
+
+def image_to_array(image: QtGui.QImage, width: int = SAMPLE_WIDTH):
+    """
+    Scales an image down to `width` pixels and returns its pixels for analysis.
+
+    Returns:
+        A NumPy array of shape (height, width, 4) in FRAME_CHANNELS order.
+
+    Raises:
+        ValueError: The image is empty, e.g. the screen could not be grabbed.
+    """
+    import numpy
+
+    if image.isNull():
+        raise ValueError("Empty image")
+    if image.width() > width:
+        image = image.scaledToWidth(width, QtCore.Qt.FastTransformation)
+    image = image.convertToFormat(QtGui.QImage.Format_RGB32)
+    bits = image.constBits()
+    bits.setsize(image.byteCount())
+    rows = numpy.frombuffer(bits, numpy.uint8).reshape(image.height(), image.bytesPerLine())
+    return rows[:, :4 * image.width()].reshape(image.height(), image.width(), 4).copy()
+
+class ContentAdaptiveBrightness(QtCore.QObject):
+    """
+    Lowers the brightness on bright content and raises it on dark content.
+
+    Grabs a frame now and then and lets a ContentAnalyzer turn it into a
+    target brightness, which is reported with 'target_changed' only when it
+    moved past the analyzer's hysteresis. Only the grab runs on the GUI
+    thread; scaling it down and the analysis run on a worker thread of their
+    own. The next frame is grabbed once the last one is analyzed, after the
+    interval the analyzer asks for to stay within its CPU budget. `source`
+    replaces the screen grab, e.g. with synthetic frames. It returns a
+    QImage or an RGB array.
+    """
+    target_changed = QtCore.pyqtSignal(int)  # brightness
+    frame_analyzed = QtCore.pyqtSignal(object)  # brightness to write, or None
+
+    def __init__(self, analyzer: ContentAnalyzer, source=None, parent=None):
+        """
+        Args:
+            analyzer (ContentAnalyzer): Turns frames into a target brightness.
+            source (Callable): Returns the next frame. Defaults to grabbing the primary screen.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.analyzer = analyzer
+        self.source = source if source is not None else grab_screen
+        self.worker = IOWorker(1, thread_name_prefix="content-analysis")
+        self.errors = 0
+        self._analyzing = False
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.capture)
+        self.frame_analyzed.connect(self._frame_analyzed)
+
+    def start(self, *args):
+        """
+        Grabs the first frame right away.
+
+        Connected to every enumeration, so a hold after a manual change or
+        the wait for the next frame is kept rather than cut short.
+        """
+        if not self.timer.isActive():
+            self.timer.start(0)
+
+    def note_override(self, *args):
+        """Holds off for a while and then starts over, the user just set the brightness."""
+        self.analyzer.reset()
+        self.timer.start(ADAPTIVE_HOLD)
+
+    def capture(self):
+        """Grabs a frame and queues it for analysis."""
+        if self._analyzing:
+            return
+        start = time.thread_time()
+        try:
+            frame = self.source()
+        except Exception as e:
+            self.errors += 1
+            logging.debug("Failed to grab a frame: %s", e)
+            self._arm()
+            return
+        self._analyzing = True
+        self.worker.submit(self._analyze, frame, time.thread_time() - start)
+
+    def shutdown(self, wait: bool = False):
+        """Stops grabbing frames."""
+        self.timer.stop()
+        self.worker.shutdown(wait=wait)
+
+    def _arm(self):
+        self.timer.start(int(self.analyzer.next_interval() * 1000))
+
+    def _analyze(self, frame, grab_cost: float):
+        level = None
+        try:
+            start = time.thread_time()
+            if isinstance(frame, QtGui.QImage):
+                frame, channels = image_to_array(frame), FRAME_CHANNELS
+            else:
+                channels = "rgb"
+            level = self.analyzer.analyze(frame, channels, grab_cost + time.thread_time() - start)
+        except Exception as e:
+            self.errors += 1
+            logging.debug("Failed to analyze a frame: %s", e)
+        finally:
+            self.frame_analyzed.emit(level)
+
+    @QtCore.pyqtSlot(object)
+    def _frame_analyzed(self, level: Optional[int]):
+        self._analyzing = False
+        if self.timer.isActive():
+            return  # the user set the brightness while this frame was analyzed
+        if level is not None:
+            self.target_changed.emit(level)
+        self._arm()
+
+class SystemEvents(QtCore.QObject):
+    """
+    Reports resume from sleep and changes of the system clock.
+
+    Looks at the native events Qt receives and lets the backend recognize
+    them, so only backends that can tell report anything.
+    """
+    resumed = QtCore.pyqtSignal()
+    clock_changed = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filter = _SystemEventFilter(self)
+
+    def install(self, app: QtCore.QCoreApplication, window: QtWidgets.QWidget):
+        """
+        Starts watching the native events.
+
+        Args:
+            app: The application.
+            window (QWidget): A top-level window, created natively here, for the system to broadcast to.
+        """
+        window.winId()
+        app.installNativeEventFilter(self._filter)
+
+    def remove(self, app: QtCore.QCoreApplication):
+        """Stops watching the native events."""
+        app.removeNativeEventFilter(self._filter)
+
+class _SystemEventFilter(QtCore.QAbstractNativeEventFilter):
+    def __init__(self, events: SystemEvents):
+        super().__init__()
+        self.events = events
+
+    def nativeEventFilter(self, event_type, message):
+        kind = get_backend().system_event(bytes(event_type), message)
+        if kind == SYSTEM_RESUMED:
+            self.events.resumed.emit()
+        elif kind == CLOCK_CHANGED:
+            self.events.clock_changed.emit()
+        return False, 0
 
 class BrightnessSlider(QtWidgets.QWidget):
     """
@@ -209,12 +1045,50 @@ class BrightnessSlider(QtWidgets.QWidget):
 
     The slider stays on-screen as long as the user continues adjusting brightness
     (Page Up or Page Down). After inactivity, it fades out.
+
+    The slider sets all monitors, or a single one after clicking the sun
+    icon, which steps through the connected monitors. Only monitors whose
+    brightness changes, or which have not confirmed their brightness yet,
+    are written.
+
+    In the RENDER_CACHED mode the rounded background and its shadow are
+    painted from a pixmap that is only redrawn when the size or the pixel
+    ratio changes. RENDER_EFFECT applies a QGraphicsDropShadowEffect instead,
+    which renders the whole widget offscreen again for every frame of a fade.
     """
     update_slider_signal = QtCore.pyqtSignal(int)
+    error_reported = QtCore.pyqtSignal(str, str)  # title, message
+    manual_change = QtCore.pyqtSignal()  # the user dragged the slider or pressed a hotkey
 
-    def __init__(self):
+    def __init__(self, writer: BrightnessWriter = None, render_mode: str = None):
+        """
+        Args:
+            writer (BrightnessWriter): Writer the brightness goes to. Defaults to a new one.
+            render_mode (str): RENDER_CACHED or RENDER_EFFECT. Defaults to
+                $MONITOR_BRIGHTNESS_RENDER_MODE, or RENDER_CACHED.
+        """
         super().__init__()
 
+        self.render_mode = render_mode or os.environ.get(RENDER_MODE_ENV) or RENDER_CACHED
+        if self.render_mode not in (RENDER_CACHED, RENDER_EFFECT):
+            raise ValueError(f"Unknown render mode '{self.render_mode}'")
+        self.background_renders = 0
+        self._background = None
+        self._background_key = None
+
+        # Monitor the slider sets, None for all of them
+        self.target_monitor = None
+        # Set while the slider follows a change made elsewhere, which must not be written again
+        self._syncing = False
+
+        # Last time a failed write was reported per monitor, to not repeat it on every drag step
+        self._error_reported_at = {}
+
+        # Writes are fanned out to all monitors by a shared writer
+        self.writer = writer if writer is not None else BrightnessWriter(parent=self)
+        self.writer.monitor_failed.connect(self.handle_write_failed)
+        self.transitions = BrightnessTransition(self.writer, parent=self)
+
         # Modified window flags and attributes
         self.setWindowFlags(
             QtCore.Qt.WindowStaysOnTopHint |
@@ -240,9 +1114,12 @@ class BrightnessSlider(QtWidgets.QWidget):
         layout.setSpacing(SPACING)
         layout.setAlignment(QtCore.Qt.AlignCenter)
 
-        # Insert Custom Icon (Programmatically Drawn)
+        # Insert Custom Icon (Programmatically Drawn), clicking it picks the monitor to adjust
         self.icon = self.create_icon()
+        self.icon.installEventFilter(self)
         layout.addWidget(self.icon)
+        self.target_label = self.create_target_label()
+        layout.addWidget(self.target_label)
 
         # Label to display current brightness percentage
         self.percent_label = self.create_percent_label()
@@ -263,20 +1140,16 @@ class BrightnessSlider(QtWidgets.QWidget):
         self.inactivity_timer.setSingleShot(True)
         self.inactivity_timer.timeout.connect(self.start_fade_out)
 
-        # Debounce timer to limit brightness change frequency
-        self.debounce_timer = QtCore.QTimer(self)
-        self.debounce_timer.setInterval(DEBOUNCE_INTERVAL)  # 100 milliseconds
-        self.debounce_timer.setSingleShot(True)
-        self.debounce_timer.timeout.connect(self.apply_brightness_change)
         self.latest_brightness = INITIAL_BRIGHTNESS  # Initial brightness
 
-        # Subtle drop shadow
-        shadow = QtWidgets.QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setXOffset(0)
-        shadow.setYOffset(0)
-        shadow.setColor(QtGui.QColor(0, 0, 0, 100))
-        self.setGraphicsEffect(shadow)
+        # Subtle drop shadow, baked into the background pixmap in the cached mode
+        if self.render_mode == RENDER_EFFECT:
+            shadow = QtWidgets.QGraphicsDropShadowEffect(self)
+            shadow.setBlurRadius(SHADOW_BLUR)
+            shadow.setXOffset(0)
+            shadow.setYOffset(0)
+            shadow.setColor(SHADOW_COLOR)
+            self.setGraphicsEffect(shadow)
 
         # Apply stylesheet for enhanced styling
         self.apply_stylesheet()
@@ -296,6 +1169,23 @@ class BrightnessSlider(QtWidgets.QWidget):
         self.fade_out.setEasingCurve(QtCore.QEasingCurve.InOutQuad)
         self.fade_out.finished.connect(self.hide)
 
+    def background(self) -> QtGui.QPixmap:
+        """Returns the cached background pixmap, redrawn when the size or pixel ratio changed."""
+        key = (self.width(), self.height(), self.devicePixelRatioF())
+        if key != self._background_key:
+            self._background = render_slider_background(*key)
+            self._background_key = key
+            self.background_renders += 1
+        return self._background
+
+    def paintEvent(self, event: QtGui.QPaintEvent):
+        if self.render_mode != RENDER_CACHED:
+            super().paintEvent(event)
+            return
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(0, 0, self.background())
+        painter.end()
+
     def apply_stylesheet(self):
         """
         Applies the stylesheet to the BrightnessSlider to mimic Windows 11 design.
@@ -344,10 +1234,26 @@ class BrightnessSlider(QtWidgets.QWidget):
             QLabel: The label containing the sun pixmap.
         """
         icon_label = QtWidgets.QLabel()
-        pixmap = create_sun_pixmap(24, 24)  # Using imported function
-        icon_label.setPixmap(pixmap)
+        icon_label.setPixmap(sun_icons.pixmap(24, 24, device_pixel_ratio=self.devicePixelRatioF()))
         return icon_label
     
+    def create_target_label(self) -> QtWidgets.QLabel:
+        """
+        Creates the label naming the monitor the slider adjusts, shown with more than one monitor.
+
+        Returns:
+            QLabel: The target label.
+        """
+        label = QtWidgets.QLabel()
+        label.setStyleSheet(f"""
+            QLabel {{
+                font: {FONT_STYLE};
+                color: {LABEL_COLOR};
+            }}
+        """)
+        label.hide()
+        return label
+
     def create_percent_label(self) -> QtWidgets.QLabel:
         """
         Creates the label to display current brightness percentage.
@@ -383,11 +1289,13 @@ class BrightnessSlider(QtWidgets.QWidget):
         return slider
 
 
+    @instrumentation.timed("slider_moved")
     def slider_moved(self, value: int):
         """
         Called when the internal slider is manually adjusted.
         Updates the percentage label, resets the inactivity timer,
-        and schedules a brightness update with debounce.
+        and applies the brightness. How often the monitors are actually
+        written is decided per monitor by the writer's rate limiter.
 
         Args:
             value (int): The new slider value.
@@ -399,22 +1307,180 @@ class BrightnessSlider(QtWidgets.QWidget):
         self.inactivity_timer.stop()
         self.inactivity_timer.start()
 
-        # Reset debounce timer to limit brightness change frequency
-        self.debounce_timer.stop()
-        self.debounce_timer.start()
+        if not self._syncing:
+            self.apply_brightness_change()
+            self.manual_change.emit()
 
+    @instrumentation.timed("apply_brightness_change")
     def apply_brightness_change(self):
         """
-        Applies the brightness change for all monitors to the latest value set by the slider.
+        Applies the latest value set by the slider to the target monitors.
+
+        Monitors that already have the value are left alone, unless their
+        last write failed, then they are written again.
         """
         value = self.latest_brightness
-        for idx in monitor_brightness:
-            try:
-                ChangeBrightness(idx, value)
-                monitor_brightness[idx] = value
-                last_brightness[idx] = value
-            except Exception as e:
-                show_user_message("Error", f"Could not adjust brightness for Monitor {idx+1}")
+        self.set_targets({monitor_id: value for monitor_id in self.target_monitors(monitor_registry.snapshot())})
+
+    def set_targets(self, targets: Dict[str, int]):
+        """
+        Ramps monitors to new brightness targets.
+
+        Monitors that already have their target are only written again if
+        they have not confirmed it.
+
+        Args:
+            targets (Dict[str, int]): Target brightness keyed by monitor ID.
+        """
+        snapshot = monitor_registry.snapshot()
+        changed = {monitor_id: value for monitor_id, value in targets.items()
+                   if monitor_id in snapshot and snapshot.get(monitor_id).brightness != value}
+        if changed:
+            monitor_registry.update(brightness=changed)
+            self.transitions.transition_to(changed)
+        self.retry_dirty(snapshot, [monitor_id for monitor_id in targets if monitor_id not in changed])
+
+    def target_monitors(self, snapshot) -> List[str]:
+        """Returns the monitors the slider adjusts, all with a known brightness or the selected one."""
+        if self.target_monitor is not None and self.target_monitor in snapshot:
+            return [self.target_monitor]
+        return list(snapshot.brightness())
+
+    def retry_dirty(self, snapshot, monitor_ids: List[str]):
+        """
+        Writes the requested brightness again to those of the given monitors that did not confirm it.
+
+        Monitors that are still ramping or have a write under way are
+        skipped, they have not had the chance to confirm yet.
+
+        Args:
+            snapshot (RegistrySnapshot): The registry state to check.
+            monitor_ids (List[str]): The monitors to check.
+        """
+        dirty = snapshot.dirty()
+        retry = {monitor_id: dirty[monitor_id] for monitor_id in monitor_ids
+                 if monitor_id in dirty and not self.transitions.engine.is_ramping(monitor_id)
+                 and not self.writer.queue.is_busy(monitor_id)}
+        if retry:
+            self.writer.post(retry)
+            monitor_registry.update(last_brightness=retry)
+
+    def select_next_monitor(self):
+        """Steps the slider's target from all monitors through each connected one and back to all."""
+        snapshot = monitor_registry.snapshot()
+        choices = [None] + list(snapshot.brightness())
+        position = choices.index(self.target_monitor) if self.target_monitor in choices else 0
+        self.target_monitor = choices[(position + 1) % len(choices)]
+        self.update_target_label()
+        self.show_slider(self.current_brightness())
+
+    def update_target_label(self):
+        """Names the target monitor by its position, hidden while there is only one monitor to adjust."""
+        snapshot = monitor_registry.snapshot()
+        if self.target_monitor not in snapshot:
+            self.target_monitor = None
+        if self.target_monitor is None:
+            self.target_label.setText("All")
+        else:
+            self.target_label.setText(str(snapshot.position(self.target_monitor) + 1))
+        self.target_label.setToolTip(
+            "All monitors" if self.target_monitor is None else monitor_label(self.target_monitor)
+        )
+        self.target_label.setVisible(len(snapshot.brightness()) > 1)
+
+    def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        if watched is self.icon and event.type() == QtCore.QEvent.MouseButtonPress:
+            self.select_next_monitor()
+            return True
+        return super().eventFilter(watched, event)
+
+    @QtCore.pyqtSlot(object, int)
+    def handle_monitor_ready(self, monitor_id: str, brightness: int):
+        """
+        Slot that adds a monitor reported by the MonitorEnumerator.
+
+        Args:
+            monitor_id (str): The monitor ID.
+            brightness (int): The brightness read from the monitor.
+        """
+        monitor_registry.update(brightness={monitor_id: brightness}, last_brightness={monitor_id: brightness})
+
+    @QtCore.pyqtSlot(object)
+    def handle_monitor_removed(self, monitor_id: str):
+        """
+        Slot that stops the ramp of a monitor the MonitorEnumerator no longer finds.
+
+        Args:
+            monitor_id (str): The monitor ID.
+        """
+        self.transitions.forget(monitor_id)
+
+    @QtCore.pyqtSlot(object)
+    def handle_monitor_unsupported(self, monitor_id: str):
+        """
+        Slot that takes a monitor without luminance support out of brightness control.
+
+        Args:
+            monitor_id (str): The monitor ID.
+        """
+        self.transitions.forget(monitor_id)
+        monitor_registry.update(brightness={monitor_id: None}, last_brightness={monitor_id: None})
+
+    @QtCore.pyqtSlot(object, str)
+    def handle_write_failed(self, monitor_id: str, message: str):
+        """
+        Slot that reports a failed brightness write for a single monitor.
+
+        Writes that were still queued for a monitor that has since been
+        disconnected fail silently. The failure is not shown in a dialog, which
+        would block the event loop, but emitted with 'error_reported' at most
+        once per ERROR_REPORT_INTERVAL and monitor.
+
+        Args:
+            monitor_id (str): The monitor that failed.
+            message (str): The error reported by the monitor.
+        """
+        if monitor_id not in monitor_registry.snapshot():
+            return
+        now = time.monotonic()
+        last = self._error_reported_at.get(monitor_id)
+        if last is not None and now - last < ERROR_REPORT_INTERVAL / 1000:
+            return
+        self._error_reported_at[monitor_id] = now
+        self.error_reported.emit("Error", f"Could not adjust brightness for {monitor_label(monitor_id)}")
+
+    @QtCore.pyqtSlot(object, bool)
+    def handle_brightness_requested(self, targets: Dict[str, int], repeating: bool = False):
+        """
+        Slot for a hotkey step: moves the monitors to their targets and shows the slider at the new level.
+
+        A single press ramps smoothly. Auto-repeats of a held hotkey are
+        posted at once instead, the repeats themselves are the ramp, and the
+        write queue keeps only the newest of them, so nothing is left to
+        drain when the key is released.
+
+        Args:
+            targets (Dict[str, int]): Target brightness keyed by monitor ID.
+            repeating (bool): Whether the step comes from an auto-repeat.
+        """
+        instrumentation.finish_delivery("brightness_requested")
+        self.manual_change.emit()
+        self.transitions.transition_to(targets, 0 if repeating else None)
+        snapshot = monitor_registry.snapshot()
+        self.retry_dirty(snapshot, [monitor_id for monitor_id in snapshot if monitor_id not in targets])
+        self.show_slider(targets.get(self.target_monitor, list(targets.values())[-1]))
+
+    def current_brightness(self) -> int:
+        """Returns the brightness of the target monitor, or of the first one whose brightness is known."""
+        snapshot = monitor_registry.snapshot()
+        record = snapshot.get(self.target_monitor) if self.target_monitor is not None else None
+        if record is not None and record.brightness is not None:
+            return record.brightness
+        return next(iter(snapshot.brightness().values()), INITIAL_BRIGHTNESS)
+
+    def show_current(self, *args):
+        """Shows the slider at the current brightness."""
+        self.show_slider(self.current_brightness())
 
     def show_slider(self, value: int = INITIAL_BRIGHTNESS):
         """
@@ -441,11 +1507,17 @@ class BrightnessSlider(QtWidgets.QWidget):
             value (int): The brightness value to set.
         """
         if not self.isVisible():
+            self.update_target_label()
             self.setWindowOpacity(0.0)
             self.show()
             self.fade_in.start()
 
-        self.slider.setValue(value)
+        # The monitors already have their targets, moving the slider must not write them again
+        self._syncing = True
+        try:
+            self.slider.setValue(value)
+        finally:
+            self._syncing = False
         self.percent_label.setText(f"{value}%")
 
         # Reset inactivity timer to keep it on screen while user is active
@@ -460,67 +1532,532 @@ class BrightnessSlider(QtWidgets.QWidget):
 
 class KeyboardListener(QtCore.QThread):
     """
-    Thread that listens for keyboard events using the 'keyboard' library.
-    Emits 'brightness_changed' signal whenever Ctrl + Up or Ctrl + Down is pressed.
+    Thread that listens for keyboard events through the platform backend.
+
+    Every key event in the system goes through a HotkeyDispatcher, which
+    drops anything that is not one of BRIGHTNESS_HOTKEYS without further
+    work. A hotkey steps the brightness of all monitors and emits the new
+    targets once with 'brightness_requested', for the slider and a
+    BrightnessTransition on the GUI thread, so the hook never waits for a
+    monitor. How far a held hotkey steps is decided by a KeyRepeatPolicy.
+
+    The hook misses key releases while the session is locked or the system
+    sleeps, so the held keys are forgotten when the hook starts, when the
+    session is locked or unlocked and when `reset` is called, e.g. after
+    resume. The hook thread does the forgetting on its next event, so the
+    dispatcher is only ever touched from one thread.
     """
-    brightness_changed = QtCore.pyqtSignal(int)
+    brightness_requested = QtCore.pyqtSignal(object, bool)  # target brightness keyed by monitor ID, auto-repeat
+
+    def __init__(self, bindings: Dict[str, int] = None, parent=None):
+        """
+        Args:
+            bindings (Dict[str, int]): Step direction keyed by hotkey. Defaults to BRIGHTNESS_HOTKEYS.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.repeat_policy = KeyRepeatPolicy(first_step=BRIGHTNESS_STEP)
+        self.dispatcher = HotkeyDispatcher(bindings or BRIGHTNESS_HOTKEYS, self.on_hotkey, self.on_hotkey_released)
+        self._reset_pending = False
+        self._session_locked = False
+
+        self.session_timer = QtCore.QTimer(self)
+        self.session_timer.setInterval(SESSION_CHECK_INTERVAL)
+        self.session_timer.timeout.connect(self.check_session)
+        self.started.connect(self.session_timer.start)
+        self.finished.connect(self.session_timer.stop)
 
     def run(self):
-        keyboard.on_press(self.on_key_press)
-        keyboard.wait()
+        backend = get_backend()
+        self._session_locked = backend.is_session_locked()
+        self.reset()
+        backend.hook_key_events(self.feed)
+        backend.wait_for_keys()
+
+    def feed(self, event):
+        """Passes a key event to the dispatcher, forgetting the held keys first if a reset is pending."""
+        if self._reset_pending:
+            self._reset_pending = False
+            self.dispatcher.reset()
+            self.repeat_policy.release()
+        self.dispatcher.feed(event)
+
+    def reset(self, *args):
+        """Forgets the held keys before the next key event, the releases may have been missed."""
+        self._reset_pending = True
+
+    def check_session(self):
+        """Resets the held keys when the session got locked or unlocked since the last check."""
+        locked = get_backend().is_session_locked()
+        if locked != self._session_locked:
+            self._session_locked = locked
+            self.reset()
+
+    @instrumentation.timed("on_hotkey")
+    def on_hotkey(self, direction: int, event):
+        """
+        Steps the brightness of all monitors up or down and emits the new targets.
 
-    def on_key_press(self, event):
+        Args:
+            direction (int): 1 to brighten, -1 to dim.
+            event: The key event that triggered the hotkey.
         """
-        Handles key press events. If Ctrl + Up or Ctrl + Down is pressed, adjust the
-        brightness of all monitors and emit the 'brightness_changed' signal.
+        step = self.repeat_policy.press(direction)
+        repeating = self.repeat_policy.repeats > 0
+
+        # Step from a snapshot and retry if the GUI thread changed the brightness in between
+        while True:
+            snapshot = monitor_registry.snapshot()
+            targets = {}
+            for monitor_id, brightness in snapshot.brightness().items():
+                target_brightness = step_brightness(brightness, direction, step)
+                if target_brightness != brightness:
+                    targets[monitor_id] = target_brightness
+            if monitor_registry.update(brightness=targets, expected_version=snapshot.version) is not None:
+                break
+
+        # Ramp on the GUI thread so the hook returns without waiting for the monitors
+        if targets:
+            instrumentation.start_delivery("brightness_requested")
+            self.brightness_requested.emit(targets, repeating)
+
+    def on_hotkey_released(self, direction: int, event):
+        """Ends a held hotkey, so the next press starts again with a single step."""
+        self.repeat_policy.release()
+
+
+class CommandServer(QtCore.QObject):
+    """
+    Answers commands from other processes on a local socket or named pipe.
+
+    Speaks the line based JSON protocol of ipc.py: every line is a request,
+    answered with one line in the same order, so clients can pipeline
+    several. Commands run on the GUI thread against the registry, a change
+    is handed to the slider like one of its own and answered before the
+    monitors are written, so a call takes milliseconds.
+    """
 
+    def __init__(self, slider: "BrightnessSlider", address: str = None, parent=None):
+        """
         Args:
-            event: The keyboard event.
+            slider (BrightnessSlider): Slider that changes are made through and that 'show' shows.
+            address (str): Socket path or pipe name. Defaults to ipc.default_address().
+            parent: Optional parent QObject.
         """
-        if keyboard.is_pressed('ctrl'):
-            for idx in list(monitor_brightness.keys()):
-                try:
-                    if keyboard.is_pressed('up'):
-                        target_brightness = min(monitor_brightness[idx] + 10, 100)
-                    elif keyboard.is_pressed('down'):
-                        target_brightness = max(monitor_brightness[idx] - 10, 0)
-                    else:
-                        continue  # No relevant key pressed
-
-                    # Validate target_brightness
-                    if target_brightness < 0 or target_brightness > 100:
-                        continue
-
-                    if target_brightness != last_brightness.get(idx, -1):
-                        ChangeBrightness(idx, target_brightness)
-                        monitor_brightness[idx] = target_brightness
-                        last_brightness[idx] = target_brightness
-                        # Emit signal to update the slider
-                        self.brightness_changed.emit(target_brightness)
-                except Exception as e:
-                    show_user_message("Error", f"Failed to adjust brightness for Monitor {idx+1}")
+        super().__init__(parent)
+        self.slider = slider
+        self.address = address or default_address()
+        self.requests = 0
+        self._buffers = {}
+        self.server = QtNetwork.QLocalServer(self)
+        self.server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+
+    def listen(self) -> bool:
+        """
+        Starts accepting connections.
+
+        A socket left behind by an instance that crashed is replaced, one that
+        a running instance still accepts connections on is left alone.
+
+        Returns:
+            Whether the server is listening.
+        """
+        # Listening with access options renames the new socket over one that exists
+        if self._is_answered():
+            logging.error("Another instance already listens for commands on %s", self.address)
+            return False
+        if not self.server.listen(self.address):
+            # A socket left behind by an instance that crashed, nobody answered on it
+            QtNetwork.QLocalServer.removeServer(self.address)
+            if not self.server.listen(self.address):
+                logging.error("Could not listen for commands on %s: %s", self.address, self.server.errorString())
+                return False
+        return True
+
+    def close(self):
+        """Stops accepting connections and removes the socket."""
+        self.server.close()
+
+    def _is_answered(self) -> bool:
+        """
+        Checks whether a running server accepts connections on the address.
+
+        The kernel accepts a connection for a server whose event loop is busy,
+        so a slow instance is not mistaken for a crashed one.
+        """
+        socket = QtNetwork.QLocalSocket()
+        socket.connectToServer(self.address)
+        answered = socket.waitForConnected(SERVER_PROBE_TIMEOUT)
+        socket.abort()
+        return answered
+
+    def handle_line(self, line: bytes) -> Dict:
+        """Answers one request line, errors included."""
+        self.requests += 1
+        try:
+            request = decode(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"Malformed request: {e}"}
+        try:
+            return dict(self.handle(request), id=request.get("id"), ok=True)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"id": request.get("id"), "ok": False, "error": str(e)}
+
+    @instrumentation.timed("ipc_command")
+    def handle(self, request: Dict) -> Dict:
+        """
+        Runs a single command.
+
+        Raises:
+            ValueError: The command or one of its arguments is invalid.
+        """
+        name = request.get("cmd")
+        if name not in COMMANDS:
+            raise ValueError(f"Unknown command '{name}'")
+        snapshot = monitor_registry.snapshot()
+        if name == "ping":
+            return {}
+        if name == "show":
+            self.slider.show_current()
+            return {}
+        if name == "list":
+            return {"monitors": [
+                {"id": monitor_id, "position": position + 1, "label": monitor_label(monitor_id),
+                 "brightness": snapshot.get(monitor_id).brightness}
+                for position, monitor_id in enumerate(snapshot)
+            ]}
+
+        monitor_ids = self._monitors(snapshot, request.get("monitor"))
+        if name == "get":
+            return {"brightness": {monitor_id: snapshot.get(monitor_id).brightness for monitor_id in monitor_ids}}
+        if name == "set":
+            value = clamp_brightness(int(request["value"]))
+            targets = {monitor_id: value for monitor_id in monitor_ids}
+        else:
+            delta = int(request["delta"])
+            targets = {monitor_id: clamp_brightness(snapshot.get(monitor_id).brightness + delta)
+                       for monitor_id in monitor_ids}
+        self.slider.set_targets(targets)
+        self.slider.manual_change.emit()
+        return {"brightness": targets}
+
+    def _monitors(self, snapshot, monitor) -> List[str]:
+        """Resolves a monitor given by position (from 1) or ID, or all monitors for None."""
+        if monitor is None:
+            return list(snapshot.brightness())
+        if isinstance(monitor, int) and not isinstance(monitor, bool):
+            ids = list(snapshot)
+            if not 1 <= monitor <= len(ids):
+                raise ValueError(f"No monitor at position {monitor}, {len(ids)} connected")
+            monitor = ids[monitor - 1]
+        record = snapshot.get(monitor)
+        if record is None:
+            raise ValueError(f"No monitor '{monitor}'")
+        if record.brightness is None:
+            raise ValueError(f"The brightness of {monitor_label(monitor)} is not known yet")
+        return [monitor]
+
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self._buffers[connection] = b""
+            connection.readyRead.connect(partial(self._read, connection))
+            connection.disconnected.connect(partial(self._disconnected, connection))
+
+    def _read(self, connection: QtNetwork.QLocalSocket):
+        lines = (self._buffers.get(connection, b"") + bytes(connection.readAll())).split(b"\n")
+        rest = lines.pop()
+        if len(rest) > MAX_LINE_LENGTH:
+            connection.disconnectFromServer()
+            return
+        self._buffers[connection] = rest
+        replies = [encode(self.handle_line(line)) for line in lines if line.strip()]
+        if replies:
+            connection.write(b"".join(replies))
+            connection.flush()
+
+    def _disconnected(self, connection: QtNetwork.QLocalSocket):
+        self._buffers.pop(connection, None)
+        connection.deleteLater()
+
+class ProfileManager(QtCore.QObject):
+    """
+    Applies named brightness profiles from a ProfileStore.
+
+    A profile is applied as one batch: its targets are compared with the
+    registry, and only the monitors whose brightness differs or that have
+    not confirmed it are written, without a ramp. The writes are posted to
+    the writer's queue, so they replace any slider or hotkey value still
+    waiting there, keep each monitor's rate limit, and run concurrently
+    across monitors. The outcome of the whole batch is reported once with
+    'profile_applied', failed monitors are not reported one by one.
+    """
+    profile_applied = QtCore.pyqtSignal(object)  # BatchResult
 
+    def __init__(self, slider: "BrightnessSlider", store: ProfileStore, parent=None):
+        """
+        Args:
+            slider (BrightnessSlider): The slider whose writer and ramps the profiles go through.
+            store (ProfileStore): The profiles.
+            parent: Optional parent QObject.
+        """
+        super().__init__(parent)
+        self.slider = slider
+        self.store = store
+        self.batches = 0
+        self.writes = 0
+
+    def apply(self, name: str) -> Dict[str, int]:
+        """
+        Starts applying a profile.
+
+        Returns:
+            The writes started, brightness keyed by monitor ID.
+
+        Raises:
+            KeyError: There is no such profile.
+        """
+        profile = self.store.get(name)
+        if profile is None:
+            raise KeyError(name)
+        snapshot = monitor_registry.snapshot()
+        targets = resolve_targets(profile, snapshot.brightness())
+        confirmed = {monitor_id: snapshot.get(monitor_id).confirmed_brightness for monitor_id in targets}
+        writes = plan_writes(targets, snapshot.brightness(), confirmed)
+        unchanged = len(targets) - len(writes)
+
+        # A profile replaces whatever the slider or a hotkey was ramping to, and the next ramp starts from it
+        for monitor_id in writes:
+            self.slider.transitions.forget(monitor_id)
+        if writes:
+            monitor_registry.update(brightness=writes, last_brightness=writes)
+        self.batches += 1
+        self.writes += len(writes)
+        self.slider.manual_change.emit()
+        self.slider.writer.post(writes, on_finished=lambda written, failed, superseded: self.profile_applied.emit(
+            BatchResult(name, written, failed, unchanged, superseded)))
+        if self.slider.isVisible():
+            self.slider.handle_update_slider(self.slider.current_brightness())
+        return writes
+
+    def save_current(self, name: str):
+        """
+        Saves the brightness of every connected monitor as a profile.
+
+        Raises:
+            ValueError: The name is empty.
+        """
+        self.store.save(name, monitor_registry.snapshot().brightness())
+
+class DiagnosticsDialog(QtWidgets.QDialog):
+    """
+    Shows what the writer has learned about each monitor.
+
+    Lists the brightness, contrast and maximum luminance read from every
+    monitor, the average write latency, error rate and resulting write spacing
+    together with the counters of the write queue, refreshed while the dialog
+    is open. Below that the latency histograms of the hot path stages can be
+    recorded, reset and exported as JSON.
+    """
+    COLUMNS = ["Monitor", "Brightness", "Contrast", "Max luminance", "Latency (ms)", "Error rate",
+               "Spacing (ms)", "Writes", "Errors"]
+    STAGE_COLUMNS = ["Stage", "Count", "p50 (ms)", "p90 (ms)", "p99 (ms)", "p99.9 (ms)", "Max (ms)"]
+
+    def __init__(self, writer: BrightnessWriter, parent=None):
+        super().__init__(parent)
+        self.writer = writer
+        self.setWindowTitle(f"{APP_NAME} Diagnostics")
+        self.resize(760, 480)
+
+        layout = QtWidgets.QVBoxLayout()
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+        self.counters_label = QtWidgets.QLabel()
+        layout.addWidget(self.counters_label)
+
+        self.record_checkbox = QtWidgets.QCheckBox("Record hot path latency")
+        self.record_checkbox.setChecked(instrumentation.enabled)
+        self.record_checkbox.toggled.connect(instrumentation.set_enabled)
+        layout.addWidget(self.record_checkbox)
+        self.stage_table = QtWidgets.QTableWidget(0, len(self.STAGE_COLUMNS))
+        self.stage_table.setHorizontalHeaderLabels(self.STAGE_COLUMNS)
+        self.stage_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.stage_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.stage_table)
+
+        buttons = QtWidgets.QHBoxLayout()
+        reset_button = QtWidgets.QPushButton("Reset")
+        reset_button.clicked.connect(self.reset_latency)
+        export_button = QtWidgets.QPushButton("Export JSON...")
+        export_button.clicked.connect(self.export_latency)
+        buttons.addStretch()
+        buttons.addWidget(reset_button)
+        buttons.addWidget(export_button)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(DIAGNOSTICS_REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Reloads the learned values and counters from the writer."""
+        stats = self.writer.limiter.snapshot()
+        registry = monitor_registry.snapshot()
+        monitor_ids = list(registry) + [monitor_id for monitor_id in stats if monitor_id not in registry]
+        self.table.setRowCount(len(monitor_ids))
+        for row, monitor_id in enumerate(monitor_ids):
+            record = registry.get(monitor_id)
+            cells = [monitor_label(monitor_id)]
+            for field in ("last_brightness", "contrast", "max_luminance"):
+                value = None if record is None else getattr(record, field)
+                cells.append("-" if value is None else str(value))
+            values = stats.get(monitor_id)
+            if values is None:
+                cells += ["-"] * 5
+            else:
+                cells += [
+                    "-" if values["latency"] is None else f"{1000 * values['latency']:.1f}",
+                    f"{values['error_rate']:.2f}",
+                    f"{1000 * values['spacing']:.1f}",
+                    str(values["writes"]),
+                    str(values["errors"]),
+                ]
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+
+        counters = self.writer.counters()
+        self.counters_label.setText(
+            "Queued writes: {submitted} submitted, {coalesced} coalesced, "
+            "{applied} applied, {failed} failed, {skipped} skipped as unchanged".format(**counters)
+        )
+        self.refresh_latency()
+
+    def refresh_latency(self):
+        """Reloads the per-stage latency percentiles."""
+        summary = instrumentation.summary()
+        self.stage_table.setRowCount(len(summary))
+        for row, (stage, values) in enumerate(summary.items()):
+            durations = list(values["percentiles"].values()) + [values["max"]]
+            cells = [stage, str(values["count"])]
+            cells += ["-" if duration is None else f"{duration / 1e6:.3f}" for duration in durations]
+            for column, text in enumerate(cells):
+                self.stage_table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+
+    def reset_latency(self):
+        """Drops the latency recorded so far."""
+        instrumentation.reset()
+        self.refresh_latency()
+
+    def export_latency(self):
+        """Asks for a file name and writes the latency histograms to it as JSON."""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export latency histograms", "latency.json", "JSON files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            instrumentation.export(path)
+        except OSError as e:
+            show_user_message("Error", f"Could not export latency histograms: {e}")
 
 class SystemTrayIcon(QtWidgets.QSystemTrayIcon):
     """
     System Tray Icon with context menu.
     """
-    def __init__(self, parent=None):
-        sun_icon = create_sun_pixmap(32, 32)
-        super().__init__(QtGui.QIcon(sun_icon), parent)
-        
+    def __init__(self, parent=None, profiles: ProfileManager = None):
+        super().__init__(parent)
+
+        # The icon shows the slider's level, it is replaced only when the quantized level changes
+        self.level = None
+        self.icon_updates = 0
+        self.show_level(parent.slider.value())
+        parent.slider.valueChanged.connect(self.show_level)
+
         self.setToolTip(APP_NAME)
+        self.diagnostics = None
         menu = QtWidgets.QMenu(parent)
 
         show_action = menu.addAction("Show")
+        self.profiles = profiles
+        if profiles is not None:
+            self.profiles_menu = menu.addMenu("Profiles")
+            self.profiles_menu.aboutToShow.connect(self.fill_profiles_menu)
+            profiles.profile_applied.connect(self.show_profile_result)
+        diagnostics_action = menu.addAction("Diagnostics")
         quit_action = menu.addAction("Exit")
 
-        show_action.triggered.connect(parent.show_slider)
+        show_action.triggered.connect(parent.show_current)
+        diagnostics_action.triggered.connect(self.show_diagnostics)
         quit_action.triggered.connect(QtWidgets.QApplication.quit)
 
         self.setContextMenu(menu)
         self.activated.connect(self.on_click)
+        parent.error_reported.connect(self.show_error)
+
+    @QtCore.pyqtSlot(int)
+    def show_level(self, brightness: int):
+        """
+        Shows the given brightness in the tray icon.
+
+        Args:
+            brightness (int): Brightness level (0-100).
+        """
+        level = icon_level(brightness)
+        if level == self.level:
+            return
+        self.level = level
+        self.icon_updates += 1
+        ratio = QtWidgets.QApplication.primaryScreen().devicePixelRatio()
+        self.setIcon(QtGui.QIcon(sun_icons.pixmap(TRAY_ICON_SIZE, TRAY_ICON_SIZE, level, ratio)))
+
+    @QtCore.pyqtSlot(str, str)
+    def show_error(self, title: str, message: str):
+        """Shows an error as a tray notification, which unlike a message box does not block."""
+        self.showMessage(title, message, QtWidgets.QSystemTrayIcon.Warning)
+
+    def fill_profiles_menu(self):
+        """Lists the profiles, rebuilt each time the menu opens so saved profiles show up."""
+        self.profiles_menu.clear()
+        for name in self.profiles.store.names():
+            action = self.profiles_menu.addAction(name)
+            action.triggered.connect(partial(self.profiles.apply, name))
+        self.profiles_menu.addSeparator()
+        self.profiles_menu.addAction("Save current as...").triggered.connect(self.save_profile)
+
+    def save_profile(self):
+        """Asks for a name and saves the current brightness of every monitor under it."""
+        name, ok = QtWidgets.QInputDialog.getText(None, APP_NAME, "Profile name:")
+        if ok and name.strip():
+            self.profiles.save_current(name)
+
+    @QtCore.pyqtSlot(object)
+    def show_profile_result(self, result: BatchResult):
+        """Shows the outcome of applying a profile as a single notification."""
+        icon = QtWidgets.QSystemTrayIcon.Information if result.ok else QtWidgets.QSystemTrayIcon.Warning
+        self.showMessage(APP_NAME if result.ok else "Error", result.summary(monitor_label), icon)
+
+    def show_diagnostics(self):
+        """Opens the diagnostics dialog, creating it on first use."""
+        if self.diagnostics is None:
+            self.diagnostics = DiagnosticsDialog(self.parent().writer)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
 
     def on_click(self, reason):
         if reason == self.Trigger:
-            self.parent().show_slider(INITIAL_BRIGHTNESS)
+            self.parent().show_current()
@@ -1,22 +1,32 @@
-import ctypes
 import sys
 import os
 import logging
 from PyQt5 import QtWidgets
+from adaptive import AdaptiveConfig, ContentAnalyzer
+from ipc import hand_off
+from profiles import PROFILES_FILE_NAME, ProfileStore
+from schedule import schedule_from_env
+from state_cache import default_state_dir
 from modules import (
-    create_sun_pixmap,
     show_user_message,
     ensure_admin,
-    RetrieveMonitors,
-    ChangeBrightness,
-    RetrieveBrightness,
     hide_console,
+    MonitorEnumerator,
+    BrightnessWriter,
     BrightnessSlider,
+    BrightnessReconciler,
+    BrightnessScheduler,
+    ContentAdaptiveBrightness,
+    SystemEvents,
+    monitor_registry,
+    CommandServer,
+    ProfileManager,
     KeyboardListener,
     SystemTrayIcon,
-    monitor_brightness,
-    last_brightness,
-    INITIAL_BRIGHTNESS,
+    monitor_handles,
+    monitor_io,
+    state_cache,
+    remember_brightness,
     APP_NAME
 )
 
@@ -24,29 +34,135 @@ from modules import (
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+def no_monitors_found(count: int):
+    """Tells the user when enumeration finished without a usable monitor."""
+    if count == 0:
+        show_user_message("Error", "No compatible monitors detected.")
+
+def report_first_enumeration(enumerator: MonitorEnumerator):
+    """Checks the first enumeration for usable monitors, later hotplug runs stay quiet."""
+    def finished(count: int):
+        enumerator.enumeration_finished.disconnect(finished)
+        no_monitors_found(count)
+    enumerator.enumeration_finished.connect(finished)
+
+def create_ui():
+    """
+    Creates the slider and tray icon, then starts detecting monitors in the background.
+
+    The tray icon is shown before any monitor has been probed, monitors are added
+    to the brightness dictionaries as each one answers. Monitors plugged in or
+    out later are picked up when Qt reports the screen change, and brightness
+    changed with the monitors' own buttons by a BrightnessReconciler. Scripts and
+    later launches reach the running instance through a CommandServer.
+
+    Returns:
+        Tuple of the BrightnessSlider, the SystemTrayIcon and the running MonitorEnumerator.
+    """
+    app = QtWidgets.QApplication.instance()
+    writer = BrightnessWriter()
+    app.aboutToQuit.connect(writer.shutdown)
+    app.aboutToQuit.connect(monitor_io.shutdown)
+    app.aboutToQuit.connect(monitor_handles.close_all)
+    app.aboutToQuit.connect(state_cache.close)
+    writer.monitor_changed.connect(remember_brightness)
+    slider = BrightnessSlider(writer)
+
+    # Setup system tray icon using the correct class, with the brightness profiles in its menu
+    profiles = ProfileManager(slider, ProfileStore(os.path.join(default_state_dir(APP_NAME), PROFILES_FILE_NAME)),
+                              parent=slider)
+    tray_icon = SystemTrayIcon(parent=slider, profiles=profiles)
+    tray_icon.show()
+
+    enumerator = MonitorEnumerator()
+    enumerator.monitor_ready.connect(slider.handle_monitor_ready)
+    enumerator.monitor_removed.connect(slider.handle_monitor_removed)
+    enumerator.monitor_unsupported.connect(slider.handle_monitor_unsupported)
+    report_first_enumeration(enumerator)
+    enumerator.enumeration_failed.connect(
+        lambda message: show_user_message("Error", "Failed to detect monitors. Please ensure your monitors support DDC/CI.")
+    )
+    enumerator.watch_screens(app)
+
+    # Pick up changes made with the monitors' own buttons, giving way to writes and enumeration
+    reconciler = BrightnessReconciler(
+        busy=lambda: writer.queue.is_busy() or slider.transitions.engine.is_active() or enumerator.isRunning(),
+        parent=slider,
+    )
+    reconciler.brightness_reconciled.connect(remember_brightness)
+    reconciler.brightness_reconciled.connect(lambda monitor_id, value: slider.transitions.forget(monitor_id))
+    slider.update_slider_signal.connect(reconciler.note_interaction)
+    slider.slider.sliderMoved.connect(reconciler.note_interaction)
+    enumerator.enumeration_finished.connect(reconciler.start)
+    app.aboutToQuit.connect(reconciler.shutdown)
+
+    def set_all(level: int):
+        slider.set_targets({monitor_id: level for monitor_id in monitor_registry.snapshot().brightness()})
+
+    def set_one(monitor_id: str, level: int):
+        slider.set_targets({monitor_id: level})
+
+    # Follow the brightness schedule, if one is set, once the monitors are known
+    try:
+        schedule = schedule_from_env()
+    except ValueError as e:
+        schedule = None
+        show_user_message("Error", f"Ignoring the brightness schedule: {e}")
+    if schedule is not None:
+        scheduler = BrightnessScheduler(schedule, set_all, set_one, parent=slider)
+        slider.manual_change.connect(scheduler.note_override)
+        enumerator.monitor_ready.connect(scheduler.add_monitor)
+        enumerator.enumeration_finished.connect(scheduler.start)
+        app.aboutToQuit.connect(scheduler.shutdown)
+        system_events = SystemEvents(parent=slider)
+        system_events.resumed.connect(scheduler.recompute)
+        system_events.clock_changed.connect(scheduler.recompute)
+        system_events.install(app, slider)
+
+    # Adapt the brightness to the screen content, if enabled
+    try:
+        adaptive_config = AdaptiveConfig.from_env()
+        if adaptive_config is not None:
+            import numpy  # noqa: F401, the analysis needs it
+    except (ValueError, ImportError) as e:
+        adaptive_config = None
+        show_user_message("Error", f"Content-adaptive brightness is off: {e}")
+    if adaptive_config is not None:
+        adaptive = ContentAdaptiveBrightness(ContentAnalyzer(adaptive_config), parent=slider)
+        adaptive.target_changed.connect(set_all)
+        slider.manual_change.connect(adaptive.note_override)
+        enumerator.enumeration_finished.connect(adaptive.start)
+        app.aboutToQuit.connect(adaptive.shutdown)
+
+    # Commands from scripts and from a second launch
+    server = CommandServer(slider, parent=slider)
+    server.listen()
+    app.aboutToQuit.connect(server.close)
+
+    enumerator.start()
+    return slider, tray_icon, enumerator
+
 def main():
     """
     Entry point for the application.
     """
     try:
+        # A second launch shows the running instance instead of enumerating the monitors again
+        if hand_off():
+            sys.exit(0)
+
         hide_console()  # Hide console window
         ensure_admin()
         # add_to_startup() - Removed as this will be handled by the installer
-        monitors = RetrieveMonitors()
-        
-        if not monitors:
-            show_user_message("Error", "No compatible monitors detected.")
-            return
 
         app = QtWidgets.QApplication(sys.argv)
-        slider = BrightnessSlider()
-
-        # Setup system tray icon using the correct class
-        tray_icon = SystemTrayIcon(parent=slider)
-        tray_icon.show()
+        slider, tray_icon, enumerator = create_ui()
 
         listener = KeyboardListener()
-        listener.brightness_changed.connect(slider.show_slider)
+        listener.brightness_requested.connect(slider.handle_brightness_requested)
+        system_events = SystemEvents(parent=listener)
+        system_events.resumed.connect(listener.reset)
+        system_events.install(app, slider)
         listener.start()
 
         sys.exit(app.exec_())
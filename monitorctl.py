@@ -0,0 +1,18 @@
+"""
+Controls the running Monitor Brightness Control from the command line.
+
+Talks to the application over a local socket or named pipe, without loading
+Qt or any monitor library, so a call takes milliseconds.
+
+Usage:
+    python monitorctl.py get
+    python monitorctl.py "set 40"
+    python monitorctl.py "set +10 2" "get 2"
+    python monitorctl.py list
+"""
+import sys
+
+from ipc import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from state_cache import write_json_atomically
+
+PROFILES_FILE_NAME = "profiles.json"
+ALL_MONITORS = "*"  # profile key for every monitor without a target of its own
+DEFAULT_PROFILES = {
+    "Day": {ALL_MONITORS: 80},
+    "Night": {ALL_MONITORS: 30},
+    "Presentation": {ALL_MONITORS: 100},
+}
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_targets(profile: Dict[str, int], monitor_ids: Iterable[str]) -> Dict[str, int]:
+    """
+    Returns the brightness a profile sets on each of the given monitors.
+
+    Args:
+        profile (Dict[str, int]): Brightness keyed by monitor ID, ALL_MONITORS for the rest.
+        monitor_ids (Iterable[str]): The connected monitors.
+    """
+    default = profile.get(ALL_MONITORS)
+    targets = {}
+    for monitor_id in monitor_ids:
+        value = profile.get(monitor_id, default)
+        if value is not None:
+            targets[monitor_id] = max(0, min(100, int(value)))
+    return targets
+
+
+def plan_writes(targets: Dict[str, int], known: Dict[str, Optional[int]],
+                confirmed: Dict[str, Optional[int]]) -> Dict[str, int]:
+    """
+    Returns the writes needed to bring monitors to their targets.
+
+    A monitor is written when its known brightness differs from the target,
+    or when it has not confirmed the target, e.g. because its last write
+    failed. All others already have their target.
+
+    Args:
+        targets (Dict[str, int]): Target brightness keyed by monitor ID.
+        known (Dict[str, Optional[int]]): The brightness each monitor was last set to.
+        confirmed (Dict[str, Optional[int]]): The brightness each monitor last confirmed.
+    """
+    return {monitor_id: value for monitor_id, value in targets.items()
+            if known.get(monitor_id) != value or confirmed.get(monitor_id) != value}
+
+
+class BatchResult(NamedTuple):
+    """Outcome of applying a profile."""
+    name: str
+    written: List[str]  # monitors written successfully
+    failed: Dict[str, str]  # error message keyed by monitor ID
+    unchanged: int  # monitors that already had their target
+    superseded: List[str] = []  # monitors set to another value before the profile's was written
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def summary(self, label: Callable[[str], str] = str) -> str:
+        """Describes the outcome in one sentence, naming failed monitors with `label`."""
+        if not self.failed:
+            return f"Applied {self.name}"
+        names = ", ".join(label(monitor_id) for monitor_id in self.failed)
+        total = len(self.written) + len(self.failed) + self.unchanged + len(self.superseded)
+        return f"Applied {self.name} to {total - len(self.failed)} of {total} monitors, failed: {names}"
+
+
+class ProfileStore:
+    """
+    Named brightness profiles, kept in a JSON file.
+
+    A profile maps monitor IDs to brightness, ALL_MONITORS sets every
+    monitor that has no value of its own. Starts with DEFAULT_PROFILES when
+    the file does not exist yet. Changes are written right away, through a
+    temporary file that replaces the old one.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The JSON file to keep the profiles in.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # held while writing the file, taken before _lock
+        self._profiles: Dict[str, Dict[str, int]] = {}
+        self.load()
+
+    def load(self):
+        """Reads the file, falling back to the default profiles when it is missing or unreadable."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            profiles = {str(name): {str(key): int(value) for key, value in targets.items()}
+                        for name, targets in data.get("profiles", {}).items()}
+        except FileNotFoundError:
+            profiles = {name: dict(targets) for name, targets in DEFAULT_PROFILES.items()}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring unreadable profiles file %s: %s", self.path, e)
+            profiles = {name: dict(targets) for name, targets in DEFAULT_PROFILES.items()}
+        with self._lock:
+            self._profiles = profiles
+
+    def names(self) -> List[str]:
+        """Returns the profile names in the order they were added."""
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, name: str) -> Optional[Dict[str, int]]:
+        """Returns the targets of a profile, or None when there is no such profile."""
+        with self._lock:
+            profile = self._profiles.get(name)
+            return None if profile is None else dict(profile)
+
+    def save(self, name: str, targets: Dict[str, int]):
+        """
+        Adds or replaces a profile and writes the file.
+
+        Args:
+            name (str): Profile name.
+            targets (Dict[str, int]): Brightness keyed by monitor ID, or ALL_MONITORS.
+
+        Raises:
+            ValueError: The name is empty.
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError("A profile needs a name")
+        with self._lock:
+            self._profiles[name] = {key: max(0, min(100, int(value))) for key, value in targets.items()}
+        self.flush()
+
+    def delete(self, name: str):
+        """Removes a profile and writes the file."""
+        with self._lock:
+            if self._profiles.pop(name, None) is None:
+                return
+        self.flush()
+
+    def flush(self):
+        """Writes the profiles to disk."""
+        with self._flush_lock:
+            with self._lock:
+                data = {"profiles": {name: dict(targets) for name, targets in self._profiles.items()}}
+            try:
+                write_json_atomically(self.path, data, indent=2)
+            except OSError as e:
+                logger.error("Failed to write profiles file %s: %s", self.path, e)
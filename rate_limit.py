@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable
+
+DEFAULT_SPACING = 0.1  # seconds between writes to a monitor that was never measured
+MIN_SPACING = 0.01  # seconds
+MAX_SPACING = 1.0  # seconds
+SMOOTHING = 0.2  # weight of the newest observation in the moving averages
+LATENCY_MARGIN = 1.2  # spacing relative to the average write latency
+ERROR_PENALTY = 4.0  # extra spacing per unit of error rate
+
+
+class _MonitorStats:
+    """Moving averages and counters of one monitor."""
+
+    __slots__ = ("latency", "error_rate", "writes", "errors", "last_write")
+
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.writes = 0
+        self.errors = 0
+        self.last_write = None
+
+
+class MonitorRateLimiter:
+    """
+    Learns how often each monitor can be written and spaces writes accordingly.
+
+    Every write reports its latency and whether it failed. The limiter keeps an
+    exponentially weighted moving average (EWMA) of both per monitor and derives
+    the minimum spacing between two writes from them: a monitor that answers
+    quickly may be written often, one that is slow or starts failing is written
+    less often.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, default_spacing: float = DEFAULT_SPACING):
+        """
+        Args:
+            clock (Callable): Monotonic time source in seconds.
+            default_spacing (float): Spacing used until a monitor has been measured.
+        """
+        self._clock = clock
+        self._default_spacing = default_spacing
+        self._lock = threading.Lock()
+        self._stats: Dict[Hashable, _MonitorStats] = {}
+
+    def record(self, key: Hashable, latency: float, ok: bool = True):
+        """
+        Records the outcome of a write.
+
+        Args:
+            key (Hashable): The monitor that was written.
+            latency (float): Duration of the write in seconds.
+            ok (bool): Whether the write succeeded.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(key, _MonitorStats())
+            stats.writes += 1
+            if not ok:
+                stats.errors += 1
+            if stats.latency is None:
+                stats.latency = latency
+            else:
+                stats.latency += SMOOTHING * (latency - stats.latency)
+            stats.error_rate += SMOOTHING * ((0.0 if ok else 1.0) - stats.error_rate)
+
+    def mark_write(self, key: Hashable):
+        """Records that a write to the monitor is starting now."""
+        with self._lock:
+            self._stats.setdefault(key, _MonitorStats()).last_write = self._clock()
+
+    def spacing(self, key: Hashable) -> float:
+        """Returns the minimum number of seconds between two writes to a monitor."""
+        with self._lock:
+            return self._spacing(self._stats.get(key))
+
+    def delay(self, key: Hashable) -> float:
+        """Returns how many seconds to wait before the monitor may be written again."""
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None or stats.last_write is None:
+                return 0.0
+            return max(0.0, stats.last_write + self._spacing(stats) - self._clock())
+
+    def snapshot(self) -> Dict[Hashable, Dict[str, float]]:
+        """Returns the learned values of every monitor, for diagnostics."""
+        with self._lock:
+            return {
+                key: {
+                    "latency": stats.latency,
+                    "error_rate": stats.error_rate,
+                    "spacing": self._spacing(stats),
+                    "writes": stats.writes,
+                    "errors": stats.errors,
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def _spacing(self, stats: _MonitorStats) -> float:
+        if stats is None or stats.latency is None:
+            return self._default_spacing
+        spacing = stats.latency * LATENCY_MARGIN * (1.0 + ERROR_PENALTY * stats.error_rate)
+        return min(MAX_SPACING, max(MIN_SPACING, spacing))
@@ -0,0 +1,67 @@
+import time
+from typing import Callable, Optional
+
+MIN_RECONCILE_INTERVAL = 2.0  # seconds between reads right after an interaction or a detected change
+MAX_RECONCILE_INTERVAL = 60.0  # seconds between reads once the values have been stable for a while
+RECONCILE_BACKOFF = 2.0  # growth of the interval per round without a change
+RECONCILE_IDLE_TIMEOUT = 600.0  # seconds without interaction until reading stops
+
+
+class ReconcileSchedule:
+    """
+    Decides when the monitors' brightness is read back next.
+
+    Someone may change the brightness with a monitor's own buttons at any
+    time, but that is most likely while they are at the computer and have
+    just been adjusting it. So the interval starts short after every
+    interaction and after every detected change, grows by RECONCILE_BACKOFF
+    with every round that finds nothing new, and reading stops altogether
+    once nobody has interacted for the idle timeout. The clock is injectable,
+    so the schedule can be replayed with simulated time.
+    """
+
+    def __init__(self, min_interval: float = MIN_RECONCILE_INTERVAL, max_interval: float = MAX_RECONCILE_INTERVAL,
+                 backoff: float = RECONCILE_BACKOFF, idle_timeout: float = RECONCILE_IDLE_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            min_interval (float): Seconds between rounds after an interaction or change.
+            max_interval (float): Longest seconds between rounds.
+            backoff (float): Factor the interval grows by per round without a change.
+            idle_timeout (float): Seconds without interaction after which no more rounds are scheduled.
+            clock (Callable): Monotonic time source in seconds.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self.interval = min_interval
+        self.last_interaction = clock()
+
+    def interaction(self):
+        """Notes that the user just adjusted the brightness or opened the slider."""
+        self.last_interaction = self._clock()
+        self.interval = self.min_interval
+
+    def round_finished(self, changed: bool):
+        """
+        Adapts the interval to the outcome of a round.
+
+        Args:
+            changed (bool): Whether any monitor had been changed outside the application.
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def is_idle(self) -> bool:
+        """Whether nobody has interacted for the idle timeout."""
+        return self._clock() - self.last_interaction >= self.idle_timeout
+
+    def next_delay(self) -> Optional[float]:
+        """Returns the seconds until the next round, or None while idle."""
+        if self.is_idle():
+            return None
+        return self.interval
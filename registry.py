@@ -0,0 +1,191 @@
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+
+class MonitorRecord:
+    """
+    Everything known about one connected monitor.
+
+    Records are never changed once they are part of a snapshot, updates
+    replace them with a modified copy.
+    """
+
+    __slots__ = ("monitor_id", "monitor", "brightness", "last_brightness", "confirmed_brightness", "contrast",
+                 "max_luminance", "version")
+
+    # Fields MonitorRegistry.update can change
+    FIELDS = ("brightness", "last_brightness", "confirmed_brightness", "contrast", "max_luminance")
+
+    def __init__(self, monitor_id: str, monitor: Any, brightness: Optional[int] = None,
+                 last_brightness: Optional[int] = None, confirmed_brightness: Optional[int] = None,
+                 contrast: Optional[int] = None, max_luminance: Optional[int] = None, version: int = 0):
+        """
+        Args:
+            monitor_id (str): Stable ID of the monitor.
+            monitor: Monitor object from the backend.
+            brightness (int): Brightness the user asked for, None until it is known.
+            last_brightness (int): Brightness last sent to the monitor, None until it is known.
+            confirmed_brightness (int): Brightness the monitor last confirmed by a successful
+                write or a read, None until then and after a failed write.
+            contrast (int): Contrast read from the monitor, None until it is known.
+            max_luminance (int): Highest luminance value the monitor accepts, None until it is known.
+            version (int): Registry version the record was last changed in.
+        """
+        self.monitor_id = monitor_id
+        self.monitor = monitor
+        self.brightness = brightness
+        self.last_brightness = last_brightness
+        self.confirmed_brightness = confirmed_brightness
+        self.contrast = contrast
+        self.max_luminance = max_luminance
+        self.version = version
+
+    def replace(self, version: int, **changes) -> "MonitorRecord":
+        """Returns a copy of the record with the given fields changed."""
+        fields = {name: getattr(self, name) for name in ("monitor",) + self.FIELDS}
+        fields.update(changes)
+        return MonitorRecord(self.monitor_id, version=version, **fields)
+
+
+class RegistrySnapshot:
+    """An immutable view of all monitor records at one registry version."""
+
+    __slots__ = ("version", "records")
+
+    def __init__(self, version: int, records: Dict[str, MonitorRecord]):
+        self.version = version
+        self.records = records
+
+    def __contains__(self, monitor_id) -> bool:
+        return monitor_id in self.records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, monitor_id) -> Optional[MonitorRecord]:
+        """Returns the record of a monitor, or None when it is not connected."""
+        return self.records.get(monitor_id)
+
+    def position(self, monitor_id) -> Optional[int]:
+        """Returns the position of a monitor in enumeration order, or None."""
+        for position, key in enumerate(self.records):
+            if key == monitor_id:
+                return position
+        return None
+
+    def monitors(self) -> Dict[str, Any]:
+        """Returns the monitor objects keyed by monitor ID."""
+        return {key: record.monitor for key, record in self.records.items()}
+
+    def brightness(self) -> Dict[str, int]:
+        """Returns the requested brightness of every monitor whose brightness is known."""
+        return {key: record.brightness for key, record in self.records.items() if record.brightness is not None}
+
+    def dirty(self) -> Dict[str, int]:
+        """Returns the requested brightness of every monitor that has not confirmed it yet."""
+        return {key: record.brightness for key, record in self.records.items()
+                if record.brightness is not None and record.brightness != record.confirmed_brightness}
+
+    def last_brightness(self) -> Dict[str, int]:
+        """Returns the brightness last sent to every monitor whose brightness is known."""
+        return {key: record.last_brightness for key, record in self.records.items()
+                if record.last_brightness is not None}
+
+
+class MonitorRegistry:
+    """
+    Thread-safe store of the connected monitors and their brightness.
+
+    The state is published as an immutable RegistrySnapshot. Readers take the
+    current snapshot without locking and always see a consistent set of
+    records, however many threads are updating. Writers serialize on a lock,
+    build a new snapshot with a higher version and publish it with a single
+    reference swap. Passing `expected_version` makes an update conditional, so
+    a read-modify-write such as a hotkey step can detect that another thread
+    got in between and try again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = RegistrySnapshot(0, {})
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Returns the current state. Never blocks."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the current state, increased by every change."""
+        return self._snapshot.version
+
+    def set_monitors(self, monitors: Dict[str, Any]) -> int:
+        """
+        Makes the given monitors the connected ones.
+
+        Monitors that stay connected keep their brightness, monitors that are
+        gone are dropped and new monitors start with an unknown brightness.
+
+        Args:
+            monitors (Dict[str, Any]): Monitor objects keyed by monitor ID, in enumeration order.
+
+        Returns:
+            The new version.
+        """
+        with self._lock:
+            current = self._snapshot.records
+            version = self._snapshot.version + 1
+            records = {}
+            for monitor_id, monitor in monitors.items():
+                record = current.get(monitor_id)
+                if record is None:
+                    record = MonitorRecord(monitor_id, monitor, version=version)
+                elif record.monitor is not monitor:
+                    record = record.replace(version, monitor=monitor)
+                records[monitor_id] = record
+            self._snapshot = RegistrySnapshot(version, records)
+            return version
+
+    def update(self, expected_version: int = None, **fields: Dict[str, Optional[int]]) -> Optional[int]:
+        """
+        Changes fields of several monitors in one step.
+
+        Monitors that are not connected are ignored. Readers see either none or
+        all of the changes.
+
+        Args:
+            expected_version (int): Only apply the changes if the registry is still at this version.
+            **fields: New values keyed by monitor ID, per field of MonitorRecord.FIELDS,
+                e.g. `brightness={monitor_id: 60}`. None makes a value unknown again.
+
+        Returns:
+            The version after the update, or None when `expected_version` did not match.
+        """
+        unknown = set(fields) - set(MonitorRecord.FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown monitor record fields: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            snapshot = self._snapshot
+            if expected_version is not None and expected_version != snapshot.version:
+                return None
+
+            version = snapshot.version + 1
+            records = None
+            for monitor_id in set().union(*(values for values in fields.values() if values)):
+                record = snapshot.records.get(monitor_id)
+                if record is None:
+                    continue
+                changes = {name: values[monitor_id] for name, values in fields.items()
+                           if values and monitor_id in values and values[monitor_id] != getattr(record, name)}
+                if changes:
+                    if records is None:
+                        records = dict(snapshot.records)
+                    records[monitor_id] = record.replace(version, **changes)
+
+            if records is None:
+                return snapshot.version
+            self._snapshot = RegistrySnapshot(version, records)
+            return version
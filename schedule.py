@@ -0,0 +1,213 @@
+import math
+import os
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+SCHEDULE_ENV = "MONITOR_BRIGHTNESS_SCHEDULE"  # e.g. "07:00=40,08:00=80,19:00=80,22:00=30"
+SCHEDULE_RESOLUTION = 5  # brightness levels the schedule moves per write
+DAY = 86400.0  # seconds
+WAKEUP_MARGIN = 0.001  # seconds past a computed change, so the new level is in effect when the timer fires
+
+
+def parse_time_of_day(text: str) -> float:
+    """
+    Parses "HH:MM" or "HH:MM:SS" into seconds after midnight.
+
+    Raises:
+        ValueError: The time is malformed or out of range.
+    """
+    parts = text.strip().split(":")
+    if not 2 <= len(parts) <= 3:
+        raise ValueError(f"Invalid time of day '{text}', expected HH:MM")
+    try:
+        hours, minutes, seconds = (int(part) for part in parts + ["0"] * (3 - len(parts)))
+    except ValueError:
+        raise ValueError(f"Invalid time of day '{text}', expected HH:MM") from None
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        raise ValueError(f"Invalid time of day '{text}'")
+    return float(hours * 3600 + minutes * 60 + seconds)
+
+
+class BrightnessCurve:
+    """
+    Brightness over the day, interpolated linearly between points in time.
+
+    Each point starts a segment that runs until the next point, wrapping
+    around midnight. A segment between two equal levels is flat, one between
+    different levels ramps. Levels are quantized to `resolution`, so the
+    brightness only changes, and the monitors only need a write, when a ramp
+    crosses from one quantized level to the next.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, int]], resolution: int = SCHEDULE_RESOLUTION):
+        """
+        Args:
+            points (Sequence): (seconds after midnight, brightness 0-100) pairs.
+            resolution (int): Brightness levels between two scheduled writes.
+
+        Raises:
+            ValueError: No points, or two points at the same time.
+        """
+        if not points:
+            raise ValueError("A schedule needs at least one point")
+        self.points: List[Tuple[float, int]] = sorted((seconds % DAY, max(0, min(100, int(level))))
+                                                       for seconds, level in points)
+        times = [seconds for seconds, _ in self.points]
+        if len(set(times)) != len(times):
+            raise ValueError("Two schedule points at the same time")
+        self.resolution = max(1, resolution)
+
+    @classmethod
+    def parse(cls, spec: str, resolution: int = SCHEDULE_RESOLUTION) -> "BrightnessCurve":
+        """
+        Builds a curve from a string like "07:00=40,08:00=80,19:00=80,22:00=30".
+
+        Raises:
+            ValueError: The string is malformed.
+        """
+        points = []
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            when, separator, level = item.partition("=")
+            if not separator:
+                raise ValueError(f"Invalid schedule point '{item}', expected HH:MM=LEVEL")
+            try:
+                points.append((parse_time_of_day(when), int(level)))
+            except ValueError as e:
+                raise ValueError(f"Invalid schedule point '{item}': {e}") from None
+        return cls(points, resolution)
+
+    def segment(self, seconds: float) -> Tuple[float, float, int, int]:
+        """
+        Returns the segment a time of day falls into.
+
+        Returns:
+            Start and end in seconds relative to the same midnight as `seconds`
+            (the start may be negative and the end beyond DAY when the segment
+            wraps), and the levels at its start and end.
+        """
+        seconds %= DAY
+        index = len(self.points) - 1
+        for position, (start, _) in enumerate(self.points):
+            if start > seconds:
+                index = position - 1
+                break
+        start, level = self.points[index]
+        if start > seconds:
+            start -= DAY
+        end, end_level = self.points[(index + 1) % len(self.points)]
+        end = start + ((end - start) % DAY or DAY)
+        return start, end, level, end_level
+
+    def value_at(self, seconds: float) -> float:
+        """Returns the brightness at a time of day, before quantization."""
+        start, end, level, end_level = self.segment(seconds)
+        seconds %= DAY
+        return level + (end_level - level) * (seconds - start) / (end - start)
+
+    def quantize(self, value: float) -> int:
+        """Rounds a brightness to the curve's resolution."""
+        return max(0, min(100, int(math.floor(value / self.resolution + 0.5) * self.resolution)))
+
+    def level_at(self, seconds: float) -> int:
+        """Returns the quantized brightness at a time of day."""
+        return self.quantize(self.value_at(seconds))
+
+    def next_boundary(self, seconds: float) -> float:
+        """Returns the seconds until the next segment starts."""
+        _, end, _, _ = self.segment(seconds)
+        return end - seconds % DAY
+
+    def next_change(self, seconds: float) -> float:
+        """
+        Returns the seconds until the quantized level changes or the next segment starts.
+
+        A flat segment changes nothing until it ends. On a ramp this is the
+        moment the value crosses the midpoint to the next quantized level.
+        """
+        start, end, level, end_level = self.segment(seconds)
+        seconds %= DAY
+        if level == end_level:
+            return end - seconds
+        value = level + (end_level - level) * (seconds - start) / (end - start)
+        steps = value / self.resolution
+        threshold = (math.floor(steps + 0.5) + (0.5 if end_level > level else -0.5)) * self.resolution
+        crossing = start + (threshold - level) / (end_level - level) * (end - start)
+        return max(0.0, min(crossing, end) - seconds)
+
+
+class TimeOfDaySchedule:
+    """
+    Decides when the scheduled brightness has to be written.
+
+    Follows a BrightnessCurve in local time and tells the caller only what
+    actually needs a write: `due` returns a level when it differs from the
+    one applied last, and `next_delay` the time until that can happen next,
+    so a single timer armed for that delay is all the waking up needed.
+    A manual change overrides the schedule until the next segment starts.
+    The clock is injectable, so a whole day can be replayed with simulated
+    time.
+    """
+
+    def __init__(self, curve: BrightnessCurve, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            curve (BrightnessCurve): The brightness over the day.
+            clock (Callable): Wall clock in seconds since the epoch.
+        """
+        self.curve = curve
+        self._clock = clock
+        self.applied: Optional[int] = None
+        self.override_until: Optional[float] = None
+
+    def time_of_day(self, now: float) -> float:
+        """Returns the seconds since local midnight at the given time."""
+        return (now + time.localtime(now).tm_gmtoff) % DAY
+
+    def is_overridden(self) -> bool:
+        """Whether a manual change is holding off the schedule."""
+        return self.override_until is not None and self._clock() < self.override_until
+
+    def override(self):
+        """Holds the schedule off until the next segment starts, the user just set the brightness."""
+        now = self._clock()
+        self.override_until = now + self.curve.next_boundary(self.time_of_day(now))
+        self.applied = None  # write again when the override ends, whatever level was applied before
+
+    def due(self) -> Optional[int]:
+        """
+        Returns the level to write now, or None when nothing needs to change.
+
+        The returned level counts as applied.
+        """
+        now = self._clock()
+        if self.override_until is not None:
+            remaining = self.override_until - now
+            # A clock set back must not stretch the override past the next segment
+            if 0 < remaining <= self.curve.next_boundary(self.time_of_day(now)):
+                return None
+            self.override_until = None
+        level = self.curve.level_at(self.time_of_day(now))
+        if level == self.applied:
+            return None
+        self.applied = level
+        return level
+
+    def next_delay(self) -> float:
+        """Returns the seconds until `due` may return a level again."""
+        now = self._clock()
+        if self.is_overridden():
+            return self.override_until - now + WAKEUP_MARGIN
+        return self.curve.next_change(self.time_of_day(now)) + WAKEUP_MARGIN
+
+
+def schedule_from_env() -> Optional[TimeOfDaySchedule]:
+    """
+    Returns the schedule set in $MONITOR_BRIGHTNESS_SCHEDULE, or None when there is none.
+
+    Raises:
+        ValueError: The schedule is malformed.
+    """
+    spec = os.environ.get(SCHEDULE_ENV, "").strip()
+    if not spec:
+        return None
+    return TimeOfDaySchedule(BrightnessCurve.parse(spec))
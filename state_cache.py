@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+STATE_FILE_NAME = "state.json"
+FLUSH_DELAY = 2.0  # seconds between the first change and writing the file
+
+logger = logging.getLogger(__name__)
+
+
+def default_state_dir(app_name: str) -> str:
+    """Returns the per-user directory the application keeps its files in."""
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, app_name)
+
+
+def write_json_atomically(path: str, data: Any, **options):
+    """
+    Writes JSON to a file through a temporary file that replaces it.
+
+    The temporary file is synced to disk before it replaces the old one, so
+    a crash or power loss leaves either the old or the new file behind,
+    never a half-written one.
+
+    Args:
+        path (str): The file to write, its directory is created if needed.
+        data: The value to write.
+        **options: Passed on to json.dump, e.g. indent.
+
+    Raises:
+        OSError: The file could not be written.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    name, _ = os.path.splitext(os.path.basename(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **options)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def parse_edid(edid: bytes) -> Optional[str]:
+    """
+    Builds a monitor identity from the vendor block of an EDID.
+
+    Args:
+        edid (bytes): At least the first 16 bytes of the monitor's EDID.
+
+    Returns:
+        A string like "DEL-A0F4-1234ABCD", or None when the EDID is unusable.
+    """
+    if not edid or len(edid) < 16 or edid[:8] != b"\x00\xff\xff\xff\xff\xff\xff\x00":
+        return None
+    # Three 5-bit letters packed big-endian into bytes 8-9
+    packed = (edid[8] << 8) | edid[9]
+    manufacturer = "".join(chr(((packed >> shift) & 0x1F) + ord("A") - 1) for shift in (10, 5, 0))
+    product = edid[10] | (edid[11] << 8)
+    serial = int.from_bytes(edid[12:16], "little")
+    return f"{manufacturer}-{product:04X}-{serial:08X}"
+
+
+def monitor_identity(monitor, idx: int) -> str:
+    """
+    Returns a key that identifies a monitor across restarts.
+
+    Uses the EDID model and serial when the monitor or its VCP exposes the raw
+    EDID, which the Windows backend attaches from the registry. Otherwise the I2C bus on Linux or the monitor description on Windows
+    is used, which survive other monitors being plugged in or out, and the
+    enumeration order only as a last resort.
+
+    Args:
+        monitor: Monitor object from the monitorcontrol library.
+        idx (int): Position of the monitor in the enumeration.
+    """
+    vcp = getattr(monitor, "vcp", None)
+    for source in (monitor, vcp):
+        identity = parse_edid(getattr(source, "edid", None))
+        if identity is not None:
+            return f"edid:{identity}"
+    bus = getattr(vcp, "bus_number", None)
+    if bus is not None:
+        return f"i2c:{bus}"
+    description = getattr(vcp, "description", None)
+    if description:
+        return f"desc:{description}"
+    return f"index:{idx}"
+
+
+class BrightnessStateCache:
+    """
+    Remembers the last brightness and the supported VCP codes of each monitor on disk.
+
+    Values are updated in memory right away. The file is written once per
+    `flush_delay` at most, no matter how many values change in between, and
+    always through a temporary file that replaces the old one, so a crash never
+    leaves a half-written file behind. Writes are serialized, so the flush
+    timer and `close` cannot replace a newer file with an older one.
+    """
+
+    def __init__(self, path: str, flush_delay: float = FLUSH_DELAY):
+        """
+        Args:
+            path (str): The JSON file to keep the state in.
+            flush_delay (float): Seconds to collect changes before writing them.
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # held while writing the file, taken before _lock
+        self._values: Dict[str, int] = {}
+        self._capabilities: Dict[str, FrozenSet[int]] = {}
+        self._dirty = False
+        self._timer = None
+        self.flushes = 0
+        self.load()
+
+    def load(self):
+        """Reads the file, starting empty when it is missing or unreadable."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            values = {str(key): int(value) for key, value in data.get("brightness", {}).items()}
+            capabilities = {str(key): frozenset(int(code) for code in codes)
+                            for key, codes in data.get("capabilities", {}).items()}
+        except FileNotFoundError:
+            values, capabilities = {}, {}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring unreadable state file %s: %s", self.path, e)
+            values, capabilities = {}, {}
+        with self._lock:
+            self._values = values
+            self._capabilities = capabilities
+
+    def get(self, identity: str) -> Optional[int]:
+        """Returns the remembered brightness of a monitor, or None."""
+        with self._lock:
+            return self._values.get(identity)
+
+    def set(self, identity: str, brightness: int):
+        """
+        Remembers the brightness of a monitor and schedules a write of the file.
+
+        Args:
+            identity (str): Key from monitor_identity.
+            brightness (int): The brightness level (0-100).
+        """
+        with self._lock:
+            if self._values.get(identity) == brightness:
+                return
+            self._values[identity] = brightness
+            self._schedule_flush()
+
+    def get_capabilities(self, identity: str) -> Optional[FrozenSet[int]]:
+        """Returns the remembered VCP codes a monitor supports, or None."""
+        with self._lock:
+            return self._capabilities.get(identity)
+
+    def set_capabilities(self, identity: str, codes: Iterable[int]):
+        """
+        Remembers the VCP codes a monitor supports and schedules a write of the file.
+
+        Args:
+            identity (str): Key from monitor_identity.
+            codes (Iterable[int]): The supported VCP codes.
+        """
+        codes = frozenset(codes)
+        with self._lock:
+            if self._capabilities.get(identity) == codes:
+                return
+            self._capabilities[identity] = codes
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Marks the state as changed and starts the flush timer. Called with the lock held."""
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes pending changes to disk now."""
+        with self._flush_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                data = {
+                    "brightness": dict(self._values),
+                    "capabilities": {key: sorted(codes) for key, codes in self._capabilities.items()},
+                }
+                self._dirty = False
+
+            try:
+                write_json_atomically(self.path, data, indent=2, sort_keys=True)
+                self.flushes += 1
+            except OSError as e:
+                logger.error("Failed to write state file %s: %s", self.path, e)
+                with self._lock:
+                    self._dirty = True
+
+    def close(self):
+        """Cancels the scheduled write and writes pending changes immediately."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
@@ -0,0 +1,169 @@
+import math
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+DEFAULT_WRITES_PER_SECOND = 10.0  # assumed bus throughput when no spacing source is given
+
+
+class Ramp:
+    """A linear brightness ramp from one value to another, cut into steps."""
+
+    __slots__ = ("start_value", "target", "start_time", "duration", "steps", "emitted_step")
+
+    def __init__(self, start_value: float, target: int, start_time: float, duration: float, steps: int):
+        self.start_value = start_value
+        self.target = target
+        self.start_time = start_time
+        self.duration = duration
+        self.steps = steps
+        self.emitted_step = 0
+
+    def step_at(self, now: float) -> int:
+        """Returns the last step that is due at the given time. The first step is due at once."""
+        if self.duration <= 0:
+            return self.steps
+        elapsed = max(0.0, now - self.start_time)
+        # The epsilon keeps a step from missing its own due time to rounding
+        return min(self.steps, int(elapsed / self.duration * self.steps + 1e-9) + 1)
+
+    def value_at_step(self, step: int) -> int:
+        """Returns the brightness of the given step."""
+        return int(round(self.start_value + (self.target - self.start_value) * step / self.steps))
+
+    def time_of_step(self, step: int) -> float:
+        """Returns when the given step is due."""
+        return self.start_time + self.duration * (step - 1) / self.steps
+
+
+class TransitionEngine:
+    """
+    Plans brightness ramps for several monitors.
+
+    The number of steps of a ramp is limited by how many writes the monitor can
+    take during the ramp, as given by the minimum write spacing learned for it
+    (see MonitorRateLimiter). So a slow monitor gets a few large steps while a
+    fast one gets a smooth ramp, and neither receives writes faster than it
+    completes them. The engine has no timers of its own: the caller asks
+    `next_delay` when to call `tick` next, which makes it easy to drive from a
+    QTimer or from a simulated clock.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 spacing: Optional[Callable[[Hashable], float]] = None):
+        """
+        Args:
+            clock (Callable): Monotonic time source in seconds.
+            spacing (Callable): Returns the minimum seconds between two writes to a
+                monitor, e.g. MonitorRateLimiter.spacing. Without it every monitor
+                is assumed to take DEFAULT_WRITES_PER_SECOND.
+        """
+        self._clock = clock
+        self._spacing = spacing
+        self._ramps: Dict[Hashable, Ramp] = {}
+        self._values: Dict[Hashable, int] = {}
+
+    def throughput(self, key: Hashable) -> float:
+        """Returns how many writes per second a monitor can take."""
+        seconds = self._spacing(key) if self._spacing is not None else 0
+        if not seconds:
+            return DEFAULT_WRITES_PER_SECOND
+        return 1.0 / seconds
+
+    def plan_steps(self, key: Hashable, start: float, target: int, duration: float) -> int:
+        """
+        Returns how many writes a ramp should use.
+
+        Args:
+            key (Hashable): The monitor to ramp.
+            start (float): Brightness at the start of the ramp.
+            target (int): Brightness at the end of the ramp.
+            duration (float): Length of the ramp in seconds.
+        """
+        distance = int(math.ceil(abs(target - start)))
+        if distance == 0:
+            return 0
+        capacity = max(1, int(duration * self.throughput(key)))
+        return min(distance, capacity)
+
+    def set_target(self, key: Hashable, target: int, duration: float, current: Optional[int] = None):
+        """
+        Starts a ramp towards `target`, or retargets the running one.
+
+        A running ramp continues from the brightness it has already written
+        instead of jumping back to where it started. Without a running ramp
+        the new one starts from `current`, since the monitor may have been
+        set outside the engine since its last ramp, e.g. by a profile or
+        with the monitor's own buttons.
+
+        Args:
+            key (Hashable): The monitor to ramp.
+            target (int): The brightness to end at.
+            duration (float): Length of the ramp in seconds.
+            current (int): Brightness of the monitor now. Without it an idle
+                monitor starts from the last value the engine wrote.
+        """
+        ramp = self._ramps.get(key)
+        if ramp is not None and ramp.target == target:
+            return
+        if ramp is not None:
+            start = self._values.get(key, ramp.start_value)
+        elif current is not None:
+            start = self._values[key] = current
+        else:
+            start = self._values.get(key, target)
+
+        steps = self.plan_steps(key, start, target, duration)
+        if steps == 0:
+            self._ramps.pop(key, None)
+            return
+        self._ramps[key] = Ramp(start, target, self._clock(), duration, steps)
+
+    def forget(self, key: Hashable):
+        """Stops the ramp of a monitor and drops its last value, e.g. when it was disconnected."""
+        self._ramps.pop(key, None)
+        self._values.pop(key, None)
+
+    def target(self, key: Hashable) -> Optional[int]:
+        """Returns the brightness a monitor is ramping to, or its last value when idle."""
+        ramp = self._ramps.get(key)
+        return ramp.target if ramp is not None else self._values.get(key)
+
+    def is_ramping(self, key: Hashable) -> bool:
+        """Returns whether a ramp of the given monitor is still running."""
+        return key in self._ramps
+
+    def is_active(self) -> bool:
+        """Returns whether any ramp is still running."""
+        return bool(self._ramps)
+
+    def tick(self) -> Dict[Hashable, int]:
+        """
+        Advances all ramps to the current time.
+
+        Steps that were missed are skipped rather than written late, so only the
+        newest due value of each ramp is returned.
+
+        Returns:
+            Brightness to write, keyed by monitor. Monitors without a new step are left out.
+        """
+        now = self._clock()
+        values = {}
+        for key, ramp in list(self._ramps.items()):
+            step = ramp.step_at(now)
+            if step > ramp.emitted_step:
+                ramp.emitted_step = step
+                value = ramp.value_at_step(step)
+                if value != self._values.get(key):
+                    values[key] = value
+                    self._values[key] = value
+            if ramp.emitted_step >= ramp.steps:
+                del self._ramps[key]
+        return values
+
+    def next_delay(self) -> Optional[float]:
+        """Returns the seconds until the next step is due, or None when no ramp is running."""
+        if not self._ramps:
+            return None
+        now = self._clock()
+        due = min(ramp.time_of_step(ramp.emitted_step + 1) for ramp in self._ramps.values())
+        return max(0.0, due - now)
@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class Superseded(Exception):
+    """A newer value for the monitor was posted before this one was written."""
+
+
+class CoalescingWriteQueue:
+    """
+    Per-monitor write queue where the newest value always wins.
+
+    Producers post a target value for a monitor and return immediately. Each
+    monitor holds at most one pending value, a value that has not been written
+    yet is simply replaced by a newer one. A single drain job per monitor writes
+    the pending value and keeps going until nothing is left, so a burst of posts
+    ends in one or two writes instead of one write per post.
+
+    A post can carry a `done` callback that learns the outcome of its value:
+    written, failed, or replaced by a newer post before it was written.
+    """
+
+    def __init__(self, write: Callable[[Hashable, int], None], submit: Callable[..., Any],
+                 on_applied: Callable[[Hashable, int], None] = None,
+                 on_failed: Callable[[Hashable, int, Exception], None] = None,
+                 delay: Callable[[Hashable], float] = None,
+                 defer: Callable[..., Any] = None):
+        """
+        Args:
+            write (Callable): Performs the write, `write(key, value)`. Raises on failure.
+            submit (Callable): Schedules a drain job, `submit(func, key)`, e.g. ThreadPoolExecutor.submit.
+            on_applied (Callable): Called as `on_applied(key, value)` after a successful write.
+            on_failed (Callable): Called as `on_failed(key, value, error)` after a failed write.
+            delay (Callable): Returns the seconds to wait before the next write to a
+                monitor, e.g. MonitorRateLimiter.delay. Values posted while waiting
+                are coalesced.
+            defer (Callable): Schedules a drain job after a delay, `defer(seconds, func, key)`,
+                e.g. IOWorker.submit_after. Without it the drain job sleeps through the delay.
+        """
+        self._write = write
+        self._submit = submit
+        self._on_applied = on_applied
+        self._on_failed = on_failed
+        self._delay = delay
+        self._defer = defer
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, int] = {}
+        self._callbacks: Dict[Hashable, List[Callable]] = {}
+        self._draining = set()
+        self.submitted = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.failed = 0
+
+    def post(self, key: Hashable, value: int, done: Callable[[Exception], None] = None):
+        """
+        Sets the newest target value for a monitor without waiting for the write.
+
+        Args:
+            key (Hashable): The monitor to write to.
+            value (int): The brightness level to set.
+            done (Callable): Called on a worker thread as `done(error)` once the
+                value is written (error None) or failed, or from this call as
+                `done(Superseded())` for a value still pending when a newer one
+                is posted. A failure handed to `done` is not passed to `on_failed`.
+        """
+        with self._lock:
+            self.submitted += 1
+            if key in self._pending:
+                self.coalesced += 1
+            superseded = self._callbacks.pop(key, [])
+            self._pending[key] = value
+            if done is not None:
+                self._callbacks[key] = [done]
+            start = key not in self._draining
+            self._draining.add(key)
+        for callback in superseded:
+            callback(Superseded())
+        if start:
+            self._submit(self._drain, key)
+
+    def pending(self, key: Hashable):
+        """Returns the value waiting to be written to a monitor, or None."""
+        with self._lock:
+            return self._pending.get(key)
+
+    def is_busy(self, key: Hashable = None) -> bool:
+        """Returns whether a write is queued or running, for one monitor or any monitor."""
+        with self._lock:
+            return bool(self._draining) if key is None else key in self._draining
+
+    def counters(self) -> Dict[str, int]:
+        """Returns the number of writes submitted, coalesced, applied and failed."""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "applied": self.applied,
+                "failed": self.failed,
+            }
+
+    def _drain(self, key: Hashable):
+        """Writes the pending value of a monitor until no newer value arrives."""
+        while True:
+            if self._delay is not None:
+                wait = self._delay(key)
+                if wait > 0:
+                    if self._defer is not None:
+                        # Come back when the monitor may be written, the key stays draining meanwhile
+                        self._defer(wait, self._drain, key)
+                        return
+                    time.sleep(wait)
+
+            with self._lock:
+                if key not in self._pending:
+                    self._draining.discard(key)
+                    return
+                value = self._pending.pop(key)
+                callbacks = self._callbacks.pop(key, [])
+
+            try:
+                self._write(key, value)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.error("Failed to write brightness %d to monitor %s: %s", value, key, e)
+                if self._on_failed is not None and not callbacks:
+                    self._on_failed(key, value, e)
+                for callback in callbacks:
+                    callback(e)
+            else:
+                with self._lock:
+                    self.applied += 1
+                if self._on_applied is not None:
+                    self._on_applied(key, value)
+                for callback in callbacks:
+                    callback(None)